@@ -3,8 +3,8 @@ from datetime import datetime, timedelta
 from database import EmotionDatabase
 
 class AdvancedAnalyzer:
-    def _init_(self):
-        self.db = EmotionDatabase()
+    def __init__(self, db=None):
+        self.db = db if db is not None else EmotionDatabase()
         self.emotion_weights = {
             'happy': 1.0,
             'neutral': 0.5,
@@ -139,35 +139,37 @@ class AdvancedAnalyzer:
         
         return group_emotion, emotion_distribution
 
+    def analyze_columns(self, history):
+        # save_analysis hesapları EmotionColumns üzerinde, satır satır dolaşmadan.
+        # Bilinmeyen duygular sayılmaz; stres ilk 10, uyku ilk 24 bilinen kayıttan
+        # hesaplanır, bu yüzden tüm geçmiş için yalnızca duygu kodları sayılır.
+        names = history.emotion_names
+        known = np.array([name in self.emotion_weights for name in names], dtype=bool)
+        counts = np.bincount(history.emotion, minlength=len(names))[:len(names)]
+        total = int(counts[known].sum())
+        if not total:
+            return 0.0, 0.0, 0.0, {}
+
+        first = np.empty(0, dtype=np.int64)
+        for start in range(0, len(history), 4096):
+            found = np.flatnonzero(known[history.emotion[start:start + 4096]]) + start
+            first = np.concatenate([first, found[:24 - len(first)]])
+            if len(first) == 24:
+                break
+        weights = np.array([self.emotion_weights.get(name, 0.0) for name in names])
+        scores = weights[history.emotion[first]] * history.confidence[first].astype(np.float64)
+
+        positive = sum(int(counts[code]) for code, name in enumerate(names) if name in ['happy', 'neutral', 'surprise'])
+        emotion_counts = {name: int(counts[code]) for code, name in enumerate(names) if known[code] and counts[code]}
+        return float(np.mean(scores[:10])), positive / total * 100, float(np.mean(scores)), emotion_counts
+
     def save_analysis(self):
         try:
-            emotion_history = self.db.get_emotion_history()
-            
-            # Boş veri kontrolü
-            if not emotion_history or len(emotion_history) == 0:
-                return {
-                    'stress_level': 0.0,
-                    'productivity_score': 0.0,
-                    'sleep_quality': 0.0,
-                    'analysis_data': {
-                        'emotion_trends': {},
-                        'timestamp': datetime.now().isoformat()
-                    }
-                }
-            
-            # Duygu verilerini düzgün bir şekilde ayıkla
-            clean_history = []
-            for record in emotion_history:
-                try:
-                    # Her kayıt en az 3 alana sahip olmalı ve 2. alan bir duygu olmalı
-                    if len(record) >= 3 and isinstance(record[1], str) and record[1] in self.emotion_weights:
-                        clean_history.append(record)
-                except Exception as e:
-                    print(f"Kayıt işlenirken hata: {e}")
-                    continue
-            
-            # Eğer temiz veri yoksa, boş sonuç döndür
-            if not clean_history:
+            history = self.db.get_history_columns()
+            stress_level, productivity_score, sleep_quality, emotion_counts = self.analyze_columns(history)
+
+            # Boş veya temiz kaydı olmayan geçmiş
+            if not emotion_counts:
                 return {
                     'stress_level': 0.0,
                     'productivity_score': 0.0,
@@ -178,21 +180,6 @@ class AdvancedAnalyzer:
                     }
                 }
             
-            stress_level = self.calculate_stress_level(clean_history)
-            productivity_score = self.calculate_productivity_score(clean_history)
-            sleep_quality = self.estimate_sleep_quality(clean_history)
-            
-            # Duygu trendlerini hesapla
-            emotion_counts = {}
-            for record in clean_history:
-                try:
-                    emotion = record[1]
-                    if emotion not in emotion_counts:
-                        emotion_counts[emotion] = 0
-                    emotion_counts[emotion] += 1
-                except Exception:
-                    continue
-            
             analysis_data = {
                 'emotion_trends': {"all_days": emotion_counts},
                 'timestamp': datetime.now().isoformat()
@@ -0,0 +1,235 @@
+import numpy as np
+from face_gallery import ENCODING_SIZE, euclidean_distances
+
+INDEX_VERSION = 1
+
+
+class _InvertedList:
+    # Bir kümenin üyeleri: id'ler, tarama için float16 kodlar ve yeniden
+    # sıralama için tam hassasiyetli float32 vektörler (kapasite ikiye katlanarak büyür)
+    def __init__(self, capacity=16):
+        self.size = 0
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.codes = np.empty((capacity, ENCODING_SIZE), dtype=np.float16)
+        self.vectors = np.empty((capacity, ENCODING_SIZE), dtype=np.float32)
+
+    def append(self, item_id, vector):
+        if self.size == len(self.ids):
+            capacity = max(16, len(self.ids) * 2)
+            for attr in ('ids', 'codes', 'vectors'):
+                old = getattr(self, attr)
+                new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+                new[:self.size] = old[:self.size]
+                setattr(self, attr, new)
+        pos = self.size
+        self.ids[pos] = item_id
+        self.codes[pos] = vector
+        self.vectors[pos] = vector
+        self.size += 1
+        return pos
+
+    def remove(self, pos):
+        # Son eleman silinen yere taşınır; taşınan id döndürülür (yoksa None)
+        last = self.size - 1
+        moved = None
+        if pos != last:
+            self.ids[pos] = self.ids[last]
+            self.codes[pos] = self.codes[last]
+            self.vectors[pos] = self.vectors[last]
+            moved = int(self.ids[pos])
+        self.size -= 1
+        return moved
+
+
+class IVFIndex:
+    # 128 boyutlu yüz encoding'leri için IVF (ters dosya) yaklaşık en yakın
+    # komşu indeksi. Vektörler k-means ile n_lists kümeye ayrılır; sorguda en
+    # yakın n_probe kümenin float16 kodları taranır, en iyi rerank aday tam
+    # hassasiyetli vektörlerle yeniden sıralanır (rerank=0 ise yeniden
+    # sıralama yapılmaz). exact_fallback_distance
+    # verilirse en iyi yaklaşık uzaklık bu değeri aşan sorgular tüm indekste
+    # kesin arama ile tekrarlanır.
+    def __init__(self, n_lists=None, n_probe=8, rerank=32, exact_fallback_distance=None):
+        self.n_lists = n_lists
+        self.n_probe = n_probe
+        self.rerank = rerank
+        self.exact_fallback_distance = exact_fallback_distance
+        self.centroids = np.empty((0, ENCODING_SIZE), dtype=np.float32)
+        self.centroid_sq_norms = np.empty(0, dtype=np.float32)
+        self.lists = []
+        self.locations = {}
+
+    def __len__(self):
+        return len(self.locations)
+
+    def __contains__(self, item_id):
+        return int(item_id) in self.locations
+
+    def build(self, vectors, ids=None, n_iter=20, sample_size=50000, seed=0):
+        vectors = np.ascontiguousarray(np.asarray(vectors, dtype=np.float32).reshape(-1, ENCODING_SIZE))
+        ids = np.arange(len(vectors)) if ids is None else np.asarray(ids, dtype=np.int64)
+        if len(ids) != len(vectors):
+            raise ValueError("Vektör ve id sayıları eşleşmiyor")
+
+        n_lists = self.n_lists or max(1, int(np.sqrt(len(vectors))))
+        n_lists = max(1, min(n_lists, len(vectors)))
+        self.centroids = self._kmeans(vectors, n_lists, n_iter, sample_size, seed)
+        self.centroid_sq_norms = np.einsum('ij,ij->i', self.centroids, self.centroids)
+
+        self.lists = [_InvertedList() for _ in range(len(self.centroids))]
+        self.locations = {}
+        if len(vectors):
+            for item_id, vector, list_no in zip(ids, vectors, self._assign(vectors)):
+                self._insert(int(item_id), vector, int(list_no))
+        return self
+
+    def _kmeans(self, vectors, k, n_iter, sample_size, seed):
+        if len(vectors) == 0:
+            return np.zeros((1, ENCODING_SIZE), dtype=np.float32)
+        rng = np.random.default_rng(seed)
+        sample = vectors
+        if len(vectors) > sample_size:
+            sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(len(sample), k, replace=False)].copy()
+
+        for _ in range(n_iter):
+            labels = np.argmin(euclidean_distances(sample, centroids), axis=1)
+            counts = np.bincount(labels, minlength=k)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+            # Boş kalan kümeler rastgele örneklerle yeniden başlatılır
+            empty = np.flatnonzero(~filled)
+            if len(empty):
+                centroids[empty] = sample[rng.choice(len(sample), len(empty), replace=False)]
+        return centroids
+
+    def _assign(self, vectors):
+        return np.argmin(euclidean_distances(vectors, self.centroids, self.centroid_sq_norms), axis=1)
+
+    def _insert(self, item_id, vector, list_no):
+        pos = self.lists[list_no].append(item_id, vector)
+        self.locations[item_id] = (list_no, pos)
+
+    def add(self, item_id, vector):
+        if not self.lists:
+            raise RuntimeError("İndeks oluşturulmadan ekleme yapılamaz, önce build() çağrılmalı")
+        item_id = int(item_id)
+        if item_id in self.locations:
+            self.remove(item_id)
+        vector = np.asarray(vector, dtype=np.float32).reshape(ENCODING_SIZE)
+        self._insert(item_id, vector, int(self._assign(vector[None, :])[0]))
+
+    def remove(self, item_id):
+        item_id = int(item_id)
+        if item_id not in self.locations:
+            return False
+        list_no, pos = self.locations.pop(item_id)
+        moved = self.lists[list_no].remove(pos)
+        if moved is not None:
+            self.locations[moved] = (list_no, pos)
+        return True
+
+    def remap_ids(self, mapping):
+        # id'ler mapping dizisine göre yeniden numaralanır (ör. galeri sıkıştırması sonrası)
+        self.locations = {}
+        for list_no, lst in enumerate(self.lists):
+            lst.ids[:lst.size] = mapping[lst.ids[:lst.size]]
+            for pos, item_id in enumerate(lst.ids[:lst.size]):
+                self.locations[int(item_id)] = (list_no, pos)
+
+    def search(self, queries, k=1, n_probe=None):
+        # Dönüş: (id'ler, uzaklıklar), her ikisi (sorgu sayısı, k); eksik sonuçlar -1 / inf
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        n_probe = min(n_probe or self.n_probe, len(self.lists))
+        result_ids = np.full((len(queries), k), -1, dtype=np.int64)
+        result_distances = np.full((len(queries), k), np.inf, dtype=np.float32)
+        if len(self) == 0 or len(queries) == 0:
+            return result_ids, result_distances
+
+        centroid_distances = euclidean_distances(queries, self.centroids, self.centroid_sq_norms)
+        probes = np.argsort(centroid_distances, axis=1)[:, :n_probe]
+
+        for qi, query in enumerate(queries):
+            members = [self.lists[i] for i in probes[qi] if self.lists[i].size]
+            if members:
+                ids, distances = self._search_lists(query, members, k)
+                result_ids[qi, :len(ids)] = ids
+                result_distances[qi, :len(ids)] = distances
+
+            if self.exact_fallback_distance is not None and result_distances[qi, 0] > self.exact_fallback_distance:
+                members = [lst for lst in self.lists if lst.size]
+                ids, distances = self._search_lists(query, members, k, exact=True)
+                result_ids[qi] = -1
+                result_distances[qi] = np.inf
+                result_ids[qi, :len(ids)] = ids
+                result_distances[qi, :len(ids)] = distances
+
+        return result_ids, result_distances
+
+    def _search_lists(self, query, members, k, exact=False):
+        ids = np.concatenate([lst.ids[:lst.size] for lst in members])
+        query = query[None, :]
+
+        if exact:
+            vectors = np.concatenate([lst.vectors[:lst.size] for lst in members])
+            distances = euclidean_distances(query, vectors)[0]
+        else:
+            # float16 kodlarla kaba tarama, en iyi adaylar tam vektörlerle yeniden sıralanır
+            codes = np.concatenate([lst.codes[:lst.size] for lst in members]).astype(np.float32)
+            distances = euclidean_distances(query, codes)[0]
+            if not self.rerank:
+                top = np.argsort(distances)[:k]
+                return ids[top], distances[top]
+
+            n_candidates = min(max(self.rerank, k), len(ids))
+            if n_candidates < len(ids):
+                candidates = np.argpartition(distances, n_candidates - 1)[:n_candidates]
+            else:
+                candidates = np.arange(len(ids))
+            # Yalnızca adayların tam vektörleri kendi kümelerinden toplanır
+            offsets = np.cumsum([0] + [lst.size for lst in members])
+            owners = np.searchsorted(offsets, candidates, side='right') - 1
+            vectors = np.empty((len(candidates), ENCODING_SIZE), dtype=np.float32)
+            for owner in np.unique(owners):
+                mask = owners == owner
+                vectors[mask] = members[owner].vectors[candidates[mask] - offsets[owner]]
+            ids = ids[candidates]
+            distances = euclidean_distances(query, vectors)[0]
+
+        top = np.argsort(distances)[:k]
+        return ids[top], distances[top]
+
+    def save(self, path):
+        ids, vectors = [], []
+        for lst in self.lists:
+            ids.append(lst.ids[:lst.size])
+            vectors.append(lst.vectors[:lst.size])
+        np.savez(
+            path,
+            version=INDEX_VERSION,
+            params=np.array([self.n_lists or 0, self.n_probe, self.rerank,
+                             -1.0 if self.exact_fallback_distance is None else self.exact_fallback_distance]),
+            centroids=self.centroids,
+            ids=np.concatenate(ids) if ids else np.empty(0, dtype=np.int64),
+            vectors=np.concatenate(vectors) if vectors else np.empty((0, ENCODING_SIZE), dtype=np.float32),
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            if int(data['version']) != INDEX_VERSION:
+                raise ValueError(f"Desteklenmeyen indeks sürümü: {int(data['version'])}")
+            n_lists, n_probe, rerank, fallback = data['params']
+            index = cls(n_lists=int(n_lists) or None, n_probe=int(n_probe), rerank=int(rerank),
+                        exact_fallback_distance=None if fallback < 0 else float(fallback))
+            index.centroids = data['centroids'].astype(np.float32)
+            index.centroid_sq_norms = np.einsum('ij,ij->i', index.centroids, index.centroids)
+            index.lists = [_InvertedList() for _ in range(len(index.centroids))]
+            vectors = data['vectors'].astype(np.float32)
+            if len(vectors):
+                # Kaydedilmiş vektörler mevcut merkezlere yeniden atanır
+                for item_id, vector, list_no in zip(data['ids'], vectors, index._assign(vectors)):
+                    index._insert(int(item_id), vector, int(list_no))
+        return index
@@ -12,13 +12,13 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 if current_dir not in sys.path:
     sys.path.append(current_dir)
 
-from emotion_model import EmotionRecognizer
-from face_detector import detect_face, detect_multiple_faces, recognize_faces_in_frame, draw_faces_on_frame, load_known_faces
+from face_detector import detect_face, detect_multiple_faces, recognize_faces_in_frame, draw_faces_on_frame, enroll_face, delete_known_face, list_known_identities
 from emotion_responses import get_response
-import face_recognition
 import tempfile
 from database import EmotionDatabase
 from advanced_analysis import AdvancedAnalyzer
+from model_loader import ModelLoader
+from emotion_model import FrameResultCache
 import plotly.express as px
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
@@ -371,16 +371,65 @@ menu = st.sidebar.radio(
 # Session state güncelle
 st.session_state.menu = menu
 
-# Model ve tanıyıcıları yükle
+# Model ve tanıyıcılar arka planda yüklenir; sayfa bu sırada çizilir
 @st.cache_resource
-def load_models():
-    recognizer = EmotionRecognizer()
-    known_encodings, known_names = load_known_faces()
+def get_model_loader():
+    return ModelLoader().start()
+
+@st.cache_resource
+def load_storage():
     db = EmotionDatabase()
-    analyzer = AdvancedAnalyzer()
-    return recognizer, known_encodings, known_names, db, analyzer
+    analyzer = AdvancedAnalyzer(db)
+    return db, analyzer
+
+# Aynı görüntü için kare analiz sonucu (Streamlit yeniden çalıştırmalarında)
+@st.cache_resource
+def get_frame_cache():
+    return FrameResultCache(float(os.getenv("EMOTION_FRAME_CACHE_MB", "32")) * 2 ** 20)
+
+model_loader = get_model_loader()
+db, analyzer = load_storage()
+frame_cache = get_frame_cache()
 
-recognizer, known_encodings, known_names, db, analyzer = load_models()
+def analyze_image(image_bytes, cv2_img, recognizer, gallery):
+    # Görüntü baytları ve galeri sürümü aynıysa önceki sonuç kullanılır
+    key = frame_cache.key(image_bytes, gallery.version)
+    recognized_faces = frame_cache.get(key)
+    if recognized_faces is None:
+        recognized_faces = recognize_faces_in_frame(cv2_img, gallery, None, recognizer)
+        frame_cache.put(key, recognized_faces)
+    return recognized_faces
+
+def wait_for_models():
+    # Modellere ihtiyaç duyulan anda, yükleme bitmediyse bekler
+    if not model_loader.is_ready():
+        with st.spinner("Modeller yükleniyor, lütfen bekleyin..."):
+            try:
+                return model_loader.wait()
+            except RuntimeError as e:
+                st.error(f"❌ {e}")
+                st.stop()
+    return model_loader.recognizer, model_loader.gallery
+
+# Model durumu
+if model_loader.state == 'ready':
+    st.sidebar.success(f"✅ Modeller hazır ({model_loader.total_time:.1f} sn)")
+    for label, cache in (("Tahmin önbelleği", model_loader.recognizer.cache), ("Kare önbelleği", frame_cache)):
+        if cache is not None:
+            stats = cache.get_stats()
+            st.sidebar.caption(f"{label}: %{stats['hit_ratio'] * 100:.0f} isabet, "
+                               f"{stats['entries']} kayıt, {stats['bytes_used'] / 1024:.0f} KB")
+elif model_loader.state == 'error':
+    st.sidebar.error(f"❌ Modeller yüklenemedi: {model_loader.error}")
+else:
+    st.sidebar.info(f"⏳ Modeller yükleniyor... ({model_loader.phase or 'başlatılıyor'})")
+
+# Arka plan kayıt yazıcısı durumu
+writer_stats = db.get_writer_stats()
+if writer_stats:
+    st.sidebar.caption(f"Kayıt kuyruğu: {writer_stats['queue_depth']} bekleyen, "
+                       f"ort. batch {writer_stats['avg_batch_size']:.0f}, "
+                       f"yazım {writer_stats['avg_flush_ms']:.1f} ms, düşürülen {writer_stats['dropped']}")
 
 def normalize_person_name(name):
     if not name or not str(name).strip().strip(','):
@@ -416,9 +465,10 @@ if menu == "Duygu Analizi":
             bytes_data = img_file_buffer.getvalue()
             cv2_img = cv2.imdecode(np.frombuffer(bytes_data, np.uint8), cv2.IMREAD_COLOR)
             
+            recognizer, gallery = wait_for_models()
             with st.spinner("Yüz tanıma ve duygu analizi yapılıyor..."):
                 # Çoklu yüz analizi - doğrudan tanıma fonksiyonunu kullan
-                recognized_faces = recognize_faces_in_frame(cv2_img, known_encodings, known_names, recognizer)
+                recognized_faces = analyze_image(bytes_data, cv2_img, recognizer, gallery)
                 
                 if recognized_faces:
                     # Görüntüyü işaretle
@@ -587,12 +637,13 @@ if menu == "Duygu Analizi":
             
             # İşleme buton
             if st.button("🔍 Duygu Analizi Yap"):
+                recognizer, gallery = wait_for_models()
                 with st.spinner("Duygu analizi yapılıyor..."):
                     cv2_img = np.array(image)
                     cv2_img = cv2.cvtColor(cv2_img, cv2.COLOR_RGB2BGR)
                     
                     # Çoklu yüz analizi - doğrudan tanıma fonksiyonunu kullan
-                    recognized_faces = recognize_faces_in_frame(cv2_img, known_encodings, known_names, recognizer)
+                    recognized_faces = analyze_image(uploaded_file.getvalue(), cv2_img, recognizer, gallery)
                     
                     if recognized_faces:
                         # Görüntüyü işaretle
@@ -757,11 +808,11 @@ if menu == "Duygu Analizi":
 elif menu == "Duygu Geçmişi":
     st.header("📊 Duygu Geçmişi")
     
-    # Duygu geçmişini DataFrame olarak al
+    # Kayıtlar yerine (kişi, duygu) özetleri okunur; satır sayısından bağımsızdır
     try:
-        df = pd.read_csv("data/emotion_history.csv")
+        df = db.get_aggregates_dataframe()
     except Exception as e:
-        st.error(f"CSV okunamadı: {e}")
+        st.error(f"Duygu geçmişi okunamadı: {e}")
         df = pd.DataFrame()
 
     if not df.empty:
@@ -787,7 +838,7 @@ elif menu == "Duygu Geçmişi":
             st.subheader(f"{selected_person} Duygu Geçmişi Özeti")
 
             # Duygu dağılımı
-            emotion_counts = filtered_df["emotion"].value_counts()
+            emotion_counts = filtered_df.groupby("emotion")["count"].sum().sort_values(ascending=False)
             total = emotion_counts.sum()
 
             # 1. Kartlar/rozetler
@@ -882,43 +933,42 @@ elif menu == "Yüz Ekle":
                     save_path = 'known_faces'
                     os.makedirs(save_path, exist_ok=True)
                     
-                    # Dosya adını oluştur
-                    img_path = os.path.join(save_path, f"{name}.jpg")
-                    
-                    # Eğer dosya zaten varsa
-                    if os.path.exists(img_path):
-                        overwrite = st.checkbox(f"{name} isimli kayıt zaten var. Üzerine yazmak istiyor musunuz?")
-                        if overwrite:
-                            cv2.imwrite(img_path, face_img)
-                            st.success(f"✅ {name} isimli yüz güncellendi!")
-                            # Yüz veritabanını yeniden yükle
-                            st.session_state.reload_faces = True
+                    # Kişi zaten kayıtlıysa fotoğraf ek şablon olarak eklenir
+                    _, gallery = wait_for_models()
+                    if name in gallery:
+                        add_photo = st.checkbox(f"{name} isimli kayıt zaten var. Yeni fotoğraf olarak eklemek istiyor musunuz?")
+                        if add_photo:
+                            # Yüzü kaydet ve paylaşılan galeride güncelle
+                            enrolled, _ = enroll_face(gallery, name, face_img, save_path)
+                            if enrolled:
+                                st.success(f"✅ {name} için yeni fotoğraf eklendi! ({gallery.template_count(name)} fotoğraf)")
+                            else:
+                                st.warning(f"⚠️ {name} kaydedildi ancak görüntüden yüz kodlaması çıkarılamadı.")
                     else:
-                        # Yüzü kaydet
-                        cv2.imwrite(img_path, face_img)
-                        st.success(f"✅ {name} isimli yüz başarıyla kaydedildi!")
-                        # Yüz veritabanını yeniden yükle
-                        st.session_state.reload_faces = True
+                        # Yüzü kaydet ve paylaşılan galeriye ekle
+                        enrolled, _ = enroll_face(gallery, name, face_img, save_path)
+                        if enrolled:
+                            st.success(f"✅ {name} isimli yüz başarıyla kaydedildi!")
+                        else:
+                            st.warning(f"⚠️ {name} kaydedildi ancak görüntüden yüz kodlaması çıkarılamadı.")
                         
                     # Kaydedilen yüzleri göster
                     st.markdown('<div class="card">', unsafe_allow_html=True)
                     st.subheader("Kayıtlı Yüzler")
                     
-                    # Tüm kayıtlı yüzleri listeleme
-                    files = [f for f in os.listdir(save_path) if f.endswith('.jpg') or f.endswith('.jpeg') or f.endswith('.png')]
-                    if not files:
+                    # Tüm kayıtlı kişileri listeleme (kişi başına ilk fotoğraf)
+                    identities = list_known_identities(save_path)
+                    if not identities:
                         st.info("Kayıtlı kişi bulunamadı.")
                     else:
-                        st.success(f"Toplam {len(files)} kişi kayıtlı.")
+                        st.success(f"Toplam {len(identities)} kişi kayıtlı.")
                         # 3 sütunlu düzende göster
                         cols = st.columns(3)
-                        for idx, file in enumerate(files):
-                            person_name = os.path.splitext(file)[0]
-                            img_path = os.path.join(save_path, file)
-                            img = Image.open(img_path)
+                        for idx, (person_name, paths) in enumerate(identities.items()):
+                            img = Image.open(paths[0])
                             
                             with cols[idx % 3]:
-                                st.image(img, caption=person_name, width=150)
+                                st.image(img, caption=f"{person_name} ({len(paths)} fotoğraf)", width=150)
                     
                     st.markdown('</div>', unsafe_allow_html=True)
             else:
@@ -943,19 +993,19 @@ elif menu == "Kayıtlı Yüzler":
     if not os.path.exists(folder):
         st.warning("Kayıtlı kişi klasörü bulunamadı.")
     else:
-        files = [f for f in os.listdir(folder) if f.endswith('.jpg') or f.endswith('.png')]
-        if not files:
+        identities = list_known_identities(folder)
+        if not identities:
             st.info("Kayıtlı kişi bulunmuyor.")
         else:
             cols = st.columns(3)
-            for idx, file in enumerate(files):
-                name = os.path.splitext(file)[0]
-                img_path = os.path.join(folder, file)
-                img = Image.open(img_path)
+            for idx, (name, paths) in enumerate(identities.items()):
+                img = Image.open(paths[0])
                 
                 with cols[idx % 3]:
-                    st.image(img, caption=name, use_column_width=True)
+                    st.image(img, caption=f"{name} ({len(paths)} fotoğraf)", use_column_width=True)
                     if st.button(f"Sil {name}", key=name):
-                        os.remove(img_path)
+                        # Dosya silinir ve kimlik galeriden yerinde çıkarılır
+                        _, gallery = wait_for_models()
+                        delete_known_face(gallery, name, folder)
                         st.success(f"{name} silindi!")
                         st.rerun()
\ No newline at end of file
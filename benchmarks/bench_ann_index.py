@@ -0,0 +1,78 @@
+# IVF indeksinin kesin aramaya göre recall@1 ve gecikme raporu.
+# Sentetik galeri: her kimlik bir merkez etrafında, sorgular aynı kimliğin
+# gürültülü bir örneği (gerçek yüz encoding dağılımına benzer kümelenme).
+#
+# Kullanım:
+#   python benchmarks/bench_ann_index.py [--size 50000] [--queries 500] [--probes 1 2 4 8 16 32]
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ann_index import IVFIndex
+from face_gallery import FaceGallery
+
+
+def synthetic_gallery(size, n_queries, rng):
+    # Encoding'ler yaklaşık birim normlu ve 0.3-0.5 aralığında komşu uzaklıklarına sahip
+    base = rng.standard_normal((size, 128)).astype(np.float32)
+    base /= np.linalg.norm(base, axis=1, keepdims=True)
+    picked = rng.integers(0, size, n_queries)
+    queries = base[picked] + rng.standard_normal((n_queries, 128)).astype(np.float32) * 0.02
+    return base, queries
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--size', type=int, default=50000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--probes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--rerank', type=int, nargs='+', default=[0, 32])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    vectors, queries = synthetic_gallery(args.size, args.queries, rng)
+
+    gallery = FaceGallery(vectors, [str(i) for i in range(args.size)])
+    exact, exact_ms = timed(lambda: np.argmin(gallery.distances(queries), axis=1))
+    _, exact_single_ms = timed(lambda: [np.argmin(gallery.distances(q)) for q in queries])
+
+    index, build_ms = timed(lambda: IVFIndex().build(vectors))
+    print(f"{args.size} kimlik, {args.queries} sorgu, {len(index.lists)} küme (oluşturma {build_ms:.0f} ms)")
+    print(f"Kesin arama: {exact_single_ms / args.queries:.3f} ms/sorgu "
+          f"(toplu: {exact_ms / args.queries:.3f} ms/sorgu)\n")
+    print(f"{'n_probe':>7} {'rerank':>7} {'recall@1':>9} {'ms/sorgu':>9} {'hızlanma':>9}")
+
+    for rerank in args.rerank:
+        index.rerank = rerank
+        for n_probe in args.probes:
+            result, ms = timed(lambda: index.search(queries, k=1, n_probe=n_probe))
+            recall = np.mean(result[0][:, 0] == exact)
+            per_query = ms / args.queries
+            print(f"{n_probe:>7} {rerank:>7} {recall:9.3f} {per_query:9.3f} "
+                  f"{exact_single_ms / args.queries / per_query:8.1f}x")
+
+    # Artımlı ekleme/silme ve kalıcılık
+    _, add_ms = timed(lambda: [index.add(args.size + i, v) for i, v in enumerate(queries[:100])])
+    _, remove_ms = timed(lambda: [index.remove(args.size + i) for i in range(100)])
+    path = os.path.join(tempfile.mkdtemp(), 'index.npz')
+    _, save_ms = timed(lambda: index.save(path))
+    loaded, load_ms = timed(lambda: IVFIndex.load(path))
+    same = np.array_equal(loaded.search(queries[:50])[0], index.search(queries[:50])[0])
+    print(f"\nEkleme: {add_ms / 100:.3f} ms, silme: {remove_ms / 100:.3f} ms, "
+          f"kaydetme: {save_ms:.0f} ms, yükleme: {load_ms:.0f} ms, yüklenen indeks aynı sonuç: {same}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+# Duygu geçmişi depolama motorlarının karşılaştırması (csv / sqlite):
+#   1) --rows satırlık (varsayılan 1M) sentetik CSV geçmişinin SQLite'a toplu aktarımı
+#   2) add_emotion_record ile tek tek, doğrudan (kuyruksuz) kayıt ekleme hızı (kayıt/sn)
+#   3) 1M satır üzerinde sorgu gecikmeleri: son 1 gün, kişi bazında son 1 gün,
+#      duygu istatistikleri ve Duygu Geçmişi sayfasının tüm tabloyu okuması
+# Tüm dosyalar geçici bir klasörde oluşturulur.
+#
+# Kullanım:
+#   python benchmarks/bench_database.py [--rows 1000000] [--inserts 5000] [--repeat 5]
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import EmotionDatabase
+
+EMOTIONS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+
+def write_history_csv(path, rows, people, days=30):
+    # Son `days` güne yayılmış, zamana göre sıralı kayıtlar
+    rng = np.random.default_rng(0)
+    now = datetime.now()
+    offsets = np.sort(rng.uniform(0, days * 86400, rows))[::-1]
+    emotions = rng.integers(0, len(EMOTIONS), rows)
+    confidences = rng.uniform(0.3, 1.0, rows).round(4)
+    faces = rng.integers(0, people, rows)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['timestamp', 'emotion', 'confidence', 'face_id'])
+        for offset, emotion, confidence, face in zip(offsets, emotions, confidences, faces):
+            writer.writerow([(now - timedelta(seconds=float(offset))).isoformat(), EMOTIONS[emotion],
+                             confidence, f"kisi{face}"])
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=1_000_000)
+    parser.add_argument('--inserts', type=int, default=5000)
+    parser.add_argument('--people', type=int, default=50)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as folder:
+        csv_path = os.path.join(folder, 'emotion_history.csv')
+        db_path = os.path.join(folder, 'emotion_history.db')
+        write_history_csv(csv_path, args.rows, args.people)
+        print(f"{args.rows} satırlık geçmiş oluşturuldu ({os.path.getsize(csv_path) / 2 ** 20:.1f} MB CSV)\n")
+
+        start = time.perf_counter()
+        # Doğrudan yazma ölçülür (arka plan yazıcısı için bench_record_writer.py)
+        sqlite_db = EmotionDatabase('sqlite', db_path=db_path, csv_path=csv_path, buffered=False)
+        elapsed = time.perf_counter() - start
+        # Aktarılan veri henüz -wal dosyasındadır; boyut ölçülmeden önce ana dosyaya yazılır
+        with sqlite_db.store._lock:
+            sqlite_db.store.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        print(f"CSV -> SQLite toplu aktarım: {elapsed:.2f} sn ({args.rows / elapsed:,.0f} satır/sn, "
+              f"{os.path.getsize(db_path) / 2 ** 20:.1f} MB veritabanı)\n")
+
+        databases = [('csv', EmotionDatabase('csv', csv_path=csv_path, buffered=False)), ('sqlite', sqlite_db)]
+        print(f"{'motor':<7} {'ekleme/sn':>10} {'son 1 gün':>10} {'kişi+1 gün':>11} {'istatistik':>11} {'tüm tablo':>10}  (ms)")
+        for name, db in databases:
+            start = time.perf_counter()
+            for i in range(args.inserts):
+                db.add_emotion_record(EMOTIONS[i % len(EMOTIONS)], 0.8, f"kisi{i % args.people}")
+            insert_rate = args.inserts / (time.perf_counter() - start)
+
+            last_day = timed(lambda: db.get_emotion_history(days=1), args.repeat)
+            person_day = timed(lambda: db.get_emotion_history(days=1, face_id='kisi7'), args.repeat)
+            stats = timed(db.get_emotion_stats, args.repeat)
+            full = timed(db.get_history_dataframe, args.repeat)
+            print(f"{name:<7} {insert_rate:10,.0f} {last_day:10.1f} {person_day:11.1f} {stats:11.1f} {full:10.1f}")
+            db.close()
+
+
+if __name__ == "__main__":
+    main()
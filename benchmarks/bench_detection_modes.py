@@ -0,0 +1,67 @@
+# Tespit modu karşılaştırması: bir klasördeki görüntülerde "full" ve
+# "downscaled" modlarının tespit süresini ve bulunan yüz sayısını ölçer.
+#
+# Kullanım:
+#   python benchmarks/bench_detection_modes.py <klasör> [--repeat 3] [--backend haar]
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detector import detect_face, get_face_detector
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def time_detection(frame, mode, backend, repeat):
+    best = None
+    faces = ()
+    for _ in range(repeat):
+        start = time.perf_counter()
+        faces = detect_face(frame, backend=backend, mode=mode)
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best, len(faces)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('folder')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--backend', default=None)
+    args = parser.parse_args()
+
+    files = sorted(f for f in os.listdir(args.folder) if f.lower().endswith(IMAGE_EXTENSIONS))
+    if not files:
+        print(f"Uyarı: {args.folder} klasöründe görüntü bulunamadı.")
+        return
+
+    get_face_detector(args.backend)
+
+    totals = {'full': 0.0, 'downscaled': 0.0}
+    print(f"{'dosya':<32} {'boyut':>11} {'full ms':>9} {'yüz':>4} {'down ms':>9} {'yüz':>4}")
+    for file in files:
+        frame = cv2.imread(os.path.join(args.folder, file))
+        if frame is None:
+            print(f"Uyarı: {file} okunamadı.")
+            continue
+
+        full_ms, full_faces = time_detection(frame, 'full', args.backend, args.repeat)
+        down_ms, down_faces = time_detection(frame, 'downscaled', args.backend, args.repeat)
+        totals['full'] += full_ms
+        totals['downscaled'] += down_ms
+        size = f"{frame.shape[1]}x{frame.shape[0]}"
+        print(f"{file[:32]:<32} {size:>11} {full_ms:9.1f} {full_faces:4d} {down_ms:9.1f} {down_faces:4d}")
+
+    saved = totals['full'] - totals['downscaled']
+    ratio = saved / totals['full'] * 100 if totals['full'] > 0 else 0.0
+    print(f"\nToplam: full {totals['full']:.1f} ms, downscaled {totals['downscaled']:.1f} ms")
+    print(f"Kazanılan süre: {saved:.1f} ms (%{ratio:.1f})")
+
+
+if __name__ == "__main__":
+    main()
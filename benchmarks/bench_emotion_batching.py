@@ -0,0 +1,49 @@
+# Duygu modelinin tek tek ve toplu (batch) tahmindeki yüz/saniye değerleri.
+# Rastgele yüz kırpıntıları kullanılır; yalnızca çıkarım süresi ölçülür.
+#
+# Kullanım:
+#   python benchmarks/bench_emotion_batching.py [--sizes 1 2 4 8 16 32 64] [--repeats 5]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_model import EmotionRecognizer
+
+
+def timed(fn, repeats):
+    # En iyi süre alınır, ilk çağrıdaki ısınma maliyeti sonucu bozmaz
+    fn()
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32, 64])
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('--model', default='model/emotion_model.h5')
+    args = parser.parse_args()
+
+    # Aynı kırpıntılar tekrar kullanıldığı için tahmin önbelleği kapatılır
+    recognizer = EmotionRecognizer(args.model, cache_mb=0)
+    rng = np.random.default_rng(0)
+
+    print(f"{'batch':>5} {'tek tek yüz/sn':>15} {'batch yüz/sn':>13} {'hızlanma':>9}")
+    for size in args.sizes:
+        crops = [rng.integers(0, 256, (120, 120, 3), dtype=np.uint8) for _ in range(size)]
+        single = timed(lambda: [recognizer.predict_emotion(c) for c in crops], args.repeats)
+        batched = timed(lambda: recognizer.predict_emotions(crops), args.repeats)
+        print(f"{size:>5} {size / single:15.1f} {size / batched:13.1f} {single / batched:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+# Video modunda duygu modelinin her karede her yüz için çalıştırılması ile
+# değişime bağlı (gated) ve yumuşatılmış çalıştırmanın karşılaştırması:
+# saniyedeki model çağrısı (yüz başına), kare/saniye ve etiket titremesi
+# (bir izin etiketinin saniyede kaç kez değiştiği).
+#
+# Kullanım:
+#   python benchmarks/bench_emotion_gating.py <video_dosyası|kamera_no> [--frames 300] [--max-age 15] [--threshold 6]
+import argparse
+import os
+import sys
+import time
+
+import cv2
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_model import EmotionRecognizer
+from face_detector import load_known_faces
+from face_gallery import FaceGallery
+from face_tracker import FaceTracker, EmotionSmoother
+
+
+def read_frames(source, limit):
+    capture = cv2.VideoCapture(int(source) if source.isdigit() else source)
+    fps = capture.get(cv2.CAP_PROP_FPS) or 30.0
+    frames = []
+    while len(frames) < limit:
+        ok, frame = capture.read()
+        if not ok:
+            break
+        frames.append(frame)
+    capture.release()
+    return frames, fps
+
+
+def run(frames, gallery, smoother, interval):
+    tracker = FaceTracker(gallery, None, smoother.emotion_recognizer, refresh_interval=interval,
+                          emotion_smoother=smoother)
+    flips = 0
+    previous = None
+    start = time.perf_counter()
+    for frame in frames:
+        labels = [face['emotion'] for face in tracker.process(frame)]
+        # Yüz sayısı değişmediyse aynı sıradaki izler karşılaştırılır
+        if previous is not None and len(previous) == len(labels):
+            flips += sum(a != b for a, b in zip(previous, labels))
+        previous = labels
+    return time.perf_counter() - start, flips
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('source')
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--interval', type=int, default=10)
+    parser.add_argument('--max-age', type=int, default=15)
+    parser.add_argument('--threshold', type=float, default=6.0)
+    parser.add_argument('--alpha', type=float, default=0.4)
+    args = parser.parse_args()
+
+    frames, fps = read_frames(args.source, args.frames)
+    if not frames:
+        print(f"Hata: {args.source} kaynağından kare okunamadı.")
+        return
+    video_seconds = len(frames) / fps
+
+    known_encodings, known_names = load_known_faces()
+    gallery = FaceGallery(known_encodings, known_names)
+    # Tekrarlanan kareler önbellekten gelmesin diye tahmin önbelleği kapalı
+    recognizer = EmotionRecognizer(cache_mb=0)
+
+    configs = [
+        # Her karede, yumuşatmasız (eşik negatif -> her zaman çalışır)
+        ('her kare', EmotionSmoother(recognizer, alpha=1.0, max_crop_change=-1.0)),
+        ('değişime bağlı', EmotionSmoother(recognizer, alpha=args.alpha, max_crop_change=args.threshold,
+                                           max_age=args.max_age)),
+    ]
+    print(f"{len(frames)} kare ({video_seconds:.1f} sn video, {fps:.0f} fps)\n")
+    print(f"{'mod':<16} {'çağrı/video sn':>15} {'çağrı/duvar sn':>15} {'kare/sn':>8} {'atlanan':>8} {'titreme/sn':>11}")
+    for label, smoother in configs:
+        elapsed, flips = run(frames, gallery, smoother, args.interval)
+        stats = smoother.get_stats()
+        print(f"{label:<16} {stats['inferences'] / video_seconds:15.1f} {stats['inferences'] / elapsed:15.1f} "
+              f"{len(frames) / elapsed:8.1f} {stats['skip_rate'] * 100:7.1f}% {flips / video_seconds:11.2f}")
+
+
+if __name__ == "__main__":
+    main()
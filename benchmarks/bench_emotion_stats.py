@@ -0,0 +1,93 @@
+# Duygu istatistiklerinin ve Duygu Geçmişi sayfasının gecikmesi: tüm geçmişi
+# okuyup value_counts/groupby ile yeniden saymak (önceki yol) ile sürekli
+# güncellenen (kişi, duygu) özetlerinden okumak karşılaştırılır. Ayrıca özet
+# bakımının ekleme hızına etkisi ve tam yeniden kurma süresi yazdırılır.
+#
+# Kullanım:
+#   python benchmarks/bench_emotion_stats.py [--rows 100000 1000000] [--people 50] [--backends csv sqlite partitioned]
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import EmotionDatabase
+
+EMOTIONS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+
+def fill(db, rows, people, batch=10000, days=90):
+    rng = np.random.default_rng(0)
+    start = datetime.now() - timedelta(days=days)
+    step = days * 86400 / rows
+    for first in range(0, rows, batch):
+        count = min(batch, rows - first)
+        emotions = rng.integers(0, len(EMOTIONS), count)
+        confidences = rng.uniform(0.3, 1.0, count)
+        faces = rng.integers(0, people, count)
+        db.add_emotion_records([((start + timedelta(seconds=(first + i) * step)).isoformat(), EMOTIONS[e], float(c),
+                                 f"kisi{f}", None) for i, (e, c, f) in enumerate(zip(emotions, confidences, faces))])
+
+
+def full_recount(db):
+    # Özetlerden önceki get_emotion_stats ve Duygu Geçmişi sayfası hesabı
+    df = db.get_history_dataframe()
+    df['emotion'].value_counts().to_dict()
+    df.groupby('emotion')['confidence'].mean().to_dict()
+    df[df['face_id'] == 'kisi7']['emotion'].value_counts()
+
+
+def from_aggregates(db):
+    db.get_emotion_stats()
+    df = db.get_aggregates_dataframe()
+    df[df['face_id'] == 'kisi7'].groupby('emotion')['count'].sum()
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[100_000, 1_000_000])
+    parser.add_argument('--people', type=int, default=50)
+    parser.add_argument('--inserts', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--backends', nargs='+', default=['csv', 'sqlite', 'partitioned'])
+    args = parser.parse_args()
+
+    print(f"{'motor':<12} {'satır':>10} {'yeniden sayma ms':>17} {'özetler ms':>11} {'yeniden kurma sn':>17} {'ekleme/sn':>10}")
+    for rows in args.rows:
+        for backend in args.backends:
+            with tempfile.TemporaryDirectory() as folder:
+                db = EmotionDatabase(backend, db_path=os.path.join(folder, 'history.db'),
+                                     csv_path=os.path.join(folder, 'history.csv'),
+                                     history_dir=os.path.join(folder, 'history'), buffered=False)
+                fill(db, rows, args.people)
+                recount_ms = timed(lambda: full_recount(db), args.repeat)
+                aggregates_ms = timed(lambda: from_aggregates(db), args.repeat)
+
+                start = time.perf_counter()
+                db.rebuild_aggregates()
+                rebuild_s = time.perf_counter() - start
+
+                start = time.perf_counter()
+                for i in range(args.inserts):
+                    db.add_emotion_record(EMOTIONS[i % len(EMOTIONS)], 0.8, f"kisi{i % args.people}")
+                insert_rate = args.inserts / (time.perf_counter() - start)
+                print(f"{backend:<12} {rows:>10,} {recount_ms:17.1f} {aggregates_ms:11.2f} {rebuild_s:17.2f} {insert_rate:10,.0f}")
+                db.close()
+
+
+if __name__ == "__main__":
+    main()
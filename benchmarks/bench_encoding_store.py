@@ -0,0 +1,78 @@
+# Encoding önbelleğinin soğuk/sıcak başlangıç süresi.
+#
+# Kullanım:
+#   python benchmarks/bench_encoding_store.py <known_faces_klasörü>
+#   python benchmarks/bench_encoding_store.py --synthetic 5000
+# --synthetic modunda geçici bir klasöre N küçük dosya yazılır ve dlib yerine
+# rastgele encoding üreten bir fonksiyon kullanılır; yalnızca önbellek yükü ölçülür.
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from encoding_store import EncodingStore
+
+
+def timed(label, fn):
+    start = time.perf_counter()
+    result = fn()
+    print(f"{label:<34} {(time.perf_counter() - start) * 1000:9.1f} ms")
+    return result
+
+
+def synthetic(count):
+    folder = tempfile.mkdtemp(prefix='known_faces_')
+    rng = np.random.default_rng(0)
+    try:
+        files = []
+        for i in range(count):
+            name = f"person_{i:06d}.jpg"
+            with open(os.path.join(folder, name), 'wb') as f:
+                f.write(rng.bytes(2048))
+            files.append(name)
+
+        store = EncodingStore(folder)
+        fake_encode = lambda paths: (rng.standard_normal(128) for _ in paths)
+
+        print(f"{count} sentetik dosya")
+        timed("Soğuk başlangıç (hepsi encode)", lambda: store.sync(files, fake_encode))
+        _, names, encoded = timed("Sıcak başlangıç", lambda: store.sync(files, fake_encode))
+        print(f"  sıcak başlangıçta encode edilen: {encoded}, yüklenen: {len(names)}")
+
+        os.remove(os.path.join(folder, files[0]))
+        with open(os.path.join(folder, 'person_new.jpg'), 'wb') as f:
+            f.write(rng.bytes(2048))
+        files = files[1:] + ['person_new.jpg']
+        _, _, encoded = timed("1 silme + 1 ekleme sonrası", lambda: store.sync(files, fake_encode))
+        print(f"  encode edilen: {encoded}")
+    finally:
+        shutil.rmtree(folder)
+
+
+def real(folder):
+    from face_detector import load_known_faces
+    timed("İlk yükleme", lambda: load_known_faces(folder))
+    timed("Sıcak başlangıç", lambda: load_known_faces(folder))
+    timed("Önbelleksiz yükleme", lambda: load_known_faces(folder, use_cache=False))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('folder', nargs='?', default='known_faces')
+    parser.add_argument('--synthetic', type=int, default=0)
+    args = parser.parse_args()
+
+    if args.synthetic:
+        synthetic(args.synthetic)
+    else:
+        real(args.folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# Yüz tespiti gecikme ölçümü: her karede yeni CascadeClassifier oluşturma
+# ile dedektör kaydından (registry) alınan hazır dedektörü karşılaştırır.
+#
+# Kullanım:
+#   python benchmarks/bench_face_detection.py [görüntü_yolu] [--frames 100] [--backend haar]
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detector import detect_face, get_face_detector
+
+
+def legacy_detect_face(frame):
+    # Eski davranış: her çağrıda XML diskten okunup ayrıştırılır
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
+    return face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
+
+
+def measure(fn, frame, frames):
+    timings = []
+    for _ in range(frames):
+        start = time.perf_counter()
+        fn(frame)
+        timings.append((time.perf_counter() - start) * 1000)
+    return np.array(timings)
+
+
+def report(label, timings):
+    print(f"{label:<28} ort: {timings.mean():7.2f} ms  p50: {np.percentile(timings, 50):7.2f} ms  "
+          f"p95: {np.percentile(timings, 95):7.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('image', nargs='?', help="Test görüntüsü (verilmezse 640x480 rastgele kare)")
+    parser.add_argument('--frames', type=int, default=100)
+    parser.add_argument('--backend', default='haar')
+    args = parser.parse_args()
+
+    if args.image:
+        frame = cv2.imread(args.image)
+        if frame is None:
+            print(f"Hata: {args.image} okunamadı.")
+            return
+    else:
+        frame = np.random.default_rng(0).integers(0, 255, (480, 640, 3), dtype=np.uint8)
+
+    print(f"Kare boyutu: {frame.shape[1]}x{frame.shape[0]}, {args.frames} kare")
+
+    # Kayıttaki dedektör ilk çağrıda yüklenir; ısınma ölçüme dahil edilmez
+    get_face_detector(args.backend)
+
+    report("Önce (kare başına cascade)", measure(legacy_detect_face, frame, args.frames))
+    report(f"Sonra (registry, {args.backend})", measure(lambda f: detect_face(f, backend=args.backend), frame, args.frames))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+# FaceGallery ile yüz başına face_recognition.face_distance döngüsünün
+# karşılaştırması (10, 1k ve 100k kimlikli galeriler).
+#
+# Kullanım:
+#   python benchmarks/bench_face_gallery.py [--faces 4] [--repeat 20] [--sizes 10 1000 100000]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import face_recognition
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_gallery import FaceGallery
+
+
+def per_face_loop(known_encodings, queries):
+    # Eski yol: her yüz için liste -> dizi dönüşümü ve ayrı uzaklık hesabı
+    results = []
+    for query in queries:
+        distances = face_recognition.face_distance(known_encodings, query)
+        best = int(np.argmin(distances))
+        results.append(best)
+    return results
+
+
+def best_of(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--faces', type=int, default=4)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10, 1000, 100000])
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"Kare başına {args.faces} yüz")
+    print(f"{'kimlik':>8} {'döngü ms':>10} {'galeri ms':>10} {'hızlanma':>9} {'aynı sonuç':>11}")
+
+    for size in args.sizes:
+        known = rng.standard_normal((size, 128)) * 0.1
+        known_encodings = list(known)
+        names = [f"kisi_{i}" for i in range(size)]
+        queries = known[rng.integers(0, size, args.faces)] + rng.standard_normal((args.faces, 128)) * 0.01
+
+        gallery = FaceGallery(known_encodings, names)
+        loop_ms = best_of(lambda: per_face_loop(known_encodings, queries), args.repeat)
+        gallery_ms = best_of(lambda: gallery.match(queries, k=1), args.repeat)
+
+        expected = [names[i] for i in per_face_loop(known_encodings, queries)]
+        actual = [m[0][0] for m in gallery.match(queries, k=1)]
+        print(f"{size:>8} {loop_ms:10.3f} {gallery_ms:10.3f} {loop_ms / gallery_ms:8.1f}x {str(expected == actual):>11}")
+
+
+if __name__ == "__main__":
+    main()
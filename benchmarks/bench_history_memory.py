@@ -0,0 +1,159 @@
+# Duygu geçmişinin bellek ayak izi: --rows kayıt (varsayılan 10M) için
+#   dataframe -> pd.read_csv (nesne tipli emotion/face_id metinleri)
+#   rows      -> read_csv + df.values.tolist() (önceki get_emotion_history çıktısı)
+#   columns   -> EmotionColumns diske yazılmış sütunlardan belleğe okunur
+#   mmap      -> EmotionColumns np.memmap ile açılır, son --days gün dilimlenir
+# karşılaştırılır. Veri üretimi ve her biçim ayrı bir süreçte çalışır (tepe
+# RSS exec sonrasında da ana süreçten devralındığından; Linux). rows biçimi çok bellek istediğinden --list-rows kayıtla
+# ölçülüp --rows'a doğrusal ölçeklenir. Ayrıca yükleme ve analiz
+# (AdvancedAnalyzer) süreleri yazdırılır.
+#
+# Kullanım:
+#   python benchmarks/bench_history_memory.py [--rows 10000000] [--list-rows 2000000] [--days 7]
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from emotion_columns import EmotionColumns, to_epoch_us
+
+EMOTIONS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+
+def generate(folder, rows, people, span_days, chunk=1_000_000):
+    # Aynı geçmiş hem CSV (timestamp, emotion, confidence, face_id) hem sütun dosyaları olarak yazılır
+    rng = np.random.default_rng(0)
+    end = to_epoch_us(datetime.now())
+    timestamp = np.sort(rng.integers(end - span_days * 86_400_000_000, end, rows))
+    columns = EmotionColumns.from_arrays(timestamp, rng.integers(0, len(EMOTIONS), rows),
+                                         rng.uniform(0.3, 1.0, rows), rng.integers(0, people, rows),
+                                         EMOTIONS, [f"kisi{i}" for i in range(people)])
+    columns.save(os.path.join(folder, 'columns'))
+    csv_path = os.path.join(folder, 'history.csv')
+    timestamps, emotions, faces = columns.timestamps(), columns.emotions(), columns.faces()
+    for first in range(0, rows, chunk):
+        part = slice(first, first + chunk)
+        pd.DataFrame({
+            'timestamp': np.datetime_as_string(timestamps[part], unit='us'),
+            'emotion': emotions[part],
+            'confidence': columns.confidence[part].round(4),
+            'face_id': faces[part],
+        }).to_csv(csv_path, mode='a', header=first == 0, index=False)
+    return csv_path
+
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def run_worker(args):
+    # Alt süreç: tek bir biçimi yükler, RSS artışını ve süreleri JSON olarak yazar
+    from advanced_analysis import AdvancedAnalyzer
+    from database import EmotionDatabase
+
+    analyzer = AdvancedAnalyzer(EmotionDatabase('csv', csv_path=os.path.join(args.folder, 'analyzer', 'history.csv'),
+                                                buffered=False))
+    base = rss_bytes()
+    start = time.perf_counter()
+    nbytes = None
+    if args.worker in ('dataframe', 'rows'):
+        df = pd.read_csv(os.path.join(args.folder, 'history.csv'), nrows=args.list_rows if args.worker == 'rows' else None)
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+        nbytes = int(df.memory_usage(deep=True).sum())
+        data = df
+        if args.worker == 'rows':
+            data = df.values.tolist()
+            del df
+    else:
+        columns = EmotionColumns.open(os.path.join(args.folder, 'columns'), mmap=args.worker == 'mmap', check_order=False)
+        if args.worker == 'mmap':
+            columns = columns.last(args.days)
+        nbytes = columns.nbytes
+        data = columns
+    load_s = time.perf_counter() - start
+    loaded = rss_bytes() - base
+
+    start = time.perf_counter()
+    if args.worker == 'rows':
+        clean = [row for row in data if isinstance(row[1], str) and row[1] in analyzer.emotion_weights]
+        analyzer.calculate_stress_level(clean)
+        analyzer.calculate_productivity_score(clean)
+        analyzer.estimate_sleep_quality(clean)
+        analyzer.analyze_emotion_trends(clean)
+    elif args.worker in ('columns', 'mmap'):
+        analyzer.analyze_columns(data)
+    analysis_s = time.perf_counter() - start
+    print(json.dumps({'records': len(data), 'nbytes': nbytes, 'rss': loaded, 'after_analysis': rss_bytes() - base,
+                      'peak': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024 - base,
+                      'load_s': load_s, 'analysis_s': analysis_s}))
+
+
+def measure(mode, folder, args):
+    output = subprocess.run([sys.executable, os.path.abspath(__file__), '--worker', mode, '--folder', folder,
+                             '--rows', str(args.rows), '--list-rows', str(args.list_rows), '--people', str(args.people),
+                             '--span-days', str(args.span_days), '--days', str(args.days)],
+                            cwd=ROOT, capture_output=True, text=True)
+    if output.returncode != 0:
+        print(output.stderr[-2000:])
+        return None
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=10_000_000)
+    parser.add_argument('--list-rows', type=int, default=2_000_000)
+    parser.add_argument('--people', type=int, default=50)
+    parser.add_argument('--span-days', type=int, default=90)
+    parser.add_argument('--days', type=int, default=7)
+    parser.add_argument('--worker', help=argparse.SUPPRESS)
+    parser.add_argument('--folder', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker == 'generate':
+        generate(args.folder, args.rows, args.people, args.span_days)
+        print(json.dumps({}))
+        return
+    if args.worker:
+        run_worker(args)
+        return
+
+    args.list_rows = min(args.list_rows, args.rows)
+    with tempfile.TemporaryDirectory() as folder:
+        start = time.perf_counter()
+        if measure('generate', folder, args) is None:
+            return
+        print(f"{args.rows:,} kayıt, {args.span_days} gün, {args.people} kişi ({time.perf_counter() - start:.0f} sn'de üretildi)")
+        print(f"CSV {os.path.getsize(os.path.join(folder, 'history.csv')) / 2**20:,.0f} MB, sütun dosyaları "
+              f"{sum(e.stat().st_size for e in os.scandir(os.path.join(folder, 'columns'))) / 2**20:,.0f} MB "
+              f"(float16 güvenle {args.rows * 15 / 2**20:,.0f} MB)\n")
+        print(f"{'biçim':<10} {'kayıt':>11} {'veri MB':>9} {'RSS MB':>9} {'tepe MB':>9} {'yükleme sn':>11} {'analiz sn':>10}")
+        for mode in ('dataframe', 'rows', 'columns', 'mmap'):
+            result = measure(mode, folder, args)
+            if result is None:
+                continue
+            # rows biçimi --list-rows kayıtla ölçülür ve --rows'a ölçeklenir
+            scale = args.rows / args.list_rows if mode == 'rows' else 1
+            label = mode + (' *' if scale != 1 else '')
+            data_mb = f"{result['nbytes'] * scale / 2**20:9,.0f}" if mode != 'rows' else f"{'-':>9}"
+            print(f"{label:<10} {result['records'] * scale:>11,.0f} {data_mb} {result['rss'] * scale / 2**20:9,.0f} "
+                  f"{result['peak'] * scale / 2**20:9,.0f} {result['load_s'] * scale:11.2f} {result['analysis_s'] * scale:10.2f}")
+        if args.list_rows != args.rows:
+            print(f"\n* {args.list_rows:,} kayıtla ölçülüp {args.rows:,} kayda doğrusal ölçeklendi")
+        print(f"mmap: yalnızca son {args.days} günün dilimi; dokunulan sayfalar RSS'e yansır")
+
+
+if __name__ == "__main__":
+    main()
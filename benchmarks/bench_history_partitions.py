@@ -0,0 +1,80 @@
+# Toplam geçmiş uzadıkça "son N gün" sorgusunun gecikmesi: csv, sqlite ve
+# gün bölümlü (partitioned) depolar, günde --rows-per-day kayıtla --days
+# uzunluğunda geçmişlerle doldurulur. Her biri için get_emotion_history(days=7),
+# kişi filtreli get_emotion_history(days=7, face_id=...) ve bölümlü depoda
+# açılan gün klasörü sayısı yazdırılır. Bölümlü depoda gecikme geçmiş
+# uzunluğundan bağımsız kalmalıdır.
+#
+# Kullanım:
+#   python benchmarks/bench_history_partitions.py [--days 30 180 720] [--rows-per-day 2000] [--window 7]
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import EmotionDatabase
+
+EMOTIONS = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
+
+
+def history_rows(days, rows_per_day, people, seed=0):
+    # Gün gün, zamana göre sıralı (timestamp, emotion, confidence, face_id, additional_data) satırları
+    rng = np.random.default_rng(seed)
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    for day in range(days - 1, -1, -1):
+        start = today - timedelta(days=day)
+        seconds = np.sort(rng.uniform(0, 86400, rows_per_day))
+        emotions = rng.integers(0, len(EMOTIONS), rows_per_day)
+        confidences = rng.uniform(0.3, 1.0, rows_per_day)
+        faces = rng.integers(0, people, rows_per_day)
+        yield [((start + timedelta(seconds=float(s))).isoformat(), EMOTIONS[e], float(c), f"kisi{f}", None)
+               for s, e, c, f in zip(seconds, emotions, confidences, faces)]
+
+
+def timed(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return np.median(times) * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--days', type=int, nargs='+', default=[30, 180, 720])
+    parser.add_argument('--rows-per-day', type=int, default=2000)
+    parser.add_argument('--people', type=int, default=50)
+    parser.add_argument('--window', type=int, default=7)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--backends', nargs='+', default=['csv', 'sqlite', 'partitioned'])
+    args = parser.parse_args()
+
+    print(f"{'motor':<12} {'gün':>5} {'satır':>10} {'son N gün ms':>13} {'kişi+N gün ms':>14} {'sonuç':>7} {'açılan gün':>11}")
+    for days in args.days:
+        for backend in args.backends:
+            with tempfile.TemporaryDirectory() as folder:
+                db = EmotionDatabase(backend, db_path=os.path.join(folder, 'history.db'),
+                                     csv_path=os.path.join(folder, 'history.csv'),
+                                     history_dir=os.path.join(folder, 'history'), buffered=False)
+                for rows in history_rows(days, args.rows_per_day, args.people):
+                    db.add_emotion_records(rows)
+
+                window_ms, result = timed(lambda: db.get_emotion_history(days=args.window), args.repeat)
+                person_ms, _ = timed(lambda: db.get_emotion_history(days=args.window, face_id='kisi7'), args.repeat)
+                opened = '-'
+                if backend == 'partitioned':
+                    opened = len(db.store.partitions(datetime.now() - timedelta(days=args.window)))
+                print(f"{backend:<12} {days:>5} {days * args.rows_per_day:>10,} {window_ms:13.1f} {person_ms:14.1f} "
+                      f"{len(result):>7} {opened:>11}")
+                db.close()
+
+
+if __name__ == "__main__":
+    main()
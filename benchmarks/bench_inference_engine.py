@@ -0,0 +1,55 @@
+# model.predict ile derlenmiş çıkarım motorunun çağrı başına gecikmesi.
+# Aynı girişte iki yolun çıktıları arasındaki en büyük fark da raporlanır.
+#
+# Kullanım:
+#   python benchmarks/bench_inference_engine.py [--sizes 1 4 16 64] [--calls 200]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_model import EmotionRecognizer
+
+
+def latencies(fn, calls):
+    fn()
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return np.percentile(times, 50), np.percentile(times, 95)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 4, 16, 64])
+    parser.add_argument('--calls', type=int, default=200)
+    parser.add_argument('--model', default='model/emotion_model.h5')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    recognizer = EmotionRecognizer(args.model, use_engine=True)
+    print(f"Yükleme + tüm kovaların ısıtılması: {time.perf_counter() - start:.1f} sn "
+          f"(kovalar: {recognizer.engine.buckets})\n")
+
+    model = recognizer.model
+    engine = recognizer.engine
+    rng = np.random.default_rng(0)
+
+    print(f"{'batch':>5} {'predict p50/p95 ms':>20} {'motor p50/p95 ms':>18} {'hızlanma':>9} {'en büyük fark':>14}")
+    for size in args.sizes:
+        batch = rng.random((size,) + engine.sample_shape).astype(np.float32)
+        predict_p50, predict_p95 = latencies(lambda: model.predict(batch, batch_size=size, verbose=0), args.calls)
+        engine_p50, engine_p95 = latencies(lambda: engine(batch), args.calls)
+        diff = np.abs(model.predict(batch, batch_size=size, verbose=0) - engine(batch)).max()
+        print(f"{size:>5} {predict_p50:9.2f} / {predict_p95:7.2f} {engine_p50:8.2f} / {engine_p95:7.2f} "
+              f"{predict_p50 / engine_p50:8.1f}x {diff:14.2e}")
+
+
+if __name__ == "__main__":
+    main()
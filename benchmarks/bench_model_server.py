@@ -0,0 +1,129 @@
+# Duygu modeli sunucusu yük testi: sunucu ayrı bir süreçte başlatılır ve
+# 1, 8 ve 32 eşzamanlı istemci (her biri kendi bağlantısıyla) sabit süre
+# boyunca tek yüzlük istekler gönderir. Her istemci sayısı için p50/p99
+# gecikme, saniyedeki yüz sayısı ve "meşgul" yanıtıyla reddedilen istekler
+# yazdırılır. --baseline ile aynı yük, tek bir paylaşılan EmotionRecognizer'ı
+# doğrudan çağıran iş parçacıklarıyla da ölçülür (st.cache_resource davranışı).
+#
+# Kullanım:
+#   python benchmarks/bench_model_server.py [--clients 1 8 32] [--duration 10] [--faces 1] [--max-wait-ms 5] [--baseline]
+import argparse
+import os
+import secrets
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from emotion_server import EmotionClient, ServerBusyError
+
+
+def connect(address, server, authkey, timeout=120.0):
+    # Sunucu süreci model yükleyip dinlemeye başlayana kadar bekler
+    deadline = time.monotonic() + timeout
+    while True:
+        if server.poll() is not None:
+            raise RuntimeError(f"Duygu modeli sunucusu başlatılamadı (çıkış kodu {server.returncode})")
+        try:
+            return EmotionClient(address, authkey)
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def run_clients(predictors, duration, batch):
+    clients = len(predictors)
+    latencies = [[] for _ in range(clients)]
+    rejected = [0] * clients
+    barrier = threading.Barrier(clients + 1)
+
+    def worker(i):
+        predict = predictors[i]
+        barrier.wait()
+        deadline = time.perf_counter() + duration
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            try:
+                predict(batch)
+            except ServerBusyError:
+                rejected[i] += 1
+                # Geri basınç: istemci kısa bir süre bekleyip yeniden dener
+                time.sleep(0.001)
+                continue
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return np.concatenate([np.asarray(l) for l in latencies]) * 1000, sum(rejected), elapsed
+
+
+def report(label, clients, latencies, rejected, elapsed, faces):
+    if len(latencies) == 0:
+        print(f"{label:<10} {clients:>8} {'-':>9} {'-':>9} {0:>10.1f} {rejected:>9}")
+        return
+    p50, p99 = np.percentile(latencies, [50, 99])
+    throughput = len(latencies) * faces / elapsed
+    print(f"{label:<10} {clients:>8} {p50:9.2f} {p99:9.2f} {throughput:10.1f} {rejected:>9}")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--faces', type=int, default=1, help='istek başına yüz sayısı')
+    parser.add_argument('--address', default='127.0.0.1:6011')
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--max-pending', type=int, default=256)
+    parser.add_argument('--baseline', action='store_true')
+    args = parser.parse_args()
+
+    # Ölçüm için tek kullanımlık bağlantı anahtarı
+    authkey = secrets.token_hex(32)
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, 'emotion_server.py'),
+                               '--address', args.address, '--max-batch', str(args.max_batch),
+                               '--max-wait-ms', str(args.max_wait_ms), '--max-pending', str(args.max_pending)],
+                              cwd=ROOT, env=dict(os.environ, EMOTION_SERVER_AUTHKEY=authkey))
+    try:
+        probe = connect(args.address, server, authkey.encode())
+        h, w, c = probe.sample_shape
+        batch = np.random.default_rng(0).random((args.faces, h, w, c), dtype=np.float32)
+        probe.predict_batch(batch)
+        probe.close()
+
+        print(f"{'mod':<10} {'istemci':>8} {'p50 ms':>9} {'p99 ms':>9} {'yüz/sn':>10} {'reddedilen':>9}")
+        for clients in args.clients:
+            connections = [EmotionClient(args.address, authkey.encode()) for _ in range(clients)]
+            latencies, rejected, elapsed = run_clients([client.predict_batch for client in connections],
+                                                       args.duration, batch)
+            for client in connections:
+                client.close()
+            report('sunucu', clients, latencies, rejected, elapsed, args.faces)
+    finally:
+        server.terminate()
+        server.wait()
+
+    if args.baseline:
+        from emotion_model import EmotionRecognizer
+
+        recognizer = EmotionRecognizer(cache_mb=0)
+        recognizer.predict_batch(batch)
+        for clients in args.clients:
+            latencies, rejected, elapsed = run_clients([recognizer.predict_batch] * clients, args.duration, batch)
+            report('paylaşılan', clients, latencies, rejected, elapsed, args.faces)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# Galeri encode işleminin sıralı ve süreç havuzlu sürelerini karşılaştırır,
+# iki yolun aynı sonucu ürettiğini doğrular. Önbellek kullanılmaz.
+#
+# Kullanım:
+#   python benchmarks/bench_parallel_enrollment.py [known_faces_klasörü] [--workers 4]
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detector import list_known_face_files
+from gallery_enrollment import encode_images
+
+
+def run(paths, workers):
+    def progress(done, total, result):
+        status = "hata: " + result.error if result.error else "ok"
+        print(f"\r  [{done}/{total}] {os.path.basename(result.path)[:40]:<40} {status[:30]:<30}", end='')
+
+    start = time.perf_counter()
+    results = list(encode_images(paths, workers=workers, progress=progress))
+    elapsed = time.perf_counter() - start
+    print()
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('folder', nargs='?', default='known_faces')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    paths = [os.path.join(args.folder, f) for f in list_known_face_files(args.folder)]
+    if not paths:
+        print(f"Uyarı: {args.folder} klasöründe görüntü bulunamadı.")
+        return
+
+    print(f"{len(paths)} görüntü")
+    sequential, seq_time = run(paths, workers=1)
+    parallel, par_time = run(paths, workers=args.workers)
+
+    identical = all(
+        a.path == b.path and a.error == b.error
+        and (a.encoding is None) == (b.encoding is None)
+        and (a.encoding is None or np.array_equal(a.encoding, b.encoding))
+        for a, b in zip(sequential, parallel)
+    )
+    failures = [r for r in parallel if r.error]
+    print(f"Sıralı:               {seq_time:7.1f} sn")
+    print(f"Süreç havuzu ({args.workers:>2} işçi): {par_time:7.1f} sn ({seq_time / par_time:.1f}x)")
+    print(f"Aynı sonuç: {identical}, başarısız dosya: {len(failures)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+# Streamlit yeniden çalıştırmalarını taklit ederek tahmin önbelleği ve kare
+# önbelleği raporu: her görüntü --reruns kez analiz edilir, "perceptual" mod
+# için ayrıca görüntünün yeniden JPEG sıkıştırılmış bir kopyası da gönderilir.
+# Her mod için ms/analiz, isabet oranı ve kullanılan bellek yazdırılır.
+#
+# Kullanım:
+#   python benchmarks/bench_prediction_cache.py <görüntü_klasörü> [--reruns 5] [--limit 50]
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_model import EmotionRecognizer, PredictionCache, FrameResultCache
+from face_detector import detect_face, load_known_faces, recognize_faces_in_frame
+from face_gallery import FaceGallery
+
+
+def load_images(folder, limit):
+    images = []
+    for root, _, files in sorted(os.walk(folder)):
+        for file in sorted(files):
+            if file.lower().endswith(('.jpg', '.jpeg', '.png')):
+                with open(os.path.join(root, file), 'rb') as f:
+                    images.append(f.read())
+            if len(images) >= limit:
+                return images
+    return images
+
+
+def reencode(image_bytes, quality=80):
+    img = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    return cv2.imencode('.jpg', img, [cv2.IMWRITE_JPEG_QUALITY, quality])[1].tobytes()
+
+
+def workload(images, reruns, near_duplicates):
+    # Her görüntü art arda reruns kez (etkileşim başına bir yeniden çalıştırma)
+    requests = []
+    for image_bytes in images:
+        requests.extend([image_bytes] * reruns)
+        if near_duplicates:
+            requests.append(reencode(image_bytes))
+    return requests
+
+
+def format_stats(stats):
+    return f"%{stats['hit_ratio'] * 100:5.1f} isabet, {stats['entries']:5d} kayıt, {stats['bytes_used'] / 1024:8.1f} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('folder')
+    parser.add_argument('--reruns', type=int, default=5)
+    parser.add_argument('--limit', type=int, default=50)
+    parser.add_argument('--cache-mb', type=float, default=16)
+    parser.add_argument('--known-faces', default='known_faces')
+    args = parser.parse_args()
+
+    images = load_images(args.folder, args.limit)
+    if not images:
+        print(f"Uyarı: {args.folder} klasöründe görüntü bulunamadı.")
+        return
+    decoded = {}
+
+    def decode(image_bytes):
+        if image_bytes not in decoded:
+            decoded[image_bytes] = cv2.imdecode(np.frombuffer(image_bytes, np.uint8), cv2.IMREAD_COLOR)
+        return decoded[image_bytes]
+
+    recognizer = EmotionRecognizer(cache_mb=0)
+    requests = workload(images, args.reruns, near_duplicates=True)
+    faces = {image_bytes: detect_face(decode(image_bytes)) for image_bytes in set(requests)}
+    print(f"{len(images)} görüntü, {len(requests)} analiz (her görüntü {args.reruns} kez + 1 yeniden sıkıştırılmış kopya)\n")
+
+    # 1) Yüz başına duygu tahmini önbelleği
+    print("Duygu tahmini (yüz tespiti hariç):")
+    for mode in (None, 'exact', 'perceptual'):
+        recognizer.cache = PredictionCache(args.cache_mb * 2 ** 20, mode) if mode else None
+        start = time.perf_counter()
+        for image_bytes in requests:
+            recognizer.predict_frame_emotions(decode(image_bytes), faces[image_bytes])
+        ms = (time.perf_counter() - start) * 1000 / len(requests)
+        stats = format_stats(recognizer.cache.get_stats()) if recognizer.cache else "önbellek yok"
+        print(f"  {mode or 'kapalı':<11} {ms:8.2f} ms/analiz  {stats}")
+
+    # 2) Görüntü baytlarına göre kare sonucu önbelleği (tespit + tanıma + duygu)
+    recognizer.cache = None
+    known_encodings, known_names = load_known_faces(args.known_faces)
+    gallery = FaceGallery(known_encodings, known_names)
+    print("\nKare analizi (tespit + tanıma + duygu):")
+    for enabled in (False, True):
+        frame_cache = FrameResultCache(args.cache_mb * 2 ** 20)
+        start = time.perf_counter()
+        for image_bytes in requests:
+            key = frame_cache.key(image_bytes, gallery.version)
+            if not enabled or frame_cache.get(key) is None:
+                result = recognize_faces_in_frame(decode(image_bytes), gallery, None, recognizer)
+                if enabled:
+                    frame_cache.put(key, result)
+        ms = (time.perf_counter() - start) * 1000 / len(requests)
+        stats = format_stats(frame_cache.get_stats()) if enabled else "önbellek yok"
+        print(f"  {'açık' if enabled else 'kapalı':<11} {ms:8.2f} ms/analiz  {stats}")
+
+
+if __name__ == "__main__":
+    main()
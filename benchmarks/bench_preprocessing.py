@@ -0,0 +1,87 @@
+# Duygu modeli ön işlemesinin kare başına süre ve bellek ayırma raporu.
+# "Önceki" yol her yüz için ayrı gri dönüşüm, resize, astype/255 ve
+# expand_dims yapar; "yeni" yol FacePreprocessor ile yakın yüzlerin bölgesini
+# bir kez (dağınık yüzlerde her kutuyu ayrı) gri tonlamaya çevirip yüzleri
+# önceden ayrılmış batch dizisine yazar.
+# Ayırmalar tracemalloc ile ölçülür (NumPy ve OpenCV çıktı dizileri dahil).
+# Model yüklenmez; yalnızca ön işleme ölçülür.
+#
+# Kullanım:
+#   python benchmarks/bench_preprocessing.py [--faces 1 4 16] [--frames 500] [--size 48]
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from emotion_model import FacePreprocessor
+
+
+def legacy_preprocess(frame, faces, input_shape):
+    # Değişiklikten önceki predict_emotion ön işlemesi (yüz başına)
+    batch = []
+    for (x, y, w, h) in faces:
+        face_img = frame[y:y+h, x:x+w]
+        face_img = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
+        face_img = cv2.resize(face_img, input_shape)
+        face_img = face_img.astype('float32') / 255.0
+        face_img = np.expand_dims(face_img, axis=0)
+        face_img = np.expand_dims(face_img, axis=-1)
+        batch.append(face_img)
+    return np.concatenate(batch)
+
+
+def measure(fn, frames):
+    fn(frames[0])
+
+    start = time.perf_counter()
+    for frame in frames:
+        fn(frame)
+    per_frame_ms = (time.perf_counter() - start) * 1000 / len(frames)
+
+    # Kare başına ayrılan geçici bellek: her karede tepe değeri sıfırlanır
+    tracemalloc.start()
+    peaks = []
+    blocks = []
+    for frame in frames[:50]:
+        before = tracemalloc.take_snapshot()
+        tracemalloc.reset_peak()
+        base = tracemalloc.get_traced_memory()[0]
+        fn(frame)
+        peaks.append(tracemalloc.get_traced_memory()[1] - base)
+        after = tracemalloc.take_snapshot()
+        blocks.append(sum(max(stat.count_diff, 0) for stat in after.compare_to(before, 'lineno')))
+    tracemalloc.stop()
+    return per_frame_ms, np.mean(peaks), np.mean(blocks)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--faces', type=int, nargs='+', default=[1, 4, 16])
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--size', type=int, default=48)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    frames = [rng.integers(0, 256, (480, 640, 3), dtype=np.uint8) for _ in range(8)]
+    frames = [frames[i % len(frames)] for i in range(args.frames)]
+    preprocessor = FacePreprocessor((args.size, args.size, 1))
+
+    print(f"{'yüz':>4} {'yol':<7} {'ms/kare':>8} {'tepe KB/kare':>13} {'kalan blok/kare':>16}")
+    for count in args.faces:
+        faces = [(int(x), int(y), 96, 96) for x, y in zip(rng.integers(0, 640 - 96, count), rng.integers(0, 480 - 96, count))]
+        for label, fn in (
+            ('önceki', lambda frame: legacy_preprocess(frame, faces, (args.size, args.size))),
+            ('yeni', lambda frame: preprocessor.from_frame(frame, faces)),
+        ):
+            ms, peak, blocks = measure(fn, frames)
+            print(f"{count:>4} {label:<7} {ms:8.3f} {peak / 1024:13.1f} {blocks:16.1f}")
+
+
+if __name__ == "__main__":
+    main()
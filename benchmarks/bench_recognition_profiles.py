@@ -0,0 +1,91 @@
+# Tanıma profillerinin yüz başına encoding süresi ve doğruluk karşılaştırması.
+# Etiketli klasör yapısı: <klasör>/<kişi_adı>/*.jpg ; kişi adları known_faces
+# içindeki kayıtlarla aynı olmalıdır.
+#
+# Kullanım:
+#   python benchmarks/bench_recognition_profiles.py <etiketli_klasör> [--tolerance 0.6]
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import face_recognition
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from face_detector import RECOGNITION_PROFILES, detect_face, encode_faces, load_known_faces
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Eski davranış: Haar kırpıntısında dlib yeniden tespit yapar, 3 jitter
+LEGACY_PROFILE = {'num_jitters': 3, 'model': 'large', 'use_known_location': False}
+
+
+def load_samples(folder):
+    samples = []
+    for person in sorted(os.listdir(folder)):
+        person_dir = os.path.join(folder, person)
+        if not os.path.isdir(person_dir):
+            continue
+        for file in sorted(os.listdir(person_dir)):
+            if not file.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            frame = cv2.imread(os.path.join(person_dir, file))
+            if frame is None:
+                continue
+            faces = detect_face(frame)
+            if len(faces) == 0:
+                continue
+            # Birden fazla yüz varsa en büyüğü etiketli kişi kabul edilir
+            largest = max(faces, key=lambda f: f[2] * f[3])
+            samples.append((person, frame, [tuple(int(v) for v in largest)]))
+    return samples
+
+
+def evaluate(samples, known_encodings, known_names, profile, tolerance):
+    timings = []
+    correct = 0
+    for person, frame, faces in samples:
+        start = time.perf_counter()
+        encodings = encode_faces(frame, faces, profile)
+        timings.append((time.perf_counter() - start) * 1000)
+
+        predicted = "Unknown"
+        if encodings and encodings[0] is not None and known_encodings:
+            distances = face_recognition.face_distance(known_encodings, encodings[0])
+            best = int(np.argmin(distances))
+            if distances[best] <= tolerance:
+                predicted = known_names[best]
+        correct += predicted == person
+    return np.array(timings), correct / len(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('folder')
+    parser.add_argument('--tolerance', type=float, default=0.6)
+    args = parser.parse_args()
+
+    known_encodings, known_names = load_known_faces()
+    samples = load_samples(args.folder)
+    if not samples:
+        print(f"Uyarı: {args.folder} içinde yüz içeren etiketli görüntü bulunamadı.")
+        return
+
+    print(f"{len(samples)} etiketli yüz, {len(known_names)} kayıtlı kişi")
+    print(f"{'profil':<10} {'ort ms':>8} {'p95 ms':>8} {'doğruluk':>9}")
+
+    profiles = [('legacy', LEGACY_PROFILE)] + list(RECOGNITION_PROFILES.items())
+    baseline = None
+    for name, profile in profiles:
+        timings, accuracy = evaluate(samples, known_encodings, known_names, profile, args.tolerance)
+        if baseline is None:
+            baseline = accuracy
+        print(f"{name:<10} {timings.mean():8.1f} {np.percentile(timings, 95):8.1f} "
+              f"{accuracy * 100:8.1f}% ({(accuracy - baseline) * 100:+.1f})")
+
+
+if __name__ == "__main__":
+    main()
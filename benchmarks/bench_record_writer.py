@@ -0,0 +1,82 @@
+# Analiz sonrası kayıt döngüsünün (kare başına yüz sayısı kadar
+# add_emotion_record çağrısı) çağıran tarafa yansıyan gecikmesi: doğrudan
+# yazma ile arka plan yazıcısı karşılaştırılır. --sessions eşzamanlı oturum
+# her biri --frames analiz kaydeder. Arka plan yazıcısı için kuyruk
+# derinliği, batch boyu, yazım gecikmesi ve düşürülen kayıtlar da yazdırılır.
+#
+# Kullanım:
+#   python benchmarks/bench_record_writer.py [--sessions 1 8] [--frames 500] [--faces 4] [--policy block]
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import EmotionDatabase
+
+
+def run_sessions(db, sessions, frames, faces):
+    latencies = [[] for _ in range(sessions)]
+    barrier = threading.Barrier(sessions + 1)
+
+    def session(i):
+        barrier.wait()
+        for frame in range(frames):
+            start = time.perf_counter()
+            for face in range(faces):
+                db.add_emotion_record('happy', 0.9, f"kisi{i}_{face}")
+            latencies[i].append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return np.concatenate([np.asarray(l) for l in latencies]) * 1000, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sessions', type=int, nargs='+', default=[1, 8])
+    parser.add_argument('--frames', type=int, default=500)
+    parser.add_argument('--faces', type=int, default=4)
+    parser.add_argument('--backends', nargs='+', default=['csv', 'sqlite'])
+    parser.add_argument('--policy', default='block')
+    parser.add_argument('--queue-size', type=int, default=10000)
+    parser.add_argument('--fsync-interval', type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'motor':<7} {'mod':<8} {'oturum':>6} {'p50 ms':>8} {'p99 ms':>8} {'kayıt/sn':>10}  yazıcı")
+    for backend in args.backends:
+        for buffered in (False, True):
+            for sessions in args.sessions:
+                with tempfile.TemporaryDirectory() as folder:
+                    db = EmotionDatabase(backend, db_path=os.path.join(folder, 'history.db'),
+                                         csv_path=os.path.join(folder, 'history.csv'), buffered=buffered,
+                                         **({'policy': args.policy, 'max_queue': args.queue_size,
+                                             'fsync_interval': args.fsync_interval} if buffered else {}))
+                    latencies, elapsed = run_sessions(db, sessions, args.frames, args.faces)
+                    records = sessions * args.frames * args.faces
+                    # Kalan kayıtlar yazıldıktan sonra yazıcı istatistikleri
+                    db.close()
+                    stats = db.get_writer_stats()
+                    p50, p99 = np.percentile(latencies, [50, 99])
+                    line = (f"{backend:<7} {'arka plan' if buffered else 'doğrudan':<8} {sessions:>6} "
+                            f"{p50:8.3f} {p99:8.3f} {records / elapsed:10,.0f}")
+                    if stats:
+                        line += (f"  en derin kuyruk {stats['max_queue_depth']}, ort. batch {stats['avg_batch_size']:.0f}, "
+                                 f"yazım ort/p99 {stats['avg_flush_ms']:.1f}/{stats['p99_flush_ms']:.1f} ms, "
+                                 f"düşürülen {stats['dropped']}, fsync {stats['fsyncs']}")
+                    print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# Başlangıç süresi raporu:
+#   1) Arayüzün içe aktardığı proje modüllerinin soğuk import süresi
+#      (python -X importtime ile ayrı bir süreçte ölçülür) ve en pahalı paketler
+#   2) Bu importların TensorFlow / face_recognition'ı yükleyip yüklemediği
+#      (yüklüyorsa tembel import bozulmuş demektir)
+#   3) ModelLoader'ın arka plandaki aşama süreleri ve ilk tahminin gecikmesi
+#
+# Kullanım:
+#   python benchmarks/bench_startup.py [--top 15] [--skip-models]
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# app.py'nin modelleri beklemeden içe aktardığı proje modülleri
+UI_MODULES = ['face_detector', 'emotion_model', 'emotion_responses', 'database', 'advanced_analysis', 'model_loader']
+HEAVY_MODULES = ['tensorflow', 'face_recognition', 'dlib']
+
+
+def import_times(modules):
+    # -X importtime çıktısı: "import time: self [us] | cumulative | imported package"
+    code = (f"import sys, json; import {', '.join(modules)}; "
+            f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))")
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT,
+                            capture_output=True, text=True)
+    wall = time.perf_counter() - start
+    if output.returncode != 0:
+        raise RuntimeError(output.stderr[-2000:])
+
+    # İsimdeki girinti iç içe import derinliğini gösterir (0 -> en üst seviye)
+    entries = []
+    for line in output.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line.split(':', 1)[1].split('|')
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((name.strip(), depth, int(self_us), int(cumulative_us)))
+    heavy = output.stdout.strip().splitlines()[-1]
+    return entries, wall, heavy
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--skip-models', action='store_true')
+    args = parser.parse_args()
+
+    entries, wall, heavy = import_times(UI_MODULES)
+    # Yalnızca en üst seviye importlar toplanınca toplam süre elde edilir
+    top_level = [e for e in entries if e[1] == 0]
+    print(f"Arayüz modüllerinin importu: {sum(e[3] for e in top_level) / 1e6:.2f} sn "
+          f"(süreç toplamı {wall:.2f} sn)")
+    print(f"Yüklenen ağır paketler: {heavy}")
+    print(f"\nEn pahalı {args.top} üst seviye import (kümülatif):")
+    for name, _, _, cumulative in sorted(top_level, key=lambda e: -e[3])[:args.top]:
+        print(f"  {cumulative / 1000:9.1f} ms  {name}")
+
+    if args.skip_models:
+        return
+
+    from model_loader import ModelLoader
+
+    loader = ModelLoader()
+    start = time.perf_counter()
+    loader.start()
+    started = time.perf_counter() - start
+    recognizer, _ = loader.wait()
+    print(f"\nModelLoader.start() dönüş süresi: {started * 1000:.1f} ms (arayüz bu sürede çizilmeye başlar)")
+    print("Arka plan aşamaları:")
+    for phase, seconds in loader.timings.items():
+        print(f"  {phase:<18} {seconds:7.2f} sn")
+    print(f"  {'toplam':<18} {loader.total_time:7.2f} sn")
+
+    h, w = recognizer.input_shape
+    crop = np.random.default_rng(0).integers(0, 256, (h * 2, w * 2, 3), dtype=np.uint8)
+    start = time.perf_counter()
+    recognizer.predict_emotions([crop])
+    print(f"\nİlk tahmin (ısınmış model): {(time.perf_counter() - start) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# Keras modeli ile TFLite float16/int8 değişkenlerinin gecikme, bellek ve
+# doğruluk sapması raporu. Her arka uç ayrı bir süreçte yüklenir, böylece
+# yerleşik bellek (RSS) birbirini etkilemez; top-1 uyumu Keras modelinin
+# aynı kırpıntılardaki tahminlerine göre hesaplanır.
+#
+# Kullanım:
+#   python benchmarks/bench_tflite_backends.py [görüntü_klasörü] [--threads 1 2 4] [--limit 500]
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+
+def resident_memory_mb():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        pass
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return float('nan')
+
+
+def child(args):
+    # Tek arka ucu ölçer ve sonucu son satırda JSON olarak yazar
+    from emotion_model import EmotionRecognizer
+    from tflite_export import load_face_crops
+
+    crops = load_face_crops(args.folder, args.limit)
+    before = resident_memory_mb()
+    start = time.perf_counter()
+    recognizer = EmotionRecognizer(args.model, backend=args.backend, tflite_path=args.tflite,
+                                   num_threads=args.child_threads)
+    load_s = time.perf_counter() - start
+    batch, _ = recognizer.preprocess(crops)
+    if batch is None:
+        sys.exit(f"{args.folder} klasöründe görüntü bulunamadı")
+
+    times = []
+    predictions = []
+    for sample in batch:
+        start = time.perf_counter()
+        predictions.append(recognizer.predict_batch(sample[np.newaxis])[0])
+        times.append((time.perf_counter() - start) * 1000)
+
+    print(json.dumps({
+        'load_s': load_s,
+        'rss_mb': resident_memory_mb(),
+        'model_rss_mb': resident_memory_mb() - before,
+        'p50_ms': float(np.percentile(times, 50)),
+        'p95_ms': float(np.percentile(times, 95)),
+        'predictions': np.asarray(predictions, dtype=np.float32).tolist(),
+    }))
+
+
+def run(args, label, backend, tflite=None, threads=0):
+    command = [sys.executable, os.path.abspath(__file__), args.folder, '--child', backend,
+               '--model', args.model, '--limit', str(args.limit), '--child-threads', str(threads)]
+    if tflite:
+        command += ['--tflite', tflite]
+    output = subprocess.run(command, cwd=ROOT, capture_output=True, text=True)
+    if output.returncode != 0:
+        print(f"{label}: çalıştırılamadı\n{output.stderr[-2000:]}")
+        return None
+    result = json.loads(output.stdout.strip().splitlines()[-1])
+    result['label'] = label
+    result['predictions'] = np.asarray(result['predictions'])
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('folder', nargs='?', default='known_faces')
+    parser.add_argument('--model', default='model/emotion_model.h5')
+    parser.add_argument('--threads', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--limit', type=int, default=500)
+    parser.add_argument('--child')
+    parser.add_argument('--child-threads', type=int, default=0)
+    parser.add_argument('--tflite')
+    args = parser.parse_args()
+
+    if args.child:
+        args.backend = args.child
+        child(args)
+        return
+
+    base = os.path.splitext(args.model)[0]
+    reference = run(args, 'keras', 'keras')
+    if reference is None:
+        return
+    results = [reference]
+    for kind in ('float16', 'int8'):
+        path = f"{base}_{kind}.tflite"
+        if not os.path.exists(os.path.join(ROOT, path)):
+            print(f"Uyarı: {path} bulunamadı, önce tflite_export.py çalıştırın.")
+            continue
+        for threads in args.threads:
+            result = run(args, f"tflite {kind} ({threads} iş parçacığı)", 'tflite', path, threads)
+            if result is not None:
+                results.append(result)
+
+    top1 = reference['predictions'].argmax(axis=1)
+    print(f"\n{len(top1)} yüz kırpıntısı ({args.folder})\n")
+    print(f"{'arka uç':<30} {'yükleme sn':>10} {'RSS MB':>8} {'model MB':>9} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'top-1 uyum':>10} {'max |Δp|':>9}")
+    for r in results:
+        agreement = np.mean(r['predictions'].argmax(axis=1) == top1)
+        drift = np.abs(r['predictions'] - reference['predictions']).max()
+        print(f"{r['label']:<30} {r['load_s']:10.2f} {r['rss_mb']:8.0f} {r['model_rss_mb']:9.0f} "
+              f"{r['p50_ms']:8.2f} {r['p95_ms']:8.2f} {agreement:10.3f} {drift:9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# İş parçacığı ayarları taraması: TensorFlow intra/inter-op, OpenCV ve
+# BLAS (dlib) iş parçacığı sayılarının kombinasyonları için
+# recognize_faces_in_frame iş yükü (tespit + encode + duygu) --concurrency
+# eşzamanlı oturumla çalıştırılır. TensorFlow havuzları süreç başına bir kez
+# kurulabildiğinden her kombinasyon ayrı bir süreçte ölçülür. En yüksek
+# kare/sn veren ayar --output dosyasına (varsayılan runtime_config.json)
+# yazılır; EmotionRecognizer ve ModelLoader bu dosyayı başlangıçta okur.
+#
+# Kullanım:
+#   python benchmarks/bench_threading_sweep.py [klasör] [--concurrency 4] [--duration 10] [--output runtime_config.json]
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from runtime_config import DEFAULT_CONFIG, available_cpus, save_runtime_config
+
+
+def thread_counts(cpus):
+    return sorted({1, max(1, cpus // 2), cpus})
+
+
+def load_frames(folder, limit):
+    import cv2
+
+    frames = []
+    for root, _, files in sorted(os.walk(folder)):
+        for file in sorted(files):
+            if file.lower().endswith(('.jpg', '.jpeg', '.png')):
+                frame = cv2.imread(os.path.join(root, file))
+                if frame is not None:
+                    frames.append(frame)
+            if len(frames) >= limit:
+                return frames
+    return frames
+
+
+def run_worker(args):
+    # Alt süreç: RUNTIME_CONFIG ortam değişkenindeki ayarlarla iş yükünü ölçer
+    import numpy as np
+    from emotion_model import EmotionRecognizer
+    from face_detector import load_known_faces, recognize_faces_in_frame
+    from face_gallery import FaceGallery
+    from runtime_config import apply_runtime_config
+
+    apply_runtime_config()
+    frames = load_frames(args.folder, args.limit)
+    if not frames:
+        sys.exit(f"{args.folder} klasöründe okunabilir görüntü bulunamadı")
+    known_encodings, known_names = load_known_faces(args.folder)
+    gallery = FaceGallery(known_encodings, known_names)
+    recognizer = EmotionRecognizer(cache_mb=0)
+    recognize_faces_in_frame(frames[0], gallery, None, recognizer)
+
+    latencies = [[] for _ in range(args.concurrency)]
+    barrier = threading.Barrier(args.concurrency + 1)
+
+    def session(i):
+        barrier.wait()
+        deadline = time.perf_counter() + args.duration
+        j = i
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            recognize_faces_in_frame(frames[j % len(frames)], gallery, None, recognizer)
+            latencies[i].append(time.perf_counter() - start)
+            j += 1
+
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(args.concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    latencies = np.concatenate([np.asarray(l) for l in latencies]) * 1000
+    print(json.dumps({'fps': len(latencies) / elapsed,
+                      'p50_ms': float(np.percentile(latencies, 50)),
+                      'p99_ms': float(np.percentile(latencies, 99))}))
+
+
+def measure(config, args):
+    with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+        path = f.name
+    save_runtime_config(config, path)
+    env = dict(os.environ, RUNTIME_CONFIG=path)
+    # Ortamdaki geçersiz kılmalar taranan ayarları gölgelemesin
+    for name in ('TF_INTRA_OP_THREADS', 'TF_INTER_OP_THREADS', 'EMOTION_TFLITE_THREADS', 'CV2_NUM_THREADS',
+                 'BLAS_NUM_THREADS', 'CPU_AFFINITY', 'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        env.pop(name, None)
+    try:
+        output = subprocess.run([sys.executable, os.path.abspath(__file__), args.folder, '--worker',
+                                 '--concurrency', str(args.concurrency), '--duration', str(args.duration),
+                                 '--limit', str(args.limit)],
+                                cwd=ROOT, env=env, capture_output=True, text=True)
+    finally:
+        os.remove(path)
+    if output.returncode != 0:
+        print(output.stderr[-2000:])
+        return None
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def main():
+    cpus = len(available_cpus())
+    parser = argparse.ArgumentParser()
+    parser.add_argument('folder', nargs='?', default='known_faces')
+    parser.add_argument('--concurrency', type=int, default=4)
+    parser.add_argument('--duration', type=float, default=10.0)
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--intra', type=int, nargs='+', default=thread_counts(cpus))
+    parser.add_argument('--inter', type=int, nargs='+', default=[1, 2])
+    parser.add_argument('--cv2', type=int, nargs='+', default=thread_counts(cpus))
+    parser.add_argument('--blas', type=int, nargs='+', default=[1, cpus])
+    parser.add_argument('--affinity', nargs='*', default=[], help='denenecek çekirdek listeleri, örn. 0-3')
+    parser.add_argument('--output', default=os.path.join(ROOT, 'runtime_config.json'))
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+    # Her kombinasyon için alt süreç açmadan önce görüntü klasörü denetlenir
+    if not load_frames(args.folder, 1):
+        sys.exit(f"{args.folder} klasöründe okunabilir görüntü bulunamadı")
+
+    print(f"{cpus} çekirdek, {args.concurrency} eşzamanlı oturum, kombinasyon başına {args.duration:.0f} sn\n")
+    print(f"{'intra':>5} {'inter':>5} {'cv2':>4} {'blas':>4} {'çekirdekler':>11} {'kare/sn':>8} {'p50 ms':>8} {'p99 ms':>8}")
+    best = None
+    for intra, inter, cv2_threads, blas, affinity in itertools.product(
+            args.intra, args.inter, args.cv2, args.blas, [None] + args.affinity):
+        config = dict(DEFAULT_CONFIG, tf_intra_op_threads=intra, tf_inter_op_threads=inter,
+                      tflite_threads=intra, cv2_threads=cv2_threads, blas_threads=blas, cpu_affinity=affinity)
+        result = measure(config, args)
+        if result is None:
+            continue
+        print(f"{intra:>5} {inter:>5} {cv2_threads:>4} {blas:>4} {affinity or 'tümü':>11} "
+              f"{result['fps']:8.2f} {result['p50_ms']:8.1f} {result['p99_ms']:8.1f}")
+        if best is None or result['fps'] > best[1]['fps']:
+            best = (config, result)
+
+    if best is None:
+        print("Hata: Hiçbir kombinasyon ölçülemedi.")
+        return
+    save_runtime_config(best[0], args.output)
+    print(f"\nEn iyi ayar ({best[1]['fps']:.2f} kare/sn) {args.output} dosyasına yazıldı:")
+    print(json.dumps(best[0], indent=2))
+
+
+if __name__ == "__main__":
+    main()
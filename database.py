@@ -1,68 +1,142 @@
+import atexit
 import csv
+from collections import deque
 from datetime import datetime
 import json
 import os
+import queue
+import sqlite3
+import threading
+import time
 import pandas as pd
+from emotion_aggregates import (AggregateFile, aggregate_frame, aggregate_rows, aggregates_dataframe,
+                                merge_aggregates, stats_from_aggregates)
+from emotion_columns import EmotionColumns
+from history_store import EMOTION_HISTORY_DIR, PartitionedEmotionStore
 
-class EmotionDatabase:
-    def __init__(self):
-        self.emotion_history_file = 'data/emotion_history.csv'
+# Depolama motoru: "sqlite" (emotion_history.db), "csv" (data/emotion_history.csv)
+# veya "partitioned" (data/history altında gün bölümlü sütun dosyaları)
+EMOTION_DB_BACKEND = os.getenv("EMOTION_DB_BACKEND", "sqlite")
+EMOTION_DB_PATH = os.getenv("EMOTION_DB_PATH", "emotion_history.db")
+EMOTION_HISTORY_CSV = 'data/emotion_history.csv'
+ADVANCED_ANALYSIS_CSV = 'data/advanced_analysis.csv'
+
+HISTORY_COLUMNS = ['timestamp', 'emotion', 'confidence', 'face_id']
+
+# SQLite CSV içe aktarımında tek işlemde yazılan satır sayısı
+IMPORT_CHUNK_ROWS = 50000
+
+# Arka plan kayıt yazıcısı (0 -> add_emotion_record doğrudan diske yazar)
+EMOTION_DB_ASYNC = os.getenv("EMOTION_DB_ASYNC", "1") != "0"
+# Bir yazımdaki en fazla kayıt ve ilk kayıttan sonra en fazla bekleme (sn)
+EMOTION_DB_BATCH_SIZE = int(os.getenv("EMOTION_DB_BATCH_SIZE", "256"))
+EMOTION_DB_FLUSH_INTERVAL = float(os.getenv("EMOTION_DB_FLUSH_INTERVAL", "1.0"))
+# Kuyruk dolunca: "block" (en fazla EMOTION_DB_BLOCK_TIMEOUT sn bekler, sonra düşürür),
+# "drop_new" (yeni kaydı düşürür) veya "drop_oldest" (en eski kaydı düşürür)
+EMOTION_DB_QUEUE_SIZE = int(os.getenv("EMOTION_DB_QUEUE_SIZE", "10000"))
+EMOTION_DB_QUEUE_POLICY = os.getenv("EMOTION_DB_QUEUE_POLICY", "block")
+EMOTION_DB_BLOCK_TIMEOUT = float(os.getenv("EMOTION_DB_BLOCK_TIMEOUT", "0.5"))
+# Diske zorla yazma aralığı (sn); 0 -> her yazımdan sonra, negatif -> hiçbir zaman
+EMOTION_DB_FSYNC_INTERVAL = float(os.getenv("EMOTION_DB_FSYNC_INTERVAL", "5.0"))
+
+
+def clean_face_id(face_id):
+    return str(face_id).strip().strip(',') if face_id else ""
+
+
+def emotion_row(emotion, confidence, face_id=None, additional_data=None):
+    # (timestamp, emotion, confidence, face_id, additional_data); zaman damgası kayıt anında alınır
+    return (datetime.now().isoformat(), emotion, float(confidence), clean_face_id(face_id),
+            json.dumps(additional_data, ensure_ascii=False) if additional_data is not None else None)
+
+
+class CsvEmotionStore:
+    def __init__(self, csv_path=EMOTION_HISTORY_CSV):
+        self.emotion_history_file = csv_path
+        self.advanced_analysis_file = os.path.join(os.path.dirname(csv_path) or '.', os.path.basename(ADVANCED_ANALYSIS_CSV))
+        self._lock = threading.Lock()
         self.create_files()
+        # Özetler CSV'nin yanındaki JSON dosyasında tutulur; CSV boyutu uyuşmazsa yeniden kurulur
+        self.aggregates = AggregateFile(os.path.splitext(csv_path)[0] + '.aggregates.json')
+        if not self.aggregates.is_current(os.path.getsize(csv_path)):
+            self.rebuild_aggregates()
 
     def create_files(self):
         # Klasör oluştur
-        os.makedirs('data', exist_ok=True)
-        
+        os.makedirs(os.path.dirname(self.emotion_history_file) or '.', exist_ok=True)
+
         # Duygu geçmişi dosyası
         if not os.path.exists(self.emotion_history_file):
             with open(self.emotion_history_file, 'w', newline='', encoding='utf-8') as f:
                 writer = csv.writer(f)
-                writer.writerow(['timestamp', 'emotion', 'confidence', 'face_id'])
-        
+                writer.writerow(HISTORY_COLUMNS)
+
 
     def add_emotion_record(self, emotion, confidence, face_id=None, additional_data=None):
-        with open(self.emotion_history_file, 'a', newline='', encoding='utf-8') as f:
+        self.add_emotion_records([emotion_row(emotion, confidence, face_id, additional_data)])
+
+    def add_emotion_records(self, rows):
+        # CSV'de additional_data sütunu yoktur
+        with self._lock:
+            with open(self.emotion_history_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                writer.writerows(row[:4] for row in rows)
+            self.aggregates.update(rows, os.path.getsize(self.emotion_history_file))
+
+    def rebuild_aggregates(self):
+        with self._lock:
+            values = {}
+            for chunk in pd.read_csv(self.emotion_history_file, chunksize=IMPORT_CHUNK_ROWS, dtype={'face_id': str}):
+                merge_aggregates(values, aggregate_frame(chunk))
+            self.aggregates.replace(values, os.path.getsize(self.emotion_history_file))
+
+    def get_aggregates(self):
+        with self._lock:
+            return {key: list(entry) for key, entry in self.aggregates.values.items()}
+
+    def sync(self):
+        with self._lock:
+            with open(self.emotion_history_file, 'a', encoding='utf-8') as f:
+                os.fsync(f.fileno())
+            self.aggregates.save()
+
+    def add_advanced_analysis(self, stress_level, productivity_score, sleep_quality, analysis_data):
+        new_file = not os.path.exists(self.advanced_analysis_file)
+        with open(self.advanced_analysis_file, 'a', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
-            clean_face_id = str(face_id).strip().strip(',') if face_id else ""
-            writer.writerow([
-                datetime.now().isoformat(),
-                emotion,
-                confidence,
-                clean_face_id
-            ])
-
-   
-    def get_emotion_history(self, days=7):
+            if new_file:
+                writer.writerow(['timestamp', 'stress_level', 'productivity_score', 'sleep_quality', 'analysis_data'])
+            writer.writerow([datetime.now().isoformat(), stress_level, productivity_score, sleep_quality,
+                             json.dumps(analysis_data, ensure_ascii=False)])
+
+    def get_history_dataframe(self):
+        return pd.read_csv(self.emotion_history_file)
+
+    def get_emotion_history(self, days=7, face_id=None):
         try:
             df = pd.read_csv(self.emotion_history_file)
-            df['timestamp'] = pd.to_datetime(df['timestamp'])
+            df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
             cutoff_date = datetime.now() - pd.Timedelta(days=days)
             df = df[df['timestamp'] >= cutoff_date]
+            if face_id is not None:
+                df = df[df['face_id'] == clean_face_id(face_id)]
             return df.values.tolist()
         except Exception as e:
             print(f"Error reading emotion history: {e}")
             return []
 
-
-    def get_emotion_stats(self):
+    def get_history_columns(self, days=7, face_id=None):
         try:
-            df = pd.read_csv(self.emotion_history_file)
-            if df.empty:
-                return {}
-            
-            # Duygu dağılımı
-            emotion_counts = df['emotion'].value_counts().to_dict()
-            
-            # Ortalama güven skorları
-            confidence_means = df.groupby('emotion')['confidence'].mean().to_dict()
-            
-            return {
-                'emotion_counts': emotion_counts,
-                'confidence_means': confidence_means
-            }
+            df = pd.read_csv(self.emotion_history_file, usecols=HISTORY_COLUMNS)
+            df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601')
+            df = df[df['timestamp'] >= datetime.now() - pd.Timedelta(days=days)]
+            if face_id is not None:
+                df = df[df['face_id'] == clean_face_id(face_id)]
+            return EmotionColumns.from_dataframe(df)
         except Exception as e:
-            print(f"Error getting emotion stats: {e}")
-            return {}
+            print(f"Error reading emotion history: {e}")
+            return EmotionColumns.empty()
+
 
     def export_to_excel(self, output_file='emotion_analysis.xlsx'):
         try:
@@ -70,9 +144,486 @@ class EmotionDatabase:
                 # Duygu geçmişi
                 df_emotion = pd.read_csv(self.emotion_history_file)
                 df_emotion.to_excel(writer, sheet_name='Emotion History', index=False)
-                
-            
+
+
             return True
         except Exception as e:
             print(f"Error exporting to Excel: {e}")
-            return False
\ No newline at end of file
+            return False
+
+    def close(self):
+        with self._lock:
+            self.aggregates.save()
+
+
+class SqliteEmotionStore:
+    # emotion_history.db'deki mevcut şema üzerinde kalıcı tek bağlantı.
+    # WAL modunda okuyucular yazmayı beklemez; sorgular sabit SQL metinleri
+    # olduğundan sqlite3'ün deyim önbelleğinden hazırlanmış olarak gelir.
+    # Bağlantı Streamlit iş parçacıkları arasında paylaşıldığı için kilitlidir.
+    def __init__(self, db_path=EMOTION_DB_PATH, csv_path=EMOTION_HISTORY_CSV):
+        self.db_path = db_path
+        self.emotion_history_file = csv_path
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False, cached_statements=64)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.create_tables()
+        # Özetler bir kez mevcut satırlardan kurulur (store_meta'da işaretlenir); CSV
+        # aktarımı yeni satır eklediyse yeniden kurulur. user_version yalnızca
+        # aktarımın başarıyla bittiğini gösterir.
+        if self.import_csv_history() or not self.aggregates_built():
+            self.rebuild_aggregates()
+
+    def create_tables(self):
+        with self._lock, self.conn:
+            self.conn.executescript('''
+                CREATE TABLE IF NOT EXISTS emotion_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME,
+                    emotion TEXT,
+                    confidence REAL,
+                    face_id TEXT,
+                    additional_data TEXT
+                );
+                CREATE TABLE IF NOT EXISTS multi_face_analysis (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME,
+                    faces_data TEXT,
+                    group_emotion TEXT,
+                    analysis_data TEXT
+                );
+                CREATE TABLE IF NOT EXISTS advanced_analysis (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp DATETIME,
+                    stress_level REAL,
+                    productivity_score REAL,
+                    sleep_quality REAL,
+                    analysis_data TEXT
+                );
+                CREATE TABLE IF NOT EXISTS emotion_aggregates (
+                    face_id TEXT,
+                    emotion TEXT,
+                    count INTEGER,
+                    confidence_sum REAL,
+                    confidence_min REAL,
+                    confidence_max REAL,
+                    PRIMARY KEY (face_id, emotion)
+                );
+                CREATE TABLE IF NOT EXISTS store_meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_emotion_history_timestamp ON emotion_history(timestamp);
+                CREATE INDEX IF NOT EXISTS idx_emotion_history_face_id ON emotion_history(face_id);
+            ''')
+
+    def import_csv_history(self, csv_path=None):
+        # Eski CSV geçmişi bir kez, parçalar halinde tek işlemde toplu aktarılır;
+        # aktarım user_version ile işaretlenir, CSV dosyası olduğu gibi kalır
+        csv_path = csv_path or self.emotion_history_file
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+            return 0
+        imported = skipped = 0
+        try:
+            with self._lock, self.conn:
+                if os.path.exists(csv_path):
+                    for chunk in pd.read_csv(csv_path, chunksize=IMPORT_CHUNK_ROWS, dtype={'face_id': str}):
+                        # Zaman damgaları metin olarak sıralanıp karşılaştırıldığından add_emotion_record
+                        # ile aynı isoformat() biçimine çevrilir ("2026-10-17 11:00:00", ' ' < 'T' yüzünden
+                        # "2026-10-17T10:00:00"dan önce sıralanırdı); çözülemeyen satırlar atlanır
+                        parsed = pd.to_datetime(chunk['timestamp'], format='ISO8601', errors='coerce')
+                        skipped += int(parsed.isna().sum())
+                        rows = [(timestamp.isoformat(), emotion, float(confidence) if pd.notna(confidence) else None,
+                                 clean_face_id(face_id) if pd.notna(face_id) else "", None)
+                                for timestamp, emotion, confidence, face_id
+                                in zip(parsed, chunk['emotion'], chunk['confidence'], chunk['face_id'])
+                                if pd.notna(timestamp)]
+                        self.conn.executemany(
+                            "INSERT INTO emotion_history (timestamp, emotion, confidence, face_id, additional_data) "
+                            "VALUES (?, ?, ?, ?, ?)", rows)
+                        imported += len(rows)
+                self.conn.execute("PRAGMA user_version = 1")
+        except Exception as e:
+            print(f"CSV geçmişi içe aktarılamadı: {e}")
+            return 0
+        if imported:
+            print(f"{imported} duygu kaydı {csv_path} dosyasından SQLite'a aktarıldı.")
+        if skipped:
+            print(f"Zaman damgası okunamayan {skipped} kayıt aktarılmadı.")
+        return imported
+
+    def add_emotion_record(self, emotion, confidence, face_id=None, additional_data=None):
+        self.add_emotion_records([emotion_row(emotion, confidence, face_id, additional_data)])
+
+    def add_emotion_records(self, rows):
+        # rows: (timestamp, emotion, confidence, face_id, additional_data) demetleri; kayıtlar ve
+        # özet güncellemesi tek işlemde yazılır
+        deltas = [(face_id, emotion, count, total, low, high)
+                  for (face_id, emotion), (count, total, low, high) in aggregate_rows(rows).items()]
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT INTO emotion_history (timestamp, emotion, confidence, face_id, additional_data) "
+                "VALUES (?, ?, ?, ?, ?)", rows)
+            self.conn.executemany(
+                "INSERT INTO emotion_aggregates (face_id, emotion, count, confidence_sum, confidence_min, confidence_max) "
+                "VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (face_id, emotion) DO UPDATE SET "
+                "count = count + excluded.count, confidence_sum = confidence_sum + excluded.confidence_sum, "
+                "confidence_min = MIN(confidence_min, excluded.confidence_min), "
+                "confidence_max = MAX(confidence_max, excluded.confidence_max)", deltas)
+
+    def rebuild_aggregates(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM emotion_aggregates")
+            self.conn.execute(
+                "INSERT INTO emotion_aggregates (face_id, emotion, count, confidence_sum, confidence_min, confidence_max) "
+                "SELECT COALESCE(face_id, ''), emotion, COUNT(*), TOTAL(COALESCE(confidence, 0)), "
+                "MIN(COALESCE(confidence, 0)), MAX(COALESCE(confidence, 0)) "
+                "FROM emotion_history GROUP BY COALESCE(face_id, ''), emotion")
+            self.conn.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('aggregates_built', ?)",
+                              (datetime.now().isoformat(),))
+
+    def aggregates_built(self):
+        with self._lock:
+            return self.conn.execute("SELECT 1 FROM store_meta WHERE key = 'aggregates_built'").fetchone() is not None
+
+    def get_aggregates(self):
+        with self._lock:
+            rows = self.conn.execute(
+                "SELECT face_id, emotion, count, confidence_sum, confidence_min, confidence_max "
+                "FROM emotion_aggregates").fetchall()
+        return {(face_id, emotion): [count, total, low, high] for face_id, emotion, count, total, low, high in rows}
+
+    def sync(self):
+        # synchronous=NORMAL'da işlemler fsync edilmez; denetim noktası WAL'ı diske zorlar
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    def add_advanced_analysis(self, stress_level, productivity_score, sleep_quality, analysis_data):
+        with self._lock, self.conn:
+            self.conn.execute(
+                "INSERT INTO advanced_analysis (timestamp, stress_level, productivity_score, sleep_quality, analysis_data) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (datetime.now().isoformat(), float(stress_level), float(productivity_score), float(sleep_quality),
+                 json.dumps(analysis_data, ensure_ascii=False)))
+
+    def get_history_dataframe(self):
+        with self._lock:
+            return pd.read_sql_query("SELECT timestamp, emotion, confidence, face_id FROM emotion_history ORDER BY id",
+                                     self.conn)
+
+    def get_emotion_history(self, days=7, face_id=None):
+        # Zaman damgaları ISO metni olduğundan karşılaştırma indeksi kullanır
+        try:
+            cutoff = (datetime.now() - pd.Timedelta(days=days)).isoformat()
+            with self._lock:
+                if face_id is None:
+                    rows = self.conn.execute(
+                        "SELECT timestamp, emotion, confidence, face_id FROM emotion_history "
+                        "WHERE timestamp >= ? ORDER BY timestamp", (cutoff,)).fetchall()
+                else:
+                    rows = self.conn.execute(
+                        "SELECT timestamp, emotion, confidence, face_id FROM emotion_history "
+                        "WHERE face_id = ? AND timestamp >= ? ORDER BY timestamp",
+                        (clean_face_id(face_id), cutoff)).fetchall()
+            return [[pd.Timestamp(timestamp), emotion, confidence, face_id] for timestamp, emotion, confidence, face_id in rows]
+        except Exception as e:
+            print(f"Error reading emotion history: {e}")
+            return []
+
+    def get_history_columns(self, days=7, face_id=None):
+        cutoff = (datetime.now() - pd.Timedelta(days=days)).isoformat()
+        query = "SELECT timestamp, emotion, confidence, face_id FROM emotion_history WHERE timestamp >= ?"
+        params = (cutoff,)
+        if face_id is not None:
+            query += " AND face_id = ?"
+            params += (clean_face_id(face_id),)
+        try:
+            with self._lock:
+                df = pd.read_sql_query(query + " ORDER BY timestamp", self.conn, params=params)
+            return EmotionColumns.from_dataframe(df)
+        except Exception as e:
+            print(f"Error reading emotion history: {e}")
+            return EmotionColumns.empty()
+
+    def export_to_excel(self, output_file='emotion_analysis.xlsx'):
+        try:
+            with self._lock:
+                df_emotion = pd.read_sql_query(
+                    "SELECT timestamp, emotion, confidence, face_id FROM emotion_history ORDER BY id", self.conn)
+                df_advanced = pd.read_sql_query(
+                    "SELECT timestamp, stress_level, productivity_score, sleep_quality, analysis_data "
+                    "FROM advanced_analysis ORDER BY id", self.conn)
+            with pd.ExcelWriter(output_file) as writer:
+                df_emotion.to_excel(writer, sheet_name='Emotion History', index=False)
+                df_advanced.to_excel(writer, sheet_name='Advanced Analysis', index=False)
+            return True
+        except Exception as e:
+            print(f"Error exporting to Excel: {e}")
+            return False
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+class BufferedRecordWriter:
+    # Duygu kayıtlarını kuyruktan alıp arka plan iş parçacığında toplu yazar.
+    # Bir batch max_batch kayda ulaşınca ya da ilk kaydından flush_interval
+    # saniye geçince tek işlemde yazılır; fsync_interval'da bir store.sync()
+    # çağrılır. Kuyruk max_queue ile sınırlıdır ve dolduğunda policy uygulanır.
+    _STOP = object()
+
+    def __init__(self, store, max_batch=EMOTION_DB_BATCH_SIZE, flush_interval=EMOTION_DB_FLUSH_INTERVAL,
+                 max_queue=EMOTION_DB_QUEUE_SIZE, policy=EMOTION_DB_QUEUE_POLICY,
+                 block_timeout=EMOTION_DB_BLOCK_TIMEOUT, fsync_interval=EMOTION_DB_FSYNC_INTERVAL):
+        if policy not in ('block', 'drop_new', 'drop_oldest'):
+            raise ValueError(f"Bilinmeyen kuyruk politikası: {policy}")
+        self.store = store
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.fsync_interval = fsync_interval
+        self._queue = queue.Queue(max_queue)
+        self._closed = False
+        self._last_sync = time.monotonic()
+
+        self.enqueued = 0
+        self.written = 0
+        self.dropped = 0
+        self.failed = 0
+        self.batches = 0
+        self.fsyncs = 0
+        self.max_depth = 0
+        self._batch_sizes = deque(maxlen=1000)
+        self._flush_times = deque(maxlen=1000)
+
+        self._thread = threading.Thread(target=self._run, name='emotion-db-writer', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def put(self, row):
+        # Kayıt kuyruğa alınırsa True, politika gereği düşürülürse False
+        if self._closed:
+            return False
+        try:
+            if self.policy == 'block':
+                self._queue.put(row, timeout=self.block_timeout)
+            elif self.policy == 'drop_new':
+                self._queue.put_nowait(row)
+            else:
+                while True:
+                    try:
+                        self._queue.put_nowait(row)
+                        break
+                    except queue.Full:
+                        # Kuyrukta yalnızca işaretler varsa yeni kayıt düşürülür
+                        if not self._drop_oldest_record():
+                            raise
+                        self.dropped += 1
+        except queue.Full:
+            self.dropped += 1
+            return False
+        self.enqueued += 1
+        self.max_depth = max(self.max_depth, self._queue.qsize())
+        return True
+
+    def _drop_oldest_record(self):
+        # En eski kaydı kuyruktan çıkarır. flush()/close() işaretleri asla düşürülmez:
+        # bir flush işareti erken bırakılırsa flush() kendinden önceki kayıtlar
+        # yazılmadan dönerdi.
+        with self._queue.mutex:
+            for index, item in enumerate(self._queue.queue):
+                if not self._is_marker(item):
+                    del self._queue.queue[index]
+                    self._queue.not_full.notify()
+                    return True
+        return False
+
+    def _is_marker(self, item):
+        # flush() kuyruğa bir Event, close() ise _STOP koyar
+        return item is self._STOP or isinstance(item, threading.Event)
+
+    def _collect(self):
+        # İlk öğeyi bekler; batch dolana, süre dolana ya da bir işaret gelene kadar toplar
+        item = self._queue.get()
+        if self._is_marker(item):
+            return [], item
+        rows = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(rows) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if self._is_marker(item):
+                return rows, item
+            rows.append(item)
+        return rows, None
+
+    def _write(self, rows, force_sync=False):
+        if rows:
+            start = time.perf_counter()
+            try:
+                self.store.add_emotion_records(rows)
+                self.written += len(rows)
+            except Exception as e:
+                print(f"Duygu kayıtları yazılamadı ({len(rows)} kayıt): {e}")
+                self.failed += len(rows)
+            self.batches += 1
+            self._batch_sizes.append(len(rows))
+            self._flush_times.append(time.perf_counter() - start)
+        now = time.monotonic()
+        if self.fsync_interval >= 0 and (rows or force_sync) and (force_sync or now - self._last_sync >= self.fsync_interval):
+            try:
+                self.store.sync()
+                self.fsyncs += 1
+            except Exception as e:
+                print(f"Duygu kayıtları diske zorlanamadı: {e}")
+            self._last_sync = now
+
+    def _run(self):
+        while True:
+            rows, marker = self._collect()
+            self._write(rows, force_sync=marker is self._STOP)
+            if isinstance(marker, threading.Event):
+                marker.set()
+            elif marker is self._STOP:
+                return
+
+    def flush(self, timeout=None):
+        # Kuyruktaki kayıtlar yazılana kadar bekler
+        if self._closed or not self._thread.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        # Kalan kayıtları yazar, diske zorlar ve iş parçacığını durdurur
+        if self._closed:
+            return
+        self._closed = True
+        # Kapatılan yazıcı atexit kaydıyla canlı tutulmasın
+        atexit.unregister(self.close)
+        if self._thread.is_alive():
+            self._queue.put(self._STOP)
+            self._thread.join()
+
+    def get_stats(self):
+        batch_sizes = list(self._batch_sizes)
+        flush_ms = sorted(t * 1000 for t in self._flush_times)
+        return {
+            'queue_depth': self._queue.qsize(),
+            'max_queue_depth': self.max_depth,
+            'enqueued': self.enqueued,
+            'written': self.written,
+            'dropped': self.dropped,
+            'failed': self.failed,
+            'batches': self.batches,
+            'avg_batch_size': sum(batch_sizes) / len(batch_sizes) if batch_sizes else 0.0,
+            'max_batch_size': max(batch_sizes) if batch_sizes else 0,
+            'avg_flush_ms': sum(flush_ms) / len(flush_ms) if flush_ms else 0.0,
+            'p99_flush_ms': flush_ms[min(len(flush_ms) - 1, int(len(flush_ms) * 0.99))] if flush_ms else 0.0,
+            'fsyncs': self.fsyncs,
+        }
+
+
+class EmotionDatabase:
+    # Seçilen depolama motoruna yönlendiren ortak arayüz. buffered açıksa
+    # add_emotion_record kaydı yalnızca kuyruğa alır; okumalar önce kuyruğu boşaltır.
+    def __init__(self, backend=None, db_path=None, csv_path=None, history_dir=None, buffered=EMOTION_DB_ASYNC,
+                 **writer_options):
+        backend = backend or EMOTION_DB_BACKEND
+        self.backend = backend
+        if backend == 'sqlite':
+            self.store = SqliteEmotionStore(db_path or EMOTION_DB_PATH, csv_path or EMOTION_HISTORY_CSV)
+        elif backend == 'csv':
+            self.store = CsvEmotionStore(csv_path or EMOTION_HISTORY_CSV)
+        elif backend == 'partitioned':
+            self.store = PartitionedEmotionStore(history_dir or EMOTION_HISTORY_DIR, csv_path or EMOTION_HISTORY_CSV)
+        else:
+            raise ValueError(f"Bilinmeyen veritabanı arka ucu: {backend}")
+        self.writer = BufferedRecordWriter(self.store, **writer_options) if buffered else None
+
+    def add_emotion_record(self, emotion, confidence, face_id=None, additional_data=None):
+        if self.writer is None:
+            return self.store.add_emotion_records([emotion_row(emotion, confidence, face_id, additional_data)])
+        return self.writer.put(emotion_row(emotion, confidence, face_id, additional_data))
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.flush()
+
+    def get_history_dataframe(self):
+        self.flush()
+        return self.store.get_history_dataframe()
+
+    def get_emotion_history(self, days=7, face_id=None):
+        self.flush()
+        return self.store.get_emotion_history(days, face_id)
+
+    def get_history_columns(self, days=7, face_id=None):
+        # get_emotion_history ile aynı satırlar, liste yerine EmotionColumns olarak
+        self.flush()
+        return self.store.get_history_columns(days, clean_face_id(face_id) if face_id is not None else None)
+
+    def get_emotion_stats(self, face_id=None):
+        # Satırlar yerine (kişi, duygu) özetlerinden hesaplanır
+        try:
+            return stats_from_aggregates(self.get_aggregates(), clean_face_id(face_id) if face_id is not None else None)
+        except Exception as e:
+            print(f"Error getting emotion stats: {e}")
+            return {}
+
+    def get_aggregates(self):
+        self.flush()
+        return self.store.get_aggregates()
+
+    def get_aggregates_dataframe(self):
+        # face_id, emotion, count, confidence_sum, confidence_min, confidence_max
+        return aggregates_dataframe(self.get_aggregates())
+
+    def rebuild_aggregates(self):
+        self.flush()
+        self.store.rebuild_aggregates()
+
+    def export_to_excel(self, output_file='emotion_analysis.xlsx'):
+        self.flush()
+        return self.store.export_to_excel(output_file)
+
+    def get_writer_stats(self):
+        return self.writer.get_stats() if self.writer is not None else None
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+        self.store.close()
+
+    def __getattr__(self, name):
+        if name == 'store':
+            raise AttributeError(name)
+        return getattr(self.store, name)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--backend', default=EMOTION_DB_BACKEND)
+    parser.add_argument('--rebuild-aggregates', action='store_true', help='özetleri tüm geçmişten yeniden kurar')
+    args = parser.parse_args()
+
+    db = EmotionDatabase(args.backend, buffered=False)
+    if args.rebuild_aggregates:
+        start = time.perf_counter()
+        db.rebuild_aggregates()
+        print(f"Özetler yeniden kuruldu ({len(db.get_aggregates())} kişi-duygu çifti, "
+              f"{time.perf_counter() - start:.2f} sn).")
+    for emotion, count in db.get_emotion_stats().get('emotion_counts', {}).items():
+        print(f"{emotion:<10} {count}")
+    db.close()
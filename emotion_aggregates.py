@@ -0,0 +1,127 @@
+# Duygu geçmişi için sürekli güncellenen özetler. Her (kişi, duygu) çifti için
+# kayıt sayısı, güven toplamı ve en küçük/en büyük güven tutulur; genel
+# istatistikler kişiler üzerinden toplanarak bulunur. Böylece istatistik
+# sorguları satır sayısıyla değil (duygu x kişi) sayısıyla orantılıdır.
+# Depolar özetleri her yazımda verinin yanında günceller (SQLite'ta aynı
+# işlemde bir tabloda, diğerlerinde bir JSON dosyasında); bozulma veya eski
+# veri için `python database.py --rebuild-aggregates` özetleri baştan kurar.
+import json
+import os
+import time
+
+import pandas as pd
+
+AGGREGATE_COLUMNS = ['face_id', 'emotion', 'count', 'confidence_sum', 'confidence_min', 'confidence_max']
+
+
+def aggregate_rows(rows):
+    # (timestamp, emotion, confidence, face_id, ...) satırlarından {(kişi, duygu): [n, toplam, min, max]}
+    deltas = {}
+    for row in rows:
+        emotion, confidence, face_id = row[1], row[2], row[3]
+        confidence = float(confidence) if confidence is not None else 0.0
+        entry = deltas.get((face_id, emotion))
+        if entry is None:
+            deltas[(face_id, emotion)] = [1, confidence, confidence, confidence]
+        else:
+            entry[0] += 1
+            entry[1] += confidence
+            entry[2] = min(entry[2], confidence)
+            entry[3] = max(entry[3], confidence)
+    return deltas
+
+
+def merge_aggregates(target, deltas):
+    for key, (count, total, low, high) in deltas.items():
+        entry = target.get(key)
+        if entry is None:
+            target[key] = [count, total, low, high]
+        else:
+            entry[0] += count
+            entry[1] += total
+            entry[2] = min(entry[2], low)
+            entry[3] = max(entry[3], high)
+    return target
+
+
+def aggregate_frame(df):
+    # timestamp/emotion/confidence/face_id sütunlu DataFrame'den özetler (yeniden kurma için)
+    if df.empty:
+        return {}
+    df = df.assign(face_id=df['face_id'].fillna("").astype(str), confidence=df['confidence'].fillna(0.0))
+    grouped = df.groupby(['face_id', 'emotion'], observed=True)['confidence'].agg(['count', 'sum', 'min', 'max'])
+    return {key: [int(count), float(total), float(low), float(high)]
+            for key, (count, total, low, high) in zip(grouped.index, grouped.itertuples(index=False))}
+
+
+def stats_from_aggregates(aggregates, face_id=None):
+    # get_emotion_stats biçimi: en sık duygudan başlayarak sayılar ve ortalama güven
+    totals = {}
+    for (face, emotion), entry in aggregates.items():
+        if face_id is not None and face != face_id:
+            continue
+        merge_aggregates(totals, {emotion: entry})
+    if not totals:
+        return {}
+    order = sorted(totals, key=lambda emotion: -totals[emotion][0])
+    return {
+        'emotion_counts': {emotion: totals[emotion][0] for emotion in order},
+        'confidence_means': {emotion: totals[emotion][1] / totals[emotion][0] for emotion in order},
+        'confidence_min': {emotion: totals[emotion][2] for emotion in order},
+        'confidence_max': {emotion: totals[emotion][3] for emotion in order},
+    }
+
+
+def aggregates_dataframe(aggregates):
+    return pd.DataFrame([[face, emotion, *entry] for (face, emotion), entry in aggregates.items()],
+                        columns=AGGREGATE_COLUMNS)
+
+
+class AggregateFile:
+    # JSON dosyasında tutulan özetler. Dosya en fazla save_interval saniyede bir
+    # (ve sync/close'ta) atomik olarak yeniden yazılır; yanında özetlerin
+    # karşılık geldiği veri boyutu saklanır. Açılışta boyut veriyle uyuşmazsa
+    # (örneğin son kayıttan önce çökme) depo özetleri yeniden kurar.
+    def __init__(self, path, save_interval=1.0):
+        self.path = path
+        self.save_interval = save_interval
+        self.values = {}
+        self.source_size = None
+        self._dirty = False
+        self._last_save = 0.0
+        if os.path.exists(path):
+            try:
+                with open(path, encoding='utf-8') as f:
+                    stored = json.load(f)
+                self.values = {(face, emotion): list(entry) for face, emotion, *entry in stored['values']}
+                self.source_size = stored['source_size']
+            except (OSError, ValueError, KeyError, TypeError) as e:
+                print(f"Uyarı: {path} okunamadı, özetler yeniden kurulacak: {e}")
+
+    def is_current(self, source_size):
+        return self.source_size == source_size
+
+    def update(self, rows, source_size):
+        merge_aggregates(self.values, aggregate_rows(rows))
+        self.source_size = source_size
+        self._dirty = True
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def replace(self, values, source_size):
+        self.values = values
+        self.source_size = source_size
+        self._dirty = True
+        self.save()
+
+    def save(self):
+        if not self._dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'source_size': self.source_size,
+                       'values': [[face, emotion, *entry] for (face, emotion), entry in self.values.items()]},
+                      f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        self._last_save = time.monotonic()
@@ -0,0 +1,208 @@
+# Duygu geçmişi için sıkıştırılmış, sütunlu bellek içi kapsayıcı. Satırlar
+# Python listeleri yerine NumPy dizilerinde tutulur:
+#   timestamp  -> int64 mikrosaniye (artan sırada)
+#   emotion    -> uint8 duygu kodu (emotion_names sözlüğü)
+#   confidence -> float32 veya float16 güven
+#   face       -> uint32 kişi kodu (face_names sözlüğü)
+# Sütun tipleri ve dosya adları history_store gün bölümleriyle ortaktır; diziler
+# bu ham dosyalardan np.memmap ile açılabilir. Zaman aralığı dilimleri
+# searchsorted ile bulunur ve kopya değil görünüm (view) döndürür.
+import json
+import os
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+COLUMNS = {
+    'timestamp': np.dtype(np.int64),
+    'emotion': np.dtype(np.uint8),
+    'confidence': np.dtype(np.float32),
+    'face': np.dtype(np.uint32),
+}
+COLUMN_FILES = {'timestamp': 'timestamp.i8', 'emotion': 'emotion.u1', 'confidence': 'confidence.f4', 'face': 'face.u4'}
+
+
+def to_epoch_us(timestamps):
+    # ISO metinleri (veya datetime) -> int64 mikrosaniye
+    return np.asarray(timestamps, dtype='datetime64[us]').astype(np.int64)
+
+
+def from_epoch_us(values):
+    return np.asarray(values, dtype=np.int64).astype('datetime64[us]')
+
+
+# Güven sütununun dosya adı veri tipine göre seçilir
+CONFIDENCE_FILES = {np.dtype(np.float32): 'confidence.f4', np.dtype(np.float16): 'confidence.f2'}
+
+
+def _encode(values):
+    # Metin dizisi -> (kodlar, sözlük); sözlük ilk görülme sırasını korur
+    values = pd.Series(values, dtype=object).fillna("").astype(str)
+    codes, names = pd.factorize(values, sort=False)
+    return codes, list(names)
+
+
+def _read(path, dtype, mmap):
+    if not os.path.exists(path) or os.path.getsize(path) < dtype.itemsize:
+        return np.empty(0, dtype)
+    if mmap:
+        return np.memmap(path, dtype=dtype, mode='r', shape=(os.path.getsize(path) // dtype.itemsize,))
+    return np.fromfile(path, dtype=dtype)
+
+
+class EmotionColumns:
+    def __init__(self, timestamp, emotion, confidence, face, emotion_names, face_names):
+        # Diziler kopyalanmaz (memmap olabilir); zaman damgaları artan sırada olmalıdır
+        self.timestamp = timestamp
+        self.emotion = emotion
+        self.confidence = confidence
+        self.face = face
+        self.emotion_names = list(emotion_names)
+        self.face_names = list(face_names)
+
+    # --- Oluşturma ---
+
+    @classmethod
+    def from_arrays(cls, timestamp, emotion, confidence, face, emotion_names, face_names,
+                    confidence_dtype=np.float32):
+        timestamp = np.asarray(timestamp, dtype=COLUMNS['timestamp'])
+        arrays = [timestamp, np.asarray(emotion, dtype=COLUMNS['emotion']),
+                  np.asarray(confidence, dtype=confidence_dtype), np.asarray(face, dtype=COLUMNS['face'])]
+        # Eşzamanlı yazımlar sırayı hafifçe bozabilir; yalnızca gerekirse sıralanır (kopya)
+        if len(timestamp) > 1 and (np.diff(timestamp) < 0).any():
+            order = np.argsort(timestamp, kind='stable')
+            arrays = [values[order] for values in arrays]
+        return cls(*arrays, emotion_names, face_names)
+
+    @classmethod
+    def from_dataframe(cls, df, confidence_dtype=np.float32):
+        # timestamp/emotion/confidence/face_id sütunlu DataFrame'den
+        if df.empty:
+            return cls.empty()
+        emotion, emotion_names = _encode(df['emotion'])
+        face, face_names = _encode(df['face_id'])
+        return cls.from_arrays(to_epoch_us(pd.to_datetime(df['timestamp'], format='ISO8601')),
+                               emotion, df['confidence'].fillna(0.0).to_numpy(), face,
+                               emotion_names, face_names, confidence_dtype)
+
+    @classmethod
+    def from_rows(cls, rows, confidence_dtype=np.float32):
+        # get_emotion_history biçimindeki [timestamp, emotion, confidence, face_id] satırlarından
+        df = pd.DataFrame([row[:4] for row in rows], columns=['timestamp', 'emotion', 'confidence', 'face_id'])
+        return cls.from_dataframe(df, confidence_dtype)
+
+    @classmethod
+    def empty(cls, emotion_names=(), face_names=()):
+        return cls(np.empty(0, COLUMNS['timestamp']), np.empty(0, COLUMNS['emotion']), np.empty(0, np.float32),
+                   np.empty(0, COLUMNS['face']), emotion_names, face_names)
+
+    @classmethod
+    def concat(cls, parts, emotion_names=(), face_names=()):
+        # Aynı sözlükleri paylaşan parçalar (ör. ardışık gün bölümleri); sonuç bir kopyadır
+        if len(parts) == 1:
+            return parts[0]
+        if not parts:
+            return cls.empty(emotion_names, face_names)
+        first = parts[0]
+        return cls(*(np.concatenate([getattr(part, name) for part in parts]) for name in COLUMNS),
+                   first.emotion_names, first.face_names)
+
+    # --- Disk ---
+
+    @classmethod
+    def open(cls, directory, emotion_names=None, face_names=None, mmap=True, check_order=True):
+        # Ham sütun dosyalarını açar; sözlükler verilmezse klasördeki emotions.json/faces.json okunur.
+        # save() ile yazılan dosyalar zaten sıralıdır; check_order=False memmap'te tüm zaman
+        # sütununun sıra denetimi için okunmasını önler
+        if emotion_names is None or face_names is None:
+            with open(os.path.join(directory, 'emotions.json'), encoding='utf-8') as f:
+                emotion_names = json.load(f)
+            with open(os.path.join(directory, 'faces.json'), encoding='utf-8') as f:
+                face_names = json.load(f)
+        confidence_dtype = next((dtype for dtype, file in CONFIDENCE_FILES.items()
+                                 if os.path.exists(os.path.join(directory, file))), COLUMNS['confidence'])
+        arrays = [_read(os.path.join(directory, COLUMN_FILES['timestamp']), COLUMNS['timestamp'], mmap),
+                  _read(os.path.join(directory, COLUMN_FILES['emotion']), COLUMNS['emotion'], mmap),
+                  _read(os.path.join(directory, CONFIDENCE_FILES[confidence_dtype]), confidence_dtype, mmap),
+                  _read(os.path.join(directory, COLUMN_FILES['face']), COLUMNS['face'], mmap)]
+        # Yarım kalmış bir yazımda sütun uzunlukları farklı olabilir; en kısa olana göre kırpılır
+        rows = min(len(values) for values in arrays)
+        arrays = [values[:rows] for values in arrays]
+        timestamp = arrays[0]
+        if check_order and rows > 1 and (np.diff(timestamp) < 0).any():
+            return cls.from_arrays(*arrays, emotion_names, face_names, confidence_dtype)
+        return cls(*arrays, emotion_names, face_names)
+
+    def save(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        files = {'timestamp': COLUMN_FILES['timestamp'], 'emotion': COLUMN_FILES['emotion'],
+                 'confidence': CONFIDENCE_FILES[self.confidence.dtype], 'face': COLUMN_FILES['face']}
+        for name, file in files.items():
+            np.ascontiguousarray(getattr(self, name)).tofile(os.path.join(directory, file))
+        for file, names in (('emotions.json', self.emotion_names), ('faces.json', self.face_names)):
+            with open(os.path.join(directory, file), 'w', encoding='utf-8') as f:
+                json.dump(names, f, ensure_ascii=False)
+
+    # --- Dilimleme ---
+
+    def __len__(self):
+        return len(self.timestamp)
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in COLUMNS)
+
+    def _slice(self, index):
+        return EmotionColumns(self.timestamp[index], self.emotion[index], self.confidence[index], self.face[index],
+                              self.emotion_names, self.face_names)
+
+    def between(self, start=None, end=None):
+        # [start, end] aralığı; dizilerin görünümleri döner (kopya yok)
+        low = np.searchsorted(self.timestamp, int(to_epoch_us(start)), 'left') if start is not None else 0
+        high = np.searchsorted(self.timestamp, int(to_epoch_us(end)), 'right') if end is not None else len(self)
+        return self._slice(slice(low, high))
+
+    def last(self, days=7):
+        return self.between(datetime.now() - timedelta(days=days))
+
+    def head(self, rows):
+        return self._slice(slice(0, rows))
+
+    def where(self, mask):
+        # Maske ile seçim bir kopyadır
+        return self._slice(np.asarray(mask, dtype=bool))
+
+    def for_face(self, face_id):
+        code = self.face_names.index(face_id) if face_id in self.face_names else None
+        return self.where(self.face == code) if code is not None else self._slice(slice(0, 0))
+
+    # --- Çözme ---
+
+    def timestamps(self):
+        return from_epoch_us(self.timestamp)
+
+    def emotions(self):
+        return np.asarray(self.emotion_names, dtype=object)[self.emotion] if len(self) else np.empty(0, dtype=object)
+
+    def faces(self):
+        return np.asarray(self.face_names, dtype=object)[self.face] if len(self) else np.empty(0, dtype=object)
+
+    def emotion_counts(self):
+        counts = np.bincount(self.emotion, minlength=len(self.emotion_names))
+        return {self.emotion_names[code]: int(count) for code, count in enumerate(counts) if count}
+
+    def to_dataframe(self):
+        return pd.DataFrame({
+            'timestamp': self.timestamps(),
+            'emotion': pd.Categorical.from_codes(self.emotion.astype(np.int16), self.emotion_names)
+            if self.emotion_names else pd.Categorical([]),
+            'confidence': self.confidence,
+            'face_id': pd.Categorical.from_codes(self.face.astype(np.int64), self.face_names)
+            if self.face_names else pd.Categorical([]),
+        })
+
+    def to_rows(self):
+        # get_emotion_history biçimi
+        return [[pd.Timestamp(timestamp), emotion, confidence, face] for timestamp, emotion, confidence, face
+                in zip(self.timestamps().tolist(), self.emotions().tolist(), self.confidence.tolist(), self.faces().tolist())]
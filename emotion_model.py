@@ -1,112 +1,506 @@
 import cv2
-import tensorflow as tf
+import hashlib
 import numpy as np
-from tensorflow.keras.models import load_model
-import tensorflow.keras as keras
-from tensorflow.keras.utils import register_keras_serializable
-from tensorflow.keras.layers import Dropout
 import os
+import threading
+from collections import OrderedDict
+from runtime_config import apply_runtime_config, configure_tensorflow
 
-# Swish aktivasyon fonksiyonunu tanımla
-@register_keras_serializable()
-def swish(x):
-    return x * tf.sigmoid(x)
+# TensorFlow modül yüklenirken değil, ilk model yüklemesinde içe aktarılır;
+# böylece emotion_model'i (ve face_detector'ü) içe aktaran her şey, örneğin
+# Streamlit arayüzü, TensorFlow'un birkaç saniyelik açılışını beklemez.
+_custom_objects = None
+_custom_objects_lock = threading.Lock()
 
-# FixedDropout katmanını tanımla
-@register_keras_serializable()
-class FixedDropout(Dropout):
-    def __init__(self, rate, **kwargs):
-        super().__init__(rate, **kwargs)
-        self.rate = rate
 
-    def call(self, inputs, training=None):
-        if training is None:
-            training = tf.keras.backend.learning_phase()
-        return super().call(inputs, training=training)
+def _tensorflow():
+    import tensorflow as tf
+    # İş parçacığı havuzları ilk işlemden önce runtime_config'e göre ayarlanır
+    configure_tensorflow(tf)
+    return tf
 
-    def get_config(self):
-        config = super().get_config()
-        config.update({"rate": self.rate})
-        return config
 
-__all__ = ['EmotionRecognizer']
+def keras_custom_objects():
+    # Modeldeki özel aktivasyon ve katmanlar (bir kez tanımlanıp kaydedilir)
+    global _custom_objects
+    with _custom_objects_lock:
+        if _custom_objects is not None:
+            return _custom_objects
 
-class EmotionRecognizer:
-    def __init__(self, model_path='model/emotion_model.h5'):
+        tf = _tensorflow()
+        from tensorflow.keras.utils import register_keras_serializable
+        from tensorflow.keras.layers import Dropout
+
+        # Swish aktivasyon fonksiyonunu tanımla
+        @register_keras_serializable()
+        def swish(x):
+            return x * tf.sigmoid(x)
+
+        # FixedDropout katmanını tanımla
+        @register_keras_serializable()
+        class FixedDropout(Dropout):
+            def __init__(self, rate, **kwargs):
+                super().__init__(rate, **kwargs)
+                self.rate = rate
+
+            def call(self, inputs, training=None):
+                if training is None:
+                    training = tf.keras.backend.learning_phase()
+                return super().call(inputs, training=training)
+
+            def get_config(self):
+                config = super().get_config()
+                config.update({"rate": self.rate})
+                return config
+
+        # Model yükleme seçenekleri
+        _custom_objects = {
+            'Adam': tf.keras.optimizers.Adam,
+            'InputLayer': tf.keras.layers.InputLayer,
+            'Dense': tf.keras.layers.Dense,
+            'Conv2D': tf.keras.layers.Conv2D,
+            'MaxPooling2D': tf.keras.layers.MaxPooling2D,
+            'Flatten': tf.keras.layers.Flatten,
+            'Dropout': tf.keras.layers.Dropout,
+            'FixedDropout': FixedDropout,  # FixedDropout katmanını ekle
+            'BatchNormalization': tf.keras.layers.BatchNormalization,
+            'swish': swish,  # Swish aktivasyon fonksiyonunu ekle
+            'Activation': tf.keras.layers.Activation
+        }
+        return _custom_objects
+
+__all__ = ['EmotionRecognizer', 'FacePreprocessor', 'InferenceEngine', 'TFLiteEngine', 'PredictionCache',
+           'FrameResultCache', 'make_prediction_cache', 'load_emotion_model', 'keras_custom_objects']
+
+# Çıkarım arka ucu: "keras" (h5 modeli) veya "tflite" (dönüştürülmüş model)
+EMOTION_BACKEND = os.getenv("EMOTION_BACKEND", "keras")
+EMOTION_TFLITE_MODEL = os.getenv("EMOTION_TFLITE_MODEL", "model/emotion_model_float16.tflite")
+
+# Derlenmiş çıkarım yolu (0 -> model.predict kullanılır)
+USE_INFERENCE_ENGINE = os.getenv("EMOTION_INFERENCE_ENGINE", "1") != "0"
+
+# Her biri için ayrı grafik izlenen batch boyutları
+BATCH_BUCKETS = tuple(int(b) for b in os.getenv("EMOTION_BATCH_BUCKETS", "1,2,4,8,16,32,64").split(","))
+
+# Yüz başına tahmin önbelleği (0 -> kapalı) ve anahtar modu ("exact" veya "perceptual")
+PREDICTION_CACHE_MB = float(os.getenv("EMOTION_CACHE_MB", "16"))
+PREDICTION_CACHE_MODE = os.getenv("EMOTION_CACHE_MODE", "exact")
+
+# Önbellek kaydı başına yaklaşık Python nesne yükü (bayt)
+CACHE_ENTRY_OVERHEAD = 200
+
+
+class LRUCache:
+    # Bellek sınırlı, iş parçacığı güvenli LRU önbellek. Her kaydın yaklaşık
+    # boyutu eklenirken verilir; toplam max_bytes'ı aşınca en eski kayıtlar atılır.
+    def __init__(self, max_bytes):
+        self.max_bytes = int(max_bytes)
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, value, size):
+        size += CACHE_ENTRY_OVERHEAD
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.bytes_used -= old[1]
+            self._entries[key] = (value, size)
+            self.bytes_used += size
+            while self.bytes_used > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.bytes_used -= evicted
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes_used = 0
+
+    def get_stats(self):
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_ratio': self.hits / total if total else 0.0,
+            'entries': len(self._entries),
+            'bytes_used': self.bytes_used,
+            'max_bytes': self.max_bytes,
+            'evictions': self.evictions,
+        }
+
+
+class PredictionCache(LRUCache):
+    # Normalize edilmiş (model boyutuna getirilmiş gri) yüz kırpıntısından
+    # olasılık vektörüne önbellek. "exact" modunda anahtar piksel içeriğinin
+    # blake2b özetidir; "perceptual" modunda hash_size x hash_size fark hash'i
+    # (dHash) kullanılır, böylece yeniden sıkıştırma veya küçük ışık farkı olan
+    # neredeyse aynı kırpıntılar da aynı tahmini paylaşır.
+    MODES = ('exact', 'perceptual')
+
+    def __init__(self, max_bytes, mode='exact', hash_size=8):
+        if mode not in self.MODES:
+            raise ValueError(f"Bilinmeyen önbellek modu: {mode}")
+        super().__init__(max_bytes)
+        self.mode = mode
+        self.hash_size = hash_size
+
+    def key(self, pixels):
+        # pixels: modelin giriş boyutundaki uint8 gri kırpıntı (bitişik)
+        if self.mode == 'exact':
+            return hashlib.blake2b(pixels, digest_size=16).digest()
+        small = cv2.resize(pixels, (self.hash_size + 1, self.hash_size), interpolation=cv2.INTER_AREA)
+        return np.packbits(small[:, 1:] > small[:, :-1]).tobytes()
+
+    def put(self, key, probabilities):
+        # Önbellekteki dizi paylaşıldığı için salt okunur saklanır
+        probabilities = np.array(probabilities, dtype=np.float32)
+        probabilities.flags.writeable = False
+        super().put(key, probabilities, len(key) + probabilities.nbytes)
+
+
+def make_prediction_cache(cache_mb=None, cache_mode=None):
+    # Ortam değişkenlerindeki varsayılanlarla tahmin önbelleği (0 MB -> None)
+    cache_mb = PREDICTION_CACHE_MB if cache_mb is None else cache_mb
+    if cache_mb <= 0:
+        return None
+    return PredictionCache(cache_mb * 2 ** 20, cache_mode or PREDICTION_CACHE_MODE)
+
+
+class FrameResultCache(LRUCache):
+    # Görüntü baytlarından kare analiz sonucuna önbellek. Streamlit her
+    # etkileşimde betiği baştan çalıştırdığında aynı kamera/yükleme görüntüsü
+    # yeniden analiz edilmez. Sonucu etkileyen durum (ör. galeri sürümü)
+    # anahtara context olarak eklenir.
+    def key(self, image_bytes, *context):
+        digest = hashlib.blake2b(image_bytes, digest_size=16)
+        digest.update(repr(context).encode())
+        return digest.digest()
+
+    def get(self, key):
+        faces = super().get(key)
+        return None if faces is None else [dict(face) for face in faces]
+
+    def put(self, key, faces):
+        size = sum(CACHE_ENTRY_OVERHEAD + sum(getattr(v, 'nbytes', 0) for v in face.values()) for face in faces)
+        super().put(key, [dict(face) for face in faces], size)
+
+
+class InferenceEngine:
+    # model.predict her çağrıda veri adaptörü ve yeni bir çalıştırma döngüsü
+    # kurar; tek yüzlük çağrılarda bu yük hesaplamanın kendisinden büyüktür.
+    # Burada model her batch kovası için sabit giriş imzalı bir tf.function
+    # olarak bir kez izlenir ve yüklemede ısıtılır. Gelen batch en yakın
+    # büyük kovaya sıfırla doldurulur, en büyük kovayı aşanlar parçalanır.
+    def __init__(self, model, buckets=BATCH_BUCKETS):
+        tf = self._tf = _tensorflow()
+        self.model = model
+        self.buckets = sorted(set(buckets))
+        self.sample_shape = tuple(model.input_shape[1:])
+        # tf.function nesneleri de saklanır; somut fonksiyon tek başına tutulursa
+        # izlendiği fonksiyon çöp toplayıcıya gidebilir
+        self._traced = {}
+        self._functions = {}
+        for size in self.buckets:
+            spec = tf.TensorSpec((size,) + self.sample_shape, tf.float32)
+            self._traced[size] = tf.function(lambda x: self.model(x, training=False), input_signature=[spec])
+            self._functions[size] = self._traced[size].get_concrete_function()
+        self.warmup()
+
+    def warmup(self):
+        # İlk gerçek çağrının grafik hazırlığı ve bellek ayırma maliyetini ödememesi için
+        for size, function in self._functions.items():
+            function(self._tf.zeros((size,) + self.sample_shape, self._tf.float32))
+
+    def _bucket(self, count):
+        for size in self.buckets:
+            if size >= count:
+                return size
+        return self.buckets[-1]
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        outputs = []
+        for start in range(0, len(batch), self.buckets[-1]):
+            chunk = batch[start:start + self.buckets[-1]]
+            size = self._bucket(len(chunk))
+            if len(chunk) < size:
+                padded = np.zeros((size,) + chunk.shape[1:], dtype=np.float32)
+                padded[:len(chunk)] = chunk
+                chunk = padded
+            outputs.append(self._functions[size](self._tf.constant(chunk)).numpy()[:len(batch) - start])
+        return np.concatenate(outputs) if len(outputs) > 1 else outputs[0]
+
+
+class TFLiteEngine:
+    # Dönüştürülmüş .tflite modelini çalıştırır (bkz. tflite_export.py).
+    # Varsa hafif tflite_runtime paketi, yoksa TensorFlow içindeki yorumlayıcı
+    # kullanılır. Yorumlayıcı iş parçacığı güvenli olmadığından çağrılar kilitlenir;
+    # giriş tensörü yalnızca batch boyutu değiştiğinde yeniden boyutlandırılır.
+    # int8 giriş/çıkışlı modeller için nicemleme burada uygulanır.
+    def __init__(self, model_path, num_threads=None):
         try:
-            # Model dosyasının varlığını kontrol et
-            if not os.path.exists(model_path):
-                raise FileNotFoundError(f"Model dosyası bulunamadı: {model_path}")
+            from tflite_runtime.interpreter import Interpreter
+        except ImportError:
+            Interpreter = _tensorflow().lite.Interpreter
+        self.interpreter = Interpreter(model_path=model_path, num_threads=num_threads or None)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.sample_shape = tuple(int(d) for d in self._input['shape'][1:])
+        self._batch_size = int(self._input['shape'][0])
+        self._lock = threading.Lock()
+        self.warmup()
 
-            # TensorFlow ve Keras versiyonlarını kontrol et
-            print(f"TensorFlow version: {tf.__version__}")
-            print(f"Keras version: {keras.__version__}")
-            
-            # Model yükleme seçenekleri
-            custom_objects = {
-                'Adam': tf.keras.optimizers.Adam,
-                'InputLayer': tf.keras.layers.InputLayer,
-                'Dense': tf.keras.layers.Dense,
-                'Conv2D': tf.keras.layers.Conv2D,
-                'MaxPooling2D': tf.keras.layers.MaxPooling2D,
-                'Flatten': tf.keras.layers.Flatten,
-                'Dropout': tf.keras.layers.Dropout,
-                'FixedDropout': FixedDropout,  # FixedDropout katmanını ekle
-                'BatchNormalization': tf.keras.layers.BatchNormalization,
-                'swish': swish,  # Swish aktivasyon fonksiyonunu ekle
-                'Activation': tf.keras.layers.Activation
-            }
-            
-            # Modeli yükle
+    def warmup(self):
+        self(np.zeros((1,) + self.sample_shape, dtype=np.float32))
+
+    def _resize(self, count):
+        if count == self._batch_size:
+            return
+        self.interpreter.resize_tensor_input(self._input['index'], (count,) + self.sample_shape)
+        self.interpreter.allocate_tensors()
+        self._output = self.interpreter.get_output_details()[0]
+        self._batch_size = count
+
+    def __call__(self, batch):
+        batch = np.asarray(batch, dtype=np.float32)
+        with self._lock:
+            self._resize(len(batch))
+            dtype = self._input['dtype']
+            if dtype != np.float32:
+                scale, zero_point = self._input['quantization']
+                info = np.iinfo(dtype)
+                batch = np.clip(np.round(batch / scale + zero_point), info.min, info.max).astype(dtype)
+            self.interpreter.set_tensor(self._input['index'], batch)
+            self.interpreter.invoke()
+            output = self.interpreter.get_tensor(self._output['index'])
+            if self._output['dtype'] != np.float32:
+                scale, zero_point = self._output['quantization']
+                output = (output.astype(np.float32) - zero_point) * scale
+        return output
+
+
+class FacePreprocessor:
+    # Yüz kırpıntılarını model girişine dönüştürür. Her iş parçacığının
+    # yeniden kullanılan uint8 (yeniden boyutlandırma) ve float32 (model girişi)
+    # batch dizileri vardır: her yüz doğrudan kendi yuvasına yeniden
+    # boyutlandırılır, ardından tüm batch tek işlemde yerinde normalize edilir.
+    # Döndürülen batch bu dizilere bir görünümdür ve aynı iş parçacığındaki
+    # bir sonraki çağrıda üzerine yazılır.
+    SHARED_GRAY_MAX_RATIO = 2
+
+    def __init__(self, sample_shape):
+        self.sample_shape = tuple(sample_shape)
+        self.height, self.width = self.sample_shape[:2]
+        self._local = threading.local()
+
+    def _buffers(self, count):
+        # İlk kullanımda count 0 olsa da diziler ayrılır (pixels() ve boş batch'ler için)
+        capacity = getattr(self._local, 'capacity', 0)
+        if count > capacity or not capacity:
+            capacity = max(count, capacity * 2, 8)
+            self._local.pixels = np.empty((capacity, self.height, self.width), dtype=np.uint8)
+            self._local.batch = np.empty((capacity,) + self.sample_shape, dtype=np.float32)
+            self._local.capacity = capacity
+        return self._local.pixels, self._local.batch
+
+    def pixels(self, count):
+        # Son doldurulan batch'in uint8 gri kırpıntıları (aynı sıra, aynı iş parçacığı)
+        return self._local.pixels[:count]
+
+    def _fill(self, grays, count):
+        # grays: (indeks, gri görüntü) çiftleri; en fazla count adet
+        pixels, batch = self._buffers(count)
+        indices = []
+        for i, gray in grays:
+            if gray is None or gray.size == 0:
+                continue
             try:
-                # tf.keras.models.load_model ile yükle
-                self.model = tf.keras.models.load_model(model_path, custom_objects=custom_objects, compile=False)
+                cv2.resize(gray, (self.width, self.height), dst=pixels[len(indices)], interpolation=cv2.INTER_LINEAR)
+                indices.append(i)
             except Exception as e:
-                print(f"Model yükleme hatası: {str(e)}")
-                raise
-            
-            # Model giriş boyutunu al
-            if hasattr(self.model, 'input_shape'):
-                self.input_shape = self.model.input_shape[1:3]  # (height, width)
+                print(f"Duygu tahmini yapılırken hata oluştu: {str(e)}")
+        if not indices:
+            return None, indices
+
+        # Normalize et (tek geçişte, doğrudan model girişi dizisine)
+        n = len(indices)
+        np.multiply(pixels[:n], np.float32(1.0 / 255.0), out=batch[:n].reshape(n, self.height, self.width))
+        return batch[:n], indices
+
+    def from_crops(self, face_imgs):
+        # Ayrı kırpıntılar (BGR veya gri)
+        def grays():
+            for i, face_img in enumerate(face_imgs):
+                if face_img is not None and face_img.size and face_img.ndim == 3:
+                    face_img = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
+                yield i, face_img
+        return self._fill(grays(), len(face_imgs))
+
+    def from_frame(self, frame, faces):
+        # Yüzler birbirine yakınsa tümünü kapsayan bölge bir kez gri tonlamaya
+        # çevrilir ve kutular bu ortak görüntüden kesilir. Yüzler dağınıksa
+        # (kapsayan bölge kutuların toplam alanının SHARED_GRAY_MAX_RATIO katından
+        # büyükse) her kutu ayrı çevrilir; aksi halde karenin çoğu boşuna çevrilirdi.
+        if len(faces) == 0:
+            return None, []
+        # Kutu sayısı küçük olduğundan sınırlar düz Python tamsayılarıyla hesaplanır
+        boxes = [(int(x), int(y), int(w), int(h)) for x, y, w, h in faces]
+        x0 = max(min(x for x, _, _, _ in boxes), 0)
+        y0 = max(min(y for _, y, _, _ in boxes), 0)
+        x1 = min(max(x + w for x, _, w, _ in boxes), frame.shape[1])
+        y1 = min(max(y + h for _, y, _, h in boxes), frame.shape[0])
+        if frame.ndim == 3 and (x1 - x0) * (y1 - y0) > self.SHARED_GRAY_MAX_RATIO * sum(w * h for _, _, w, h in boxes):
+            def grays():
+                for i, (x, y, w, h) in enumerate(boxes):
+                    crop = frame[max(y, 0):y+h, max(x, 0):x+w]
+                    yield i, cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY) if crop.size else crop
+            return self._fill(grays(), len(faces))
+        region = frame[y0:y1, x0:x1]
+        if region.size == 0:
+            return None, []
+        gray = cv2.cvtColor(region, cv2.COLOR_BGR2GRAY) if region.ndim == 3 else region
+        return self._fill(((i, gray[y-y0:y-y0+h, x-x0:x-x0+w]) for i, (x, y, w, h) in enumerate(boxes)), len(faces))
+
+
+def load_emotion_model(model_path='model/emotion_model.h5'):
+    # Özel katman ve aktivasyonlarla h5 modelini yükler
+    if not os.path.exists(model_path):
+        raise FileNotFoundError(f"Model dosyası bulunamadı: {model_path}")
+
+    try:
+        # tf.keras.models.load_model ile yükle
+        custom_objects = keras_custom_objects()
+        return _tensorflow().keras.models.load_model(model_path, custom_objects=custom_objects, compile=False)
+    except Exception as e:
+        print(f"Model yükleme hatası: {str(e)}")
+        raise
+
+
+class EmotionRecognizer:
+    def __init__(self, model_path='model/emotion_model.h5', use_engine=USE_INFERENCE_ENGINE,
+                 backend=None, tflite_path=None, num_threads=None, cache_mb=None, cache_mode=None):
+        try:
+            # TFLite iş parçacığı sayısı (0 -> yorumlayıcının varsayılanı) runtime_config'ten gelir
+            runtime = apply_runtime_config()
+            backend = backend or EMOTION_BACKEND
+            self.backend = backend
+            self.model = None
+            self.engine = None
+
+            if backend == 'tflite':
+                tflite_path = tflite_path or EMOTION_TFLITE_MODEL
+                if not os.path.exists(tflite_path):
+                    raise FileNotFoundError(f"TFLite model dosyası bulunamadı: {tflite_path}")
+                threads = num_threads if num_threads is not None else runtime['tflite_threads']
+                self.engine = TFLiteEngine(tflite_path, threads)
+                self.sample_shape = self.engine.sample_shape
+            elif backend == 'keras':
+                # TensorFlow ve Keras versiyonlarını kontrol et
+                tf = _tensorflow()
+                print(f"TensorFlow version: {tf.__version__}")
+                print(f"Keras version: {tf.keras.__version__}")
+                
+                # Modeli yükle
+                self.model = load_emotion_model(model_path)
+                self.sample_shape = tuple(self.model.input_shape[1:])
+                
+                # Derlenmiş çıkarım motoru (yüklemede tüm kovalar ısıtılır)
+                if use_engine:
+                    self.engine = InferenceEngine(self.model)
             else:
-                # Varsayılan boyut
-                self.input_shape = (224, 224)
+                raise ValueError(f"Bilinmeyen duygu modeli arka ucu: {backend}")
+            
+            # Model giriş boyutu (height, width)
+            self.input_shape = self.sample_shape[:2]
+            self.preprocessor = FacePreprocessor(self.sample_shape)
+            
+            # Aynı (veya perceptual modda neredeyse aynı) yüz için model yeniden çalıştırılmaz
+            self.cache = make_prediction_cache(cache_mb, cache_mode)
             
             # Sınıf isimleri
             self.class_names = ['angry', 'disgust', 'fear', 'happy', 'sad', 'surprise', 'neutral']
             
-            print(f"Model başarıyla yüklendi. Giriş boyutu: {self.input_shape}")
+            print(f"Model başarıyla yüklendi ({backend}). Giriş boyutu: {self.input_shape}")
             
         except Exception as e:
             print(f"Model yüklenirken hata oluştu: {str(e)}")
             raise
 
-    def predict_emotion(self, face_img):
+    def preprocess(self, face_imgs):
+        # Kırpıntıları model girişi biçiminde tek batch dizisine çevirir.
+        # Dönüş: (batch kopyası, batch'e giren kırpıntıların indeksleri)
+        batch, indices = self.preprocessor.from_crops(face_imgs)
+        return (batch.copy() if batch is not None else None), indices
+
+    def predict_batch(self, batch):
+        # Ön işlenmiş batch için olasılık matrisi
+        if self.engine is not None:
+            return self.engine(batch)
+        return self.model.predict(batch, batch_size=len(batch), verbose=0)
+
+    def _predict(self, prepare, count):
+        # Her yüz için (etiket, güven, olasılık vektörü) döndürür;
+        # işlenemeyen kırpıntılar ("unknown", 0.0, None) olur.
+        results = [("unknown", 0.0, None)] * count
         try:
-            # Görüntüyü gri tonlamaya çevir
-            if len(face_img.shape) == 3:
-                face_img = cv2.cvtColor(face_img, cv2.COLOR_BGR2GRAY)
+            batch, indices = prepare()
+            if batch is None:
+                return results
             
-            # Görüntüyü yeniden boyutlandır
-            face_img = cv2.resize(face_img, self.input_shape)
-            
-            # Normalize et
-            face_img = face_img.astype('float32') / 255.0
-            
-            # Model girişi için boyutları ayarla
-            if len(self.model.input_shape) == 4:  # (batch, height, width, channels)
-                face_img = np.expand_dims(face_img, axis=0)  # batch boyutu ekle
-                face_img = np.expand_dims(face_img, axis=-1)  # channel boyutu ekle
-            
-            # Tahmin yap
-            prediction = self.model.predict(face_img, verbose=0)
-            emotion_index = np.argmax(prediction)
-            
-            return self.class_names[emotion_index], prediction[0][emotion_index]
+            predictions = [None] * len(indices)
+            if self.cache is not None:
+                keys = [self.cache.key(pixels) for pixels in self.preprocessor.pixels(len(indices))]
+                predictions = [self.cache.get(key) for key in keys]
+            missing = [j for j, prediction in enumerate(predictions) if prediction is None]
             
+            # Önbellekte olmayan yüzler için tek tahmin
+            if missing:
+                computed = self.predict_batch(batch if len(missing) == len(indices) else batch[missing])
+                for j, prediction in zip(missing, computed):
+                    predictions[j] = prediction
+                    if self.cache is not None:
+                        self.cache.put(keys[j], prediction)
         except Exception as e:
             print(f"Duygu tahmini yapılırken hata oluştu: {str(e)}")
-            return "unknown", 0.0
+            return results
+
+        for i, prediction in zip(indices, predictions):
+            emotion_index = int(np.argmax(prediction))
+            results[i] = (self.class_names[emotion_index], prediction[emotion_index], prediction)
+        return results
+
+    def predict_emotions(self, face_imgs):
+        # Tüm yüz kırpıntılarını tek bir batch tensörüne toplayıp tek ileri
+        # geçişte sınıflandırır
+        return self._predict(lambda: self.preprocessor.from_crops(face_imgs), len(face_imgs))
+
+    def predict_frame_emotions(self, frame, faces):
+        # Karedeki (x, y, w, h) kutularını kırpıntı oluşturmadan sınıflandırır
+        return self._predict(lambda: self.preprocessor.from_frame(frame, faces), len(faces))
+
+    def predict_emotion(self, face_img):
+        emotion, confidence, _ = self.predict_emotions([face_img])[0]
+        return emotion, confidence
 
 # Test için
 if __name__ == "__main__":
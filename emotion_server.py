@@ -0,0 +1,264 @@
+# Yerel duygu modeli sunucusu. Tek bir süreç EmotionRecognizer'ı sahiplenir;
+# Streamlit oturumları (veya başka süreçler) ön işlenmiş yüz batch'lerini
+# yerel bir soket üzerinden gönderir. Aynı anda gelen istekler en fazla
+# max_wait_ms beklenerek max_batch yüzlük mikro batch'lerde birleştirilir ve
+# tek ileri geçişte çalıştırılır. Kuyruktaki yüz sayısı max_pending'i aşarsa
+# yeni istekler beklemeden "meşgul" yanıtıyla reddedilir (geri basınç).
+#
+# Kullanım:
+#   python emotion_server.py [--address 127.0.0.1:6010] [--max-batch 32] [--max-wait-ms 5] [--max-pending 256]
+# Uygulama EMOTION_SERVER=127.0.0.1:6010 ile başlatılırsa modeli bu sunucudan kullanır.
+import argparse
+import itertools
+import os
+import queue
+import secrets
+import threading
+import time
+from concurrent.futures import Future
+from multiprocessing.connection import Client, Listener
+
+import numpy as np
+
+from emotion_model import EmotionRecognizer, FacePreprocessor, make_prediction_cache
+
+# Boşsa model uygulama sürecinde yüklenir
+EMOTION_SERVER = os.getenv("EMOTION_SERVER", "")
+# Bağlantı anahtarı. multiprocessing.connection gelen mesajları unpickle ettiğinden
+# anahtarı bilen her yerel kullanıcı sunucuda kod çalıştırabilir; bu yüzden sabit
+# bir varsayılan yoktur. Ortamda verilmezse sunucu rastgele bir anahtar üretip
+# yalnızca sahibinin okuyabileceği (0600) EMOTION_SERVER_AUTHKEY_FILE dosyasına
+# yazar, istemciler anahtarı bu dosyadan okur.
+EMOTION_SERVER_AUTHKEY = os.getenv("EMOTION_SERVER_AUTHKEY", "")
+EMOTION_SERVER_AUTHKEY_FILE = os.getenv("EMOTION_SERVER_AUTHKEY_FILE", "emotion_server.key")
+
+
+class ServerBusyError(RuntimeError):
+    pass
+
+
+def load_authkey(create=False, path=None):
+    if EMOTION_SERVER_AUTHKEY:
+        return EMOTION_SERVER_AUTHKEY.encode()
+    path = path or EMOTION_SERVER_AUTHKEY_FILE
+    if create and not os.path.exists(path):
+        # Anahtar önce geçici dosyaya yazılır ve os.link ile yerine konur; istemci dosyayı
+        # hiçbir zaman boş görmez, aynı anda başlayan iki sunucudan yalnızca biri yazar
+        tmp = f"{path}.{os.getpid()}.tmp"
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(secrets.token_hex(32))
+            os.link(tmp, path)
+        except FileExistsError:
+            pass
+        finally:
+            os.remove(tmp)
+    if os.stat(path).st_mode & 0o077:
+        raise PermissionError(f"{path} başka kullanıcılar tarafından okunabilir; izinleri 0600 olmalı")
+    with open(path) as f:
+        key = f.read().strip()
+    if not key:
+        raise ValueError(f"{path} boş; duygu modeli sunucusu anahtarı okunamadı")
+    return key.encode()
+
+
+def parse_address(address):
+    host, port = address.rsplit(':', 1)
+    return host, int(port)
+
+
+class EmotionServer:
+    def __init__(self, recognizer, address, authkey=None,
+                 max_batch=32, max_wait_ms=5.0, max_pending=256):
+        self.recognizer = recognizer
+        self.address = parse_address(address) if isinstance(address, str) else address
+        self.authkey = authkey or load_authkey(create=True)
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_pending = max_pending
+
+        self._queue = queue.Queue()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+        self.batches = 0
+        self.batched_faces = 0
+        self.rejected = 0
+
+    def serve_forever(self):
+        listener = Listener(self.address, backlog=64, authkey=self.authkey)
+        threading.Thread(target=self._batch_loop, name='emotion-batcher', daemon=True).start()
+        print(f"Duygu modeli sunucusu dinliyor: {self.address[0]}:{self.address[1]}")
+        while True:
+            try:
+                conn = listener.accept()
+            except Exception as e:
+                # Yanlış anahtar veya yarıda kesilen bağlantı sunucuyu durdurmaz
+                print(f"Bağlantı kabul edilemedi: {e}")
+                continue
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        send_lock = threading.Lock()
+        conn.send({'sample_shape': self.recognizer.sample_shape, 'class_names': self.recognizer.class_names})
+        while True:
+            try:
+                request_id, batch = conn.recv()
+            except (EOFError, OSError):
+                conn.close()
+                return
+            with self._pending_lock:
+                # max_pending'den büyük tek bir istek boş sunucuda yine de kabul edilir
+                busy = self._pending > 0 and self._pending + len(batch) > self.max_pending
+                if busy:
+                    self.rejected += 1
+                else:
+                    self._pending += len(batch)
+            if busy:
+                self._send(conn, send_lock, (request_id, None, 'busy'))
+                continue
+            self._queue.put((conn, send_lock, request_id, batch))
+
+    @staticmethod
+    def _send(conn, send_lock, message):
+        try:
+            with send_lock:
+                conn.send(message)
+        except (EOFError, OSError):
+            pass
+
+    def _collect(self):
+        # İlk istek gelene kadar bekler; ardından batch dolana ya da süre bitene kadar toplar
+        items = [self._queue.get()]
+        faces = len(items[0][3])
+        deadline = time.monotonic() + self.max_wait
+        while faces < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            items.append(item)
+            faces += len(item[3])
+        return items, faces
+
+    def _batch_loop(self):
+        while True:
+            items, faces = self._collect()
+            try:
+                predictions = self.recognizer.predict_batch(np.concatenate([item[3] for item in items]))
+                error = None
+            except Exception as e:
+                predictions, error = None, str(e)
+
+            self.batches += 1
+            self.batched_faces += faces
+            start = 0
+            for conn, send_lock, request_id, batch in items:
+                result = None if predictions is None else predictions[start:start + len(batch)]
+                start += len(batch)
+                self._send(conn, send_lock, (request_id, result, error))
+            with self._pending_lock:
+                self._pending -= faces
+
+
+class EmotionClient(EmotionRecognizer):
+    # EmotionRecognizer ile aynı arayüz (predict_emotions, predict_frame_emotions,
+    # class_names, input_shape); ön işleme ve tahmin önbelleği istemcide kalır,
+    # yalnızca model çalıştırma sunucuya gönderilir. Tek bağlantı üzerinden
+    # birden fazla iş parçacığının istekleri eşzamanlı taşınır.
+    def __init__(self, address=None, authkey=None, timeout=10.0, cache_mb=None, cache_mode=None):
+        address = address or EMOTION_SERVER
+        self.address = parse_address(address) if isinstance(address, str) else address
+        self.timeout = timeout
+        self._conn = Client(self.address, authkey=authkey or load_authkey())
+        hello = self._conn.recv()
+
+        self.backend = 'server'
+        self.model = None
+        self.engine = None
+        self.sample_shape = tuple(hello['sample_shape'])
+        self.input_shape = self.sample_shape[:2]
+        self.class_names = list(hello['class_names'])
+        self.preprocessor = FacePreprocessor(self.sample_shape)
+        self.cache = make_prediction_cache(cache_mb, cache_mode)
+
+        self._ids = itertools.count()
+        self._futures = {}
+        self._send_lock = threading.Lock()
+        threading.Thread(target=self._receive_loop, name='emotion-client', daemon=True).start()
+
+    def _receive_loop(self):
+        while True:
+            try:
+                request_id, predictions, error = self._conn.recv()
+            except (EOFError, OSError):
+                for future in list(self._futures.values()):
+                    future.set_exception(ConnectionError("Duygu modeli sunucusu bağlantısı kapandı"))
+                self._futures.clear()
+                return
+            future = self._futures.pop(request_id, None)
+            if future is None:
+                continue
+            if error == 'busy':
+                future.set_exception(ServerBusyError("Duygu modeli sunucusu meşgul"))
+            elif error:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(predictions)
+
+    def predict_batch(self, batch):
+        future = Future()
+        request_id = next(self._ids)
+        self._futures[request_id] = future
+        with self._send_lock:
+            self._conn.send((request_id, np.ascontiguousarray(batch, dtype=np.float32)))
+        try:
+            return future.result(self.timeout)
+        finally:
+            self._futures.pop(request_id, None)
+
+    def close(self):
+        self._conn.close()
+
+
+def serve(address, authkey=None, max_batch=32, max_wait_ms=5.0, max_pending=256, **recognizer_options):
+    # Sunucu tarafında istemci önbellekleri yeterli olduğundan tahmin önbelleği kapalıdır
+    recognizer_options.setdefault('cache_mb', 0)
+    recognizer = EmotionRecognizer(**recognizer_options)
+    EmotionServer(recognizer, address, authkey, max_batch, max_wait_ms, max_pending).serve_forever()
+
+
+def wait_for_server(address, authkey=None, timeout=120.0):
+    # Sunucu modeli yükleyip dinlemeye başlayana (ve anahtar dosyasını yazana) kadar bağlanmayı dener
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            return EmotionClient(address, authkey)
+        except (PermissionError, ValueError):
+            # Anahtar dosyasının izinleri yanlış veya içeriği boş; beklemek düzeltmez
+            raise
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--address', default=EMOTION_SERVER or '127.0.0.1:6010')
+    parser.add_argument('--max-batch', type=int, default=32)
+    parser.add_argument('--max-wait-ms', type=float, default=5.0)
+    parser.add_argument('--max-pending', type=int, default=256)
+    parser.add_argument('--model', default='model/emotion_model.h5')
+    parser.add_argument('--backend')
+    args = parser.parse_args()
+    serve(args.address, max_batch=args.max_batch, max_wait_ms=args.max_wait_ms, max_pending=args.max_pending,
+          model_path=args.model, backend=args.backend)
+
+
+if __name__ == "__main__":
+    main()
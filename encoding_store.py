@@ -0,0 +1,186 @@
+import glob
+import hashlib
+import json
+import os
+import numpy as np
+
+STORE_VERSION = 2
+ENCODING_SIZE = 128
+# encode_many'nin hata veren (okunamayan, yarım kopyalanmış...) dosyalar için ürettiği değer
+ENCODE_FAILED = object()
+
+
+def identity_name(rel_path):
+    # "<isim>.jpg" -> isim, "<isim>/<dosya>.jpg" -> isim
+    parts = rel_path.replace('\\', '/').split('/')
+    if len(parts) > 1:
+        return parts[0]
+    return os.path.splitext(parts[0])[0]
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class EncodingStore:
+    # known_faces klasörünün yanında tutulan encoding önbelleği:
+    #   .encodings.<sürüm>.npy -> (satır, 128) float64 matris, bellek eşlemli okunur
+    #   .encodings.json        -> matris dosyasının adı ve satır sayısı; dosya yolu ->
+    #                             boyut, mtime, içerik özeti, isim, satır
+    # Her yazımda matris yeni adlı bir dosyaya yazılır ve dizin en son değiştirilir;
+    # yarıda kesilen bir yazım eski dizini kendi (eski) matrisiyle bırakır.
+    # Boyutu ve mtime'ı değişmeyen dosyalar okunmadan önbellekten gelir;
+    # değişenlerin içerik özeti karşılaştırılır, yalnızca yeni/değişen
+    # görüntüler yeniden encode edilir, silinen dosyalar budanır.
+    def __init__(self, folder='known_faces', num_jitters=5):
+        self.folder = folder
+        self.num_jitters = num_jitters
+        self.index_path = os.path.join(folder, '.encodings.json')
+
+    def _load(self):
+        if not os.path.exists(self.index_path):
+            return {}, None
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                index = json.load(f)
+            if index.get('version') != STORE_VERSION or index.get('num_jitters') != self.num_jitters:
+                return {}, None
+            matrix = np.load(os.path.join(self.folder, os.path.basename(index['matrix'])), mmap_mode='r')
+            files = index.get('files', {})
+            # Satır sayısı tutmayan (elle değiştirilmiş, kırpılmış) matrisin satırları yanlış kişiye işaret eder
+            if index.get('rows') != len(matrix) or any(entry['row'] >= len(matrix) for entry in files.values()):
+                print("Uyarı: Encoding önbelleği tutarsız, yeniden oluşturulacak.")
+                return {}, None
+            return files, matrix
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Uyarı: Encoding önbelleği okunamadı, yeniden oluşturulacak: {e}")
+            return {}, None
+
+    def _matrix_files(self):
+        return glob.glob(os.path.join(glob.escape(self.folder), '.encodings*.npy'))
+
+    def _save(self, entries, matrix):
+        # Yeni matris dosyası -> geçici dizin -> os.replace; dizin değişene kadar eski
+        # matris ve dizin birlikte geçerlidir. Dönüş: yeni matris dosyasının yolu
+        matrix_name = f'.encodings.{os.urandom(8).hex()}.npy'
+        matrix_path = os.path.join(self.folder, matrix_name)
+        index = {'version': STORE_VERSION, 'num_jitters': self.num_jitters, 'matrix': matrix_name,
+                 'rows': len(matrix), 'files': entries}
+        tmp_index = self.index_path + '.tmp'
+        np.save(matrix_path, matrix)
+        with open(tmp_index, 'w', encoding='utf-8') as f:
+            json.dump(index, f)
+        os.replace(tmp_index, self.index_path)
+
+        # Eski matrisler silinir (Windows'ta hâlâ eşlemli olanlar bir sonraki yazımda)
+        for path in self._matrix_files():
+            if path != matrix_path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+        return matrix_path
+
+    def sync(self, files, encode_many):
+        # files: klasöre göre göreli yollar
+        # encode_many(tam_yollar) -> aynı sırada encoding, None (yüz yok) ya da ENCODE_FAILED
+        # üreten yineleyici; yalnızca yeni/değişen dosyalar için tek seferde çağrılır.
+        # Yüzü olmayan dosyalar -1 satırıyla hatırlanır, hata verenler kaydedilmez ve sonraki
+        # açılışta yeniden denenir
+        # Dönüş: (encodings, isimler, encode edilen dosya sayısı)
+        cached, matrix = self._load()
+        entries = {}
+        encodings = {}
+        missing = []
+        changed = False
+
+        for rel_path in files:
+            full_path = os.path.join(self.folder, rel_path)
+            try:
+                stat = os.stat(full_path)
+            except OSError as e:
+                print(f"Hata: {rel_path} dosyasına erişilemedi: {e}")
+                continue
+
+            entry = cached.get(rel_path)
+            reuse = False
+
+            if entry is not None and (entry['row'] < 0 or matrix is not None):
+                if entry['size'] == stat.st_size and entry['mtime_ns'] == stat.st_mtime_ns:
+                    reuse = True
+                elif entry['size'] == stat.st_size and entry['hash'] == file_hash(full_path):
+                    # Yalnızca mtime değişmiş (ör. kopyalama), içerik aynı
+                    reuse = True
+                    changed = True
+
+            if reuse:
+                digest = entry['hash']
+                if entry['row'] >= 0:
+                    encodings[rel_path] = matrix[entry['row']]
+            else:
+                digest = file_hash(full_path)
+                missing.append(rel_path)
+                changed = True
+
+            entries[rel_path] = {
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'hash': digest,
+                'name': identity_name(rel_path),
+                'row': -1 if entry is None else entry['row'],
+            }
+
+        # Yeni/değişen dosyalar toplu olarak encode edilir
+        if missing:
+            full_paths = [os.path.join(self.folder, rel_path) for rel_path in missing]
+            # Üretecin düzgün kapanması için önce o tüketilir
+            for encoding, rel_path in zip(encode_many(full_paths), missing):
+                if encoding is ENCODE_FAILED:
+                    del entries[rel_path]
+                elif encoding is not None:
+                    encodings[rel_path] = encoding
+
+        # Satırlar dosya sırasına göre yeniden numaralanır
+        rows = []
+        for rel_path, entry in entries.items():
+            row = -1
+            if rel_path in encodings:
+                row = len(rows)
+                rows.append(encodings[rel_path])
+            if entry['row'] != row:
+                changed = True
+            entry['row'] = row
+        encoded = len(missing)
+
+        # Silinen dosyalar
+        if set(cached) - set(entries):
+            changed = True
+
+        if changed:
+            # Satırlar kopyalanır ve eski eşlem bırakılır (Windows'ta os.replace için gerekli)
+            new_matrix = np.array(rows, dtype=np.float64).reshape(-1, ENCODING_SIZE)
+            rows = matrix = encodings = None
+            try:
+                matrix_path = self._save(entries, new_matrix)
+                # Yeni matris bellek eşlemli olarak tekrar açılır
+                matrix = np.load(matrix_path, mmap_mode='r')
+            except OSError as e:
+                print(f"Uyarı: Encoding önbelleği yazılamadı: {e}")
+                matrix = new_matrix
+        elif matrix is None:
+            matrix = np.empty((0, ENCODING_SIZE), dtype=np.float64)
+
+        names = [None] * len(matrix)
+        for entry in entries.values():
+            if entry['row'] >= 0:
+                names[entry['row']] = entry['name']
+        return [matrix[i] for i in range(len(names))], names, encoded
+
+    def clear(self):
+        for path in self._matrix_files() + [self.index_path]:
+            if os.path.exists(path):
+                os.remove(path)
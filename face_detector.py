@@ -1,51 +1,295 @@
 # face_detector.py
 import cv2
 import os
+import shutil
+import threading
+import time
+from datetime import datetime
 import numpy as np
-import face_recognition
 from database import EmotionDatabase
 from emotion_model import EmotionRecognizer
+from encoding_store import ENCODE_FAILED, EncodingStore, identity_name
+from face_gallery import FaceGallery
+from gallery_enrollment import NO_FACE_ERROR, encode_image, encode_images
 
+# Varsayılan yüz dedektörü arka ucu ("haar" veya "dnn")
+FACE_DETECTOR_BACKEND = os.getenv("FACE_DETECTOR_BACKEND", "haar")
 
-def detect_face(frame):
-    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-    face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml')
-    faces = face_cascade.detectMultiScale(gray, scaleFactor=1.3, minNeighbors=5)
+# OpenCV DNN (res10 SSD) yüz dedektörü model dosyaları
+DNN_PROTOTXT_PATH = os.getenv("FACE_DETECTOR_DNN_PROTOTXT", "model/face_detector/deploy.prototxt")
+DNN_MODEL_PATH = os.getenv("FACE_DETECTOR_DNN_MODEL", "model/face_detector/res10_300x300_ssd_iter_140000.caffemodel")
+DNN_CONFIDENCE = float(os.getenv("FACE_DETECTOR_DNN_CONFIDENCE", "0.5"))
+
+
+class HaarFaceDetector:
+    def __init__(self, cascade_xml):
+        # XML metni bellekten okunur, diskteki dosya her örnek için tekrar açılmaz
+        self.cascade = cv2.CascadeClassifier()
+        storage = cv2.FileStorage(cascade_xml, cv2.FILE_STORAGE_READ | cv2.FILE_STORAGE_MEMORY)
+        if not self.cascade.read(storage.getFirstTopLevelNode()):
+            raise ValueError("Haar cascade okunamadı")
+
+    def detect(self, frame, scale_factor=1.3, min_neighbors=5, min_size=None, max_size=None):
+        # Cascade gri görüntüde çalışır; dönüşüm (küçültülmüş) karede yapılır
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        kwargs = {}
+        if min_size:
+            kwargs['minSize'] = min_size
+        if max_size:
+            kwargs['maxSize'] = max_size
+        return self.cascade.detectMultiScale(gray, scaleFactor=scale_factor, minNeighbors=min_neighbors, **kwargs)
+
+
+class DnnFaceDetector:
+    def __init__(self, model_data, confidence=DNN_CONFIDENCE):
+        prototxt, weights = model_data
+        self.net = cv2.dnn.readNetFromCaffe(prototxt, weights)
+        self.confidence = confidence
+
+    def detect(self, frame, scale_factor=None, min_neighbors=None, min_size=None, max_size=None):
+        # res10 SSD renkli BGR ile eğitilmiştir ve kanal başına ortalama çıkarır;
+        # gri kare verilmemelidir (yalnızca gri kaynaklar için 3 kanala çoğaltılır)
+        h, w = frame.shape[:2]
+        bgr = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR) if frame.ndim == 2 else frame
+        blob = cv2.dnn.blobFromImage(cv2.resize(bgr, (300, 300)), 1.0, (300, 300), (104.0, 177.0, 123.0))
+        self.net.setInput(blob)
+        detections = self.net.forward()[0, 0]
+
+        detections = detections[detections[:, 2] >= self.confidence]
+        boxes = detections[:, 3:7] * np.array([w, h, w, h])
+        boxes = np.clip(boxes, 0, [w, h, w, h]).astype(int)
+        faces = np.column_stack([boxes[:, 0], boxes[:, 1], boxes[:, 2] - boxes[:, 0], boxes[:, 3] - boxes[:, 1]])
+
+        # Boyut filtreleri Haar dedektörü ile aynı anlamda uygulanır
+        keep = (faces[:, 2] > 0) & (faces[:, 3] > 0)
+        if min_size:
+            keep &= (faces[:, 2] >= min_size[0]) & (faces[:, 3] >= min_size[1])
+        if max_size:
+            keep &= (faces[:, 2] <= max_size[0]) & (faces[:, 3] <= max_size[1])
+        return faces[keep]
+
+
+def _load_haar_resource():
+    with open(cv2.data.haarcascades + 'haarcascade_frontalface_default.xml', 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+def _load_dnn_resource():
+    if not os.path.exists(DNN_PROTOTXT_PATH) or not os.path.exists(DNN_MODEL_PATH):
+        raise FileNotFoundError(f"DNN yüz dedektörü model dosyaları bulunamadı: {DNN_PROTOTXT_PATH}, {DNN_MODEL_PATH}")
+    with open(DNN_PROTOTXT_PATH, 'rb') as f:
+        prototxt = np.frombuffer(f.read(), np.uint8)
+    with open(DNN_MODEL_PATH, 'rb') as f:
+        weights = np.frombuffer(f.read(), np.uint8)
+    return prototxt, weights
+
+
+# Dedektör arka uçlarını bir kez yükler, her iş parçacığına ayrı örnek verir.
+# OpenCV cascade ve DNN nesneleri iş parçacıkları arasında paylaşılamaz;
+# paylaşılan tek şey diskten bir kez okunan model verisidir.
+class FaceDetectorRegistry:
+    def __init__(self):
+        self._backends = {}
+        self._resources = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def register(self, name, loader, factory):
+        with self._lock:
+            self._backends[name] = (loader, factory)
+            self._resources.pop(name, None)
+
+    def _resource(self, name):
+        with self._lock:
+            if name not in self._backends:
+                raise ValueError(f"Bilinmeyen yüz dedektörü: {name}")
+            if name not in self._resources:
+                loader, _ = self._backends[name]
+                self._resources[name] = loader()
+            return self._resources[name]
+
+    def get(self, name=None):
+        name = name or FACE_DETECTOR_BACKEND
+        detectors = getattr(self._local, 'detectors', None)
+        if detectors is None:
+            detectors = self._local.detectors = {}
+        if name not in detectors:
+            resource = self._resource(name)
+            detectors[name] = self._backends[name][1](resource)
+        return detectors[name]
+
+
+detector_registry = FaceDetectorRegistry()
+detector_registry.register('haar', _load_haar_resource, HaarFaceDetector)
+detector_registry.register('dnn', _load_dnn_resource, DnnFaceDetector)
+
+
+def get_face_detector(backend=None):
+    return detector_registry.get(backend)
+
+
+# Tespit modları: "full" tam çözünürlükte, "downscaled" küçültülmüş kopyada çalışır
+DETECTION_MODES = ('full', 'downscaled')
+
+# Beklenen yüz boyu aralığı (karenin kısa kenarına oranla)
+MIN_FACE_RATIO = 0.1
+MAX_FACE_RATIO = 0.9
+
+# Küçültülmüş karede en küçük beklenen yüzün piksel boyu (Haar penceresi 24 px)
+DOWNSCALED_MIN_FACE_PX = 36
+
+
+def detection_size_limits(frame_shape, min_face_ratio=MIN_FACE_RATIO, max_face_ratio=MAX_FACE_RATIO):
+    # Kare boyutundan minSize/maxSize değerlerini türet
+    short_side = min(frame_shape[:2])
+    min_px = max(int(short_side * min_face_ratio), 24)
+    max_px = max(int(short_side * max_face_ratio), min_px)
+    return (min_px, min_px), (max_px, max_px)
+
+
+def detect_face(frame, backend=None, mode='full'):
+    if mode not in DETECTION_MODES:
+        raise ValueError(f"Bilinmeyen tespit modu: {mode}")
+
+    # Kare arka uca BGR olarak verilir; gri dönüşümü gerekiyorsa arka uç yapar
+    detector = get_face_detector(backend)
+
+    if mode == 'full':
+        return detector.detect(frame, scale_factor=1.3, min_neighbors=5)
+
+    # En küçük beklenen yüz DOWNSCALED_MIN_FACE_PX boyuna inecek şekilde küçült
+    short_side = min(frame.shape[:2])
+    scale = min(1.0, DOWNSCALED_MIN_FACE_PX / max(short_side * MIN_FACE_RATIO, 1.0))
+    if scale < 1.0:
+        small = cv2.resize(frame, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    else:
+        small = frame
+
+    min_size, max_size = detection_size_limits(small.shape)
+    faces = detector.detect(small, scale_factor=1.3, min_neighbors=5, min_size=min_size, max_size=max_size)
+    if len(faces) == 0 or scale == 1.0:
+        return faces
+
+    # Kutuları orijinal kare koordinatlarına geri ölçekle
+    faces = np.round(np.asarray(faces, dtype=np.float64) / scale).astype(int)
+    h, w = frame.shape[:2]
+    faces[:, 0] = np.clip(faces[:, 0], 0, w - 1)
+    faces[:, 1] = np.clip(faces[:, 1], 0, h - 1)
+    faces[:, 2] = np.minimum(faces[:, 2], w - faces[:, 0])
+    faces[:, 3] = np.minimum(faces[:, 3], h - faces[:, 1])
     return faces
 
 
-def detect_multiple_faces(frame, emotion_recognizer=None):
-    faces = detect_face(frame)
+# Tanıma kalite profilleri: jitter sayısı, landmark modeli ve Haar kutusunun
+# face_recognition'a verilip verilmeyeceği (verilmezse dlib kırpıntıda yüzü yeniden arar).
+# Varsayılan 'accurate', eski yolun 3 jitter'ını korur; 'balanced' ve 'fast' daha az
+# jitter ile tanıma kalitesini hız için düşürür (bkz. bench_recognition_profiles.py)
+RECOGNITION_PROFILES = {
+    'fast': {'num_jitters': 1, 'model': 'small', 'use_known_location': True},
+    'balanced': {'num_jitters': 1, 'model': 'large', 'use_known_location': True},
+    'accurate': {'num_jitters': 3, 'model': 'large', 'use_known_location': True},
+}
+RECOGNITION_PROFILE = os.getenv("RECOGNITION_PROFILE", "accurate")
+
+
+def get_recognition_profile(profile=None):
+    if isinstance(profile, dict):
+        return profile
+    name = profile or RECOGNITION_PROFILE
+    if name not in RECOGNITION_PROFILES:
+        raise ValueError(f"Bilinmeyen tanıma profili: {name}")
+    return RECOGNITION_PROFILES[name]
+
+
+def encode_faces(frame, faces, profile=None):
+    # Her (x, y, w, h) kutusu için bir encoding (ya da None) döndürür
+    settings = get_recognition_profile(profile)
+    if len(faces) == 0:
+        return []
+    # dlib modelleri ilk encode işleminde yüklenir (bkz. model_loader.py)
+    import face_recognition
+
+    if settings['use_known_location']:
+        # Kare bir kez RGB'ye çevrilir, kutular (top, right, bottom, left) olarak verilir
+        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        locations = [(int(y), int(x + w), int(y + h), int(x)) for (x, y, w, h) in faces]
+        return list(face_recognition.face_encodings(
+            rgb_frame, known_face_locations=locations,
+            num_jitters=settings['num_jitters'], model=settings['model']))
+
+    encodings = []
+    for (x, y, w, h) in faces:
+        rgb_face = cv2.cvtColor(frame[y:y+h, x:x+w], cv2.COLOR_BGR2RGB)
+        found = face_recognition.face_encodings(rgb_face, num_jitters=settings['num_jitters'], model=settings['model'])
+        encodings.append(found[0] if found else None)
+    return encodings
+
+
+def predict_face_emotions(frame, faces, emotion_recognizer=None):
+    # Karedeki tüm yüzlerin duygusunu tek ileri geçişte tahmin eder;
+    # her kutu için (duygu, güven, olasılıklar) döndürür
+    if not emotion_recognizer or len(faces) == 0:
+        return [("unknown", 0.0, None)] * len(faces)
+    try:
+        return emotion_recognizer.predict_frame_emotions(frame, faces)
+    except Exception as e:
+        print(f"Duygu analizi hatası: {e}")
+        return [("unknown", 0.0, None)] * len(faces)
+
+
+def detect_multiple_faces(frame, emotion_recognizer=None, detection_mode='full', profile=None):
+    faces = detect_face(frame, mode=detection_mode)
     faces_data = []
     
-    for (x, y, w, h) in faces:
-        face_img = frame[y:y+h, x:x+w]
-        
-        # Yüz tanıma
-        rgb_face = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
-        encodings = face_recognition.face_encodings(rgb_face, num_jitters=3)
-        
-        # Duygu analizi
-        emotion = "unknown"
-        confidence = 0.0
-        if emotion_recognizer:
-            try:
-                emotion, confidence = emotion_recognizer.predict_emotion(face_img)
-            except Exception as e:
-                print(f"Duygu analizi hatası: {e}")
-        
+    # Yüz tanıma
+    face_encodings = encode_faces(frame, faces, profile)
+    
+    # Duygu analizi (tüm yüzler tek batch)
+    emotions = predict_face_emotions(frame, faces, emotion_recognizer)
+    
+    for (x, y, w, h), encoding, (emotion, confidence, probabilities) in zip(faces, face_encodings, emotions):
         face_data = {
             'location': (x, y, w, h),
-            'encoding': encodings[0] if encodings else None,
+            'encoding': encoding,
             'emotion': emotion,
-            'confidence': confidence
+            'confidence': confidence,
+            'probabilities': probabilities
         }
         faces_data.append(face_data)
     
     return faces_data
 
 
-def load_known_faces(folder='known_faces'):
+KNOWN_FACE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+
+def list_known_face_files(folder='known_faces'):
+    # Klasöre göre göreli yollar: "<isim>.jpg" (tek fotoğraf) ve "<isim>/<dosya>.jpg"
+    files = []
+    if not os.path.exists(folder):
+        return files
+    for entry in sorted(os.listdir(folder)):
+        path = os.path.join(folder, entry)
+        if os.path.isdir(path):
+            files.extend(f"{entry}/{f}" for f in sorted(os.listdir(path)) if f.lower().endswith(KNOWN_FACE_EXTENSIONS))
+        elif entry.lower().endswith(KNOWN_FACE_EXTENSIONS):
+            files.append(entry)
+    return files
+
+
+def list_known_identities(folder='known_faces'):
+    # isim -> o kişiye ait görüntü yolları
+    identities = {}
+    for rel_path in list_known_face_files(folder):
+        identities.setdefault(identity_name(rel_path), []).append(os.path.join(folder, rel_path))
+    return identities
+
+
+def load_known_faces(folder='known_faces', use_cache=True, workers=None, progress=None):
+    # Bir kişinin birden fazla fotoğrafı varsa her biri için ayrı encoding ve
+    # aynı isim döndürülür; FaceGallery bunları tek kimlikte toplar.
+    # Encode işlemi süreç havuzunda yapılır (workers=1 -> sıralı);
+    # progress(tamamlanan, toplam, EnrollmentResult) her dosyadan sonra çağrılır.
     known_encodings = []
     known_names = []
 
@@ -55,91 +299,155 @@ def load_known_faces(folder='known_faces'):
         os.makedirs(folder, exist_ok=True)
         return known_encodings, known_names
 
-    files = [f for f in os.listdir(folder) if f.endswith('.jpg') or f.endswith('.jpeg') or f.endswith('.png')]
+    files = list_known_face_files(folder)
     if not files:
         print("Uyarı: Yüz veritabanında kayıtlı yüz bulunamadı.")
+        if use_cache:
+            EncodingStore(folder).clear()
         return known_encodings, known_names
         
     print(f"Yüz veritabanında {len(files)} dosya bulundu, yükleniyor...")
 
-    for file in files:
-        if not (file.endswith('.jpg') or file.endswith('.png') or file.endswith('.jpeg')):
-            continue
-            
-        try:
-            img_path = os.path.join(folder, file)
-            img = face_recognition.load_image_file(img_path)
-            enc = face_recognition.face_encodings(img, num_jitters=5)
-            if enc:
-                known_encodings.append(enc[0])
-                known_names.append(os.path.splitext(file)[0])
-                print(f"Yüz yüklendi: {os.path.splitext(file)[0]}")
-            else:
-                print(f"Uyarı: {file} dosyasında yüz tespit edilemedi.")
-        except Exception as e:
-            print(f"Hata: {file} dosyası yüklenirken hata oluştu: {e}")
+    failures = []
+
+    def encode_many(paths):
+        for result in encode_images(paths, num_jitters=5, workers=workers, progress=progress):
+            if result.error:
+                failures.append(result)
+            # Yalnızca "yüz yok" sonucu önbellekte hatırlanır; diğer hatalar yeniden denenir
+            yield ENCODE_FAILED if result.error and result.error != NO_FACE_ERROR else result.encoding
+
+    if use_cache:
+        # Yalnızca yeni veya değişmiş görüntüler encode edilir
+        store = EncodingStore(folder, num_jitters=5)
+        known_encodings, known_names, encoded = store.sync(files, encode_many)
+        print(f"Önbellekten {len(files) - encoded} dosya okundu, {encoded} dosya encode edildi.")
+    else:
+        paths = [os.path.join(folder, file) for file in files]
+        for enc, file in zip(encode_many(paths), files):
+            if enc is not None and enc is not ENCODE_FAILED:
+                known_encodings.append(enc)
+                known_names.append(identity_name(file))
 
-    print(f"Toplam {len(known_names)} yüz yüklendi: {', '.join(known_names)}")
+    if failures:
+        print(f"Uyarı: {len(failures)} dosya encode edilemedi: "
+              + ", ".join(f"{os.path.relpath(r.path, folder)} ({r.error})" for r in failures))
+
+    persons = sorted(set(known_names))
+    print(f"Toplam {len(persons)} kişi ({len(known_names)} fotoğraf) yüklendi: {', '.join(persons)}")
     return known_encodings, known_names
 
 
-def recognize_faces_in_frame(frame, known_encodings, known_names, emotion_recognizer=None):
+def enroll_face(gallery, name, face_img, folder='known_faces'):
+    # Yeni fotoğrafı known_faces/<isim>/ altına kaydeder, yalnızca bu görüntüyü
+    # encode eder ve kişinin şablonu olarak paylaşılan galeriye ekler.
+    # Dönüş: (başarılı mı, kaydedilen dosya yolu)
+    person_dir = os.path.join(folder, name)
+    os.makedirs(person_dir, exist_ok=True)
+    img_path = os.path.join(person_dir, f"{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.jpg")
+    if not cv2.imwrite(img_path, face_img):
+        print(f"Hata: {img_path} dosyası yazılamadı.")
+        return False, img_path
+
+    # Başlangıçtaki yükleme ile aynı encode yolu kullanılır
+    result = encode_image(img_path)
+    if result.error:
+        print(f"Uyarı: {img_path} encode edilemedi: {result.error}")
+        return False, img_path
+
+    gallery.add(name, result.encoding)
+    return True, img_path
+
+
+def delete_known_face(gallery, name, folder='known_faces'):
+    # Kişinin tüm görüntülerini siler ve kimliği galeriden yerinde çıkarır
+    removed = False
+    for ext in KNOWN_FACE_EXTENSIONS:
+        img_path = os.path.join(folder, name + ext)
+        if os.path.exists(img_path):
+            os.remove(img_path)
+            removed = True
+    person_dir = os.path.join(folder, name)
+    if os.path.isdir(person_dir):
+        shutil.rmtree(person_dir)
+        removed = True
+    return gallery.remove(name) or removed
+
+
+def recognize_faces_in_frame(frame, known_encodings, known_names, emotion_recognizer=None, detection_mode='full', profile=None,
+                             identity_cache=None):
+    # identity_cache: akış başına IdentityCache; yakın zamanda tanınan yüzler yeniden encode edilmez
+    # known_encodings bir FaceGallery olabilir; liste verilirse galeri burada kurulur
+    if isinstance(known_encodings, FaceGallery):
+        gallery = known_encodings
+    else:
+        gallery = FaceGallery(known_encodings if known_encodings is not None else [],
+                              known_names if known_names is not None else [])
+
     # Frame'de tüm yüzleri tespit et
-    faces = detect_face(frame)
+    faces = detect_face(frame, mode=detection_mode)
     recognized_faces = []
     
     # Hiç kayıtlı yüz yoksa
-    if not known_encodings or not known_names:
+    if len(gallery) == 0:
         print("Uyarı: Yüz veritabanında kayıtlı yüz bulunmadığı için yüz tanıma yapılamıyor.")
     
-    for (x, y, w, h) in faces:
-        face_img = frame[y:y+h, x:x+w]
-        
-        # Yüz tanıma
-        rgb_face = cv2.cvtColor(face_img, cv2.COLOR_BGR2RGB)
-        encodings = face_recognition.face_encodings(rgb_face, num_jitters=3)
-        
+    # Yüz tanıma (önbellekte geçerli kaydı olan yüzler atlanır)
+    cached = identity_cache.lookup(frame, faces) if identity_cache is not None else [None] * len(faces)
+    pending = [i for i, hit in enumerate(cached) if hit is None]
+    face_encodings = [None] * len(faces)
+    if pending:
+        start = time.perf_counter()
+        for i, encoding in zip(pending, encode_faces(frame, [faces[i] for i in pending], profile)):
+            face_encodings[i] = encoding
+        if identity_cache is not None:
+            identity_cache.record_encoding(time.perf_counter() - start, len(pending))
+    
+    # Karedeki tüm yüzler tüm kimliklerle tek işlemde karşılaştırılır
+    valid = [i for i, enc in enumerate(face_encodings) if enc is not None]
+    matches = {}
+    if valid and len(gallery) > 0:
+        for i, best in zip(valid, gallery.match([face_encodings[i] for i in valid], k=1)):
+            matches[i] = best[0]
+    
+    # Eşleşme toleransı (daha düşük -> daha kesin eşleşme)
+    tolerance = 0.6  # Daha yüksek değer = daha esnek eşleşme
+    
+    # Duygu analizi (tüm yüzler tek batch)
+    emotions = predict_face_emotions(frame, faces, emotion_recognizer)
+    
+    for i, (x, y, w, h) in enumerate(faces):
         # İsim belirleme
         name = "Unknown"
         face_distance = 1.0  # En uzak mesafe
         
-        if encodings and len(known_encodings) > 0:
-            # En iyi eşleşmeyi bul
-            current_encoding = encodings[0]
-            
-            # Tüm bilinen yüzlerle mesafeleri hesapla
-            face_distances = face_recognition.face_distance(known_encodings, current_encoding)
-            
+        if cached[i] is not None:
+            # Önbellekten gelen kimlik
+            name = cached[i]['name']
+            face_distance = cached[i]['face_distance']
+        elif i in matches:
             # En yakın eşleşme
-            if len(face_distances) > 0:
-                best_match_index = np.argmin(face_distances)
-                best_match_distance = face_distances[best_match_index]
-                
-                # Eşleşme toleransı (daha düşük -> daha kesin eşleşme)
-                tolerance = 0.6  # Daha yüksek değer = daha esnek eşleşme
-                
-                if best_match_distance <= tolerance:
-                    name = known_names[best_match_index]
-                    face_distance = best_match_distance
-                    print(f"Yüz tanındı: {name} (mesafe: {face_distance:.2f})")
-                else:
-                    print(f"Uyarı: En yakın yüz {known_names[best_match_index]} ancak mesafe yüksek: {best_match_distance:.2f} > {tolerance}")
+            best_match_name, best_match_distance = matches[i]
+            
+            if best_match_distance <= tolerance:
+                name = best_match_name
+                face_distance = best_match_distance
+                print(f"Yüz tanındı: {name} (mesafe: {face_distance:.2f})")
+            else:
+                print(f"Uyarı: En yakın yüz {best_match_name} ancak mesafe yüksek: {best_match_distance:.2f} > {tolerance}")
+        
+        if identity_cache is not None and face_encodings[i] is not None:
+            identity_cache.store(frame, (x, y, w, h), name, face_distance, face_encodings[i])
         
-        # Duygu analizi
-        emotion = "unknown"
-        confidence = 0.0
-        if emotion_recognizer:
-            try:
-                emotion, confidence = emotion_recognizer.predict_emotion(face_img)
-            except Exception as e:
-                print(f"Duygu analizi hatası: {e}")
+        emotion, confidence, probabilities = emotions[i]
         
         face_data = {
             'location': (x, y, w, h),
             'name': name,
             'face_distance': face_distance,
             'emotion': emotion,
-            'confidence': confidence
+            'confidence': confidence,
+            'probabilities': probabilities
         }
         recognized_faces.append(face_data)
     
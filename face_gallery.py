@@ -0,0 +1,262 @@
+import os
+import threading
+from collections import namedtuple
+import numpy as np
+
+ENCODING_SIZE = 128
+
+# Bu boyutun üzerindeki galerilerde yaklaşık en yakın komşu indeksi kullanılır
+ANN_MIN_GALLERY_SIZE = int(os.getenv("FACE_GALLERY_ANN_MIN_SIZE", "20000"))
+
+
+def euclidean_distances(queries, matrix, sq_norms=None):
+    # (sorgu sayısı, satır sayısı) boyutlu Öklid uzaklık matrisi:
+    #   |q - k|^2 = |q|^2 + |k|^2 - 2 q.k
+    queries = np.asarray(queries, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+    if sq_norms is None:
+        sq_norms = np.einsum('ij,ij->i', matrix, matrix)
+    query_sq = np.einsum('ij,ij->i', queries, queries)
+    d2 = queries @ matrix.T
+    d2 *= -2.0
+    d2 += query_sq[:, None]
+    d2 += sq_norms[None, :]
+    np.maximum(d2, 0.0, out=d2)
+    return np.sqrt(d2, out=d2)
+
+
+def select_representatives(templates, count):
+    # Merkeze en yakın şablondan başlayıp en uzak nokta örneklemesiyle
+    # kimliğin görünüm çeşitliliğini temsil eden en fazla count şablon seçer
+    templates = np.asarray(templates, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+    if len(templates) <= count:
+        return templates.copy()
+    centroid = templates.mean(axis=0)
+    chosen = [int(np.argmin(euclidean_distances(centroid, templates)[0]))]
+    min_dist = euclidean_distances(templates[chosen[0]], templates)[0]
+    while len(chosen) < count:
+        nxt = int(np.argmax(min_dist))
+        chosen.append(nxt)
+        np.minimum(min_dist, euclidean_distances(templates[nxt], templates)[0], out=min_dist)
+    return templates[chosen]
+
+
+# Okuyucuların gördüğü değişmez görünüm: ilk size satır geçerlidir.
+# Her satır bir kimliğin merkezidir; names ve reps satırlarla hizalıdır.
+_GallerySnapshot = namedtuple('_GallerySnapshot', ['matrix', 'sq_norms', 'names', 'reps', 'size'])
+
+
+class FaceGallery:
+    # Kayıtlı kimlikleri tek bir bitişik float32 matriste ve önceden
+    # hesaplanmış kare normlarla tutar. Bir kişinin birden fazla kayıt
+    # fotoğrafı olabilir: matriste kimlik başına tek satır (şablonların
+    # merkezi) bulunur, ayrıca en fazla max_representatives temsilci şablon
+    # saklanır. Eşleştirme iki aşamalıdır: önce tüm merkezlere uzaklık tek bir
+    # matris çarpımıyla (BLAS) hesaplanır, sonra en iyi adayların temsilcileri
+    # ile kesin uzaklık bulunur. Maliyet fotoğraf değil kimlik sayısıyla büyür.
+    #
+    # Ekleme/silme galeri boyutundan bağımsızdır (amortize O(1)): ekleme boş
+    # kapasiteye yazar, silme satırın normunu inf yaparak onu devre dışı bırakır.
+    # Ölü satırlar canlılardan fazlalaşınca matris sıkıştırılır. Eşleştirme
+    # yapan oturumlar kilit almadan o anki görünümü okur; yazarlar kilitlenir.
+    def __init__(self, encodings=None, names=None, max_representatives=3, centroid_candidates=5):
+        encodings = [] if encodings is None else encodings
+        names = list(names) if names is not None else []
+        matrix = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        if len(names) != len(matrix):
+            raise ValueError("Encoding ve isim sayıları eşleşmiyor")
+
+        self.max_representatives = max_representatives
+        self.centroid_candidates = centroid_candidates
+        self._lock = threading.Lock()
+
+        # Aynı isimli encoding'ler tek kimlikte toplanır
+        self._templates = {}
+        for name, encoding in zip(names, matrix):
+            self._templates.setdefault(name, []).append(encoding)
+        self._templates = {name: np.array(t) for name, t in self._templates.items()}
+
+        identity_names = list(self._templates)
+        centroids = np.array([self._templates[n].mean(axis=0) for n in identity_names],
+                             dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        reps = [select_representatives(self._templates[n], max_representatives) for n in identity_names]
+
+        self._rows = {name: row for row, name in enumerate(identity_names)}
+        self._live = len(identity_names)
+        self._dead = 0
+        self._state = self._allocate(max(16, len(identity_names)), centroids, identity_names, reps)
+        self.index = None
+        # Her ekleme/silmede artar; galeriye bağlı önbellek anahtarlarında kullanılır
+        self.version = 0
+
+    @staticmethod
+    def _allocate(capacity, matrix, names, reps, sq_norms=None):
+        buffer = np.empty((capacity, ENCODING_SIZE), dtype=np.float32)
+        norms = np.full(capacity, np.inf, dtype=np.float32)
+        size = len(matrix)
+        buffer[:size] = matrix
+        if sq_norms is None:
+            norms[:size] = np.einsum('ij,ij->i', buffer[:size], buffer[:size])
+        else:
+            # Silinmiş satırların inf normu korunur
+            norms[:size] = sq_norms[:size]
+        return _GallerySnapshot(buffer, norms, list(names), list(reps), size)
+
+    def __len__(self):
+        return self._live
+
+    def __contains__(self, name):
+        return name in self._rows
+
+    @property
+    def matrix(self):
+        state = self._state
+        return state.matrix[:state.size]
+
+    def identities(self):
+        return list(self._rows)
+
+    def template_count(self, name):
+        templates = self._templates.get(name)
+        return 0 if templates is None else len(templates)
+
+    def distances(self, encodings):
+        # (yüz sayısı, satır sayısı) boyutlu merkez uzaklık matrisi; silinmiş satırlar inf
+        state = self._state
+        return euclidean_distances(encodings, state.matrix[:state.size], state.sq_norms[:state.size])
+
+    def add(self, name, encoding):
+        # Kimliğe yeni bir şablon ekler (kimlik yoksa oluşturur)
+        encoding = np.asarray(encoding, dtype=np.float32).reshape(1, ENCODING_SIZE)
+        with self._lock:
+            templates = self._templates.get(name)
+            templates = encoding if templates is None else np.vstack([templates, encoding])
+            self._set_locked(name, templates)
+
+    def set_templates(self, name, encodings):
+        # Kimliğin tüm şablonlarını verilenlerle değiştirir
+        templates = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        with self._lock:
+            if len(templates) == 0:
+                self._remove_locked(name)
+            else:
+                self._set_locked(name, templates)
+            self._maybe_compact_locked()
+
+    def _set_locked(self, name, templates):
+        # Maliyet yalnızca bu kimliğin şablon sayısına bağlıdır. Kimliğin eski
+        # satırı silinip yenisi eklenir; böylece okuyucular yarım güncellenmiş
+        # bir satır görmez.
+        self._remove_locked(name)
+        self._templates[name] = templates
+        centroid = templates.mean(axis=0)
+        reps = select_representatives(templates, self.max_representatives)
+
+        state = self._state
+        if state.size == len(state.matrix):
+            # Kapasite ikiye katlanır; eski görünümü okuyanlar eski dizilerle devam eder
+            state = self._allocate(len(state.matrix) * 2, state.matrix[:state.size],
+                                   state.names, state.reps, state.sq_norms)
+        row = state.size
+        state.matrix[row] = centroid
+        state.names.append(name)
+        state.reps.append(reps)
+        state.sq_norms[row] = np.dot(centroid, centroid)
+        self._state = _GallerySnapshot(state.matrix, state.sq_norms, state.names, state.reps, row + 1)
+        self._rows[name] = row
+        self._live += 1
+        self.version += 1
+        if self.index is not None:
+            self.index.add(row, centroid)
+        self._maybe_compact_locked()
+
+    def remove(self, name):
+        with self._lock:
+            removed = self._remove_locked(name)
+            self._maybe_compact_locked()
+            return removed
+
+    def _remove_locked(self, name):
+        row = self._rows.pop(name, None)
+        if row is None:
+            return False
+        self._templates.pop(name, None)
+        self._state.sq_norms[row] = np.inf
+        if self.index is not None:
+            self.index.remove(row)
+        self._live -= 1
+        self._dead += 1
+        self.version += 1
+        return True
+
+    def _maybe_compact_locked(self):
+        # Sıkıştırma O(n) olsa da en az o kadar silmeden sonra çalıştığı için amortize O(1)
+        if self._dead > max(16, self._live):
+            self._compact_locked()
+
+    def _compact_locked(self):
+        state = self._state
+        alive = np.flatnonzero(np.isfinite(state.sq_norms[:state.size]))
+        mapping = np.full(state.size, -1, dtype=np.int64)
+        mapping[alive] = np.arange(len(alive))
+
+        names = [state.names[i] for i in alive]
+        reps = [state.reps[i] for i in alive]
+        self._state = self._allocate(max(16, 2 * len(alive)), state.matrix[alive], names, reps)
+        self._rows = {name: int(mapping[row]) for name, row in self._rows.items()}
+        self._dead = 0
+        if self.index is not None:
+            self.index.remap_ids(mapping)
+
+    def build_index(self, **index_params):
+        # İsteğe bağlı IVF indeksi; satır numaraları indeks id'si olarak kullanılır
+        from ann_index import IVFIndex
+        with self._lock:
+            state = self._state
+            alive = np.flatnonzero(np.isfinite(state.sq_norms[:state.size]))
+            self.index = IVFIndex(**index_params).build(state.matrix[alive], ids=alive)
+            return self.index
+
+    def drop_index(self):
+        self.index = None
+
+    def _candidates(self, queries, count):
+        # 1. aşama: merkezlere göre en yakın count kimlik satırı (ve görünüm)
+        if self.index is not None:
+            # İndeksin ters listeleri yerinde değiştiği için arama kilit altında yapılır
+            with self._lock:
+                state = self._state
+                ids, _ = self.index.search(queries, k=count)
+            return state, [row[row >= 0] for row in ids]
+
+        state = self._state
+        distances = euclidean_distances(queries, state.matrix[:state.size], state.sq_norms[:state.size])
+        count = min(count, distances.shape[1])
+        if count < distances.shape[1]:
+            top = np.argpartition(distances, count - 1, axis=1)[:, :count]
+        else:
+            top = np.tile(np.arange(distances.shape[1]), (len(queries), 1))
+        alive = np.isfinite(np.take_along_axis(distances, top, axis=1))
+        return state, [row[mask] for row, mask in zip(top, alive)]
+
+    def match(self, encodings, k=1):
+        # Her yüz için en yakın k kimlik: [[(isim, uzaklık), ...], ...]
+        # Uzaklık, kimliğin temsilci şablonlarına olan en küçük uzaklıktır.
+        queries = np.asarray(encodings, dtype=np.float32).reshape(-1, ENCODING_SIZE)
+        if len(queries) == 0:
+            return []
+        if len(self) == 0:
+            return [[] for _ in range(len(queries))]
+
+        state, candidates = self._candidates(queries, max(k, self.centroid_candidates))
+
+        # 2. aşama: adayların temsilcileriyle kesin uzaklık
+        results = []
+        for query, rows in zip(queries, candidates):
+            scored = []
+            for row in rows:
+                reps = state.reps[row]
+                best = float(euclidean_distances(query, reps)[0].min())
+                scored.append((state.names[row], best))
+            scored.sort(key=lambda item: item[1])
+            results.append(scored[:k])
+        return results
@@ -0,0 +1,373 @@
+import time
+import cv2
+import numpy as np
+from face_detector import recognize_faces_in_frame
+
+
+class FaceTracker:
+    # Sürekli video için tespit + takip katmanı. Tam tespit ve tanıma her
+    # refresh_interval karede bir (ya da bir iz kaybolduğunda) çalışır; aradaki
+    # karelerde kutular Lucas-Kanade optik akışı ile taşınır ve her izin
+    # isim/duygu bilgisi olduğu gibi aktarılır.
+    def __init__(self, known_encodings, known_names, emotion_recognizer=None,
+                 refresh_interval=10, min_track_points=6, min_points_ratio=0.4,
+                 max_fb_error=1.5, detection_mode='full', profile=None, identity_cache=None,
+                 emotion_smoother=None):
+        self.known_encodings = known_encodings
+        self.known_names = known_names
+        self.emotion_recognizer = emotion_recognizer
+        self.detection_mode = detection_mode
+        self.profile = profile
+        self.identity_cache = identity_cache
+        # Verilirse duygu her karede bu katmandan (değişime bağlı ve yumuşatılmış) gelir
+        self.emotion_smoother = emotion_smoother
+
+        # Yenileme aralığı ve iz kaybı ölçütleri
+        self.refresh_interval = refresh_interval
+        self.min_track_points = min_track_points
+        self.min_points_ratio = min_points_ratio
+        self.max_fb_error = max_fb_error
+
+        self.tracks = []
+        self.prev_gray = None
+        self.frames_since_detection = 0
+        self.frame_count = 0
+        self.detection_count = 0
+
+        self._lk_params = dict(winSize=(15, 15), maxLevel=2,
+                               criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+    def reset(self):
+        self.tracks = []
+        self.prev_gray = None
+        self.frames_since_detection = 0
+
+    def process(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.frame_count += 1
+
+        need_detection = (
+            self.prev_gray is None
+            or not self.tracks
+            or self.frames_since_detection >= self.refresh_interval
+        )
+
+        if not need_detection:
+            tracks = self._propagate(gray)
+            # Herhangi bir iz kaybolduysa aynı karede tam tespite dön
+            if tracks is None:
+                need_detection = True
+            else:
+                self.tracks = tracks
+                self.frames_since_detection += 1
+
+        if need_detection:
+            self._detect(frame, gray)
+
+        if self.emotion_smoother is not None:
+            self.emotion_smoother.update(frame, gray, self.tracks)
+
+        self.prev_gray = gray
+        return [track['face'] for track in self.tracks]
+
+    def _detect(self, frame, gray):
+        emotion_recognizer = self.emotion_recognizer if self.emotion_smoother is None else None
+        faces = recognize_faces_in_frame(frame, self.known_encodings, self.known_names,
+                                         emotion_recognizer, detection_mode=self.detection_mode,
+                                         profile=self.profile, identity_cache=self.identity_cache)
+        self.detection_count += 1
+        self.frames_since_detection = 0
+
+        previous = self.tracks
+        self.tracks = []
+        for face in faces:
+            points = self._seed_points(gray, face['location'])
+            track = {'face': face, 'points': points, 'initial_points': len(points)}
+            # Duygu durumu aynı yüzün önceki izinden devralınır
+            match = max(previous, key=lambda t: box_iou(t['face']['location'], face['location']), default=None)
+            if match is not None and box_iou(match['face']['location'], face['location']) >= 0.3:
+                previous.remove(match)
+                if 'emotion_state' in match:
+                    track['emotion_state'] = match['emotion_state']
+            self.tracks.append(track)
+
+    def _seed_points(self, gray, location):
+        x, y, w, h = location
+        mask = np.zeros_like(gray)
+        mask[y:y+h, x:x+w] = 255
+        points = cv2.goodFeaturesToTrack(gray, maxCorners=50, qualityLevel=0.01, minDistance=5, mask=mask)
+        if points is None:
+            return np.empty((0, 1, 2), dtype=np.float32)
+        return points.astype(np.float32)
+
+    def _propagate(self, gray):
+        frame_h, frame_w = gray.shape[:2]
+        tracks = []
+
+        for track in self.tracks:
+            points = track['points']
+            if len(points) < self.min_track_points:
+                return None
+
+            # İleri-geri akış: geri dönüşte başladığı yere yakın düşen noktalar güvenilir
+            new_points, status, _ = cv2.calcOpticalFlowPyrLK(self.prev_gray, gray, points, None, **self._lk_params)
+            back_points, back_status, _ = cv2.calcOpticalFlowPyrLK(gray, self.prev_gray, new_points, None, **self._lk_params)
+            fb_error = np.linalg.norm((points - back_points).reshape(-1, 2), axis=1)
+            good = (status.ravel() == 1) & (back_status.ravel() == 1) & (fb_error < self.max_fb_error)
+
+            if good.sum() < max(self.min_track_points, self.min_points_ratio * track['initial_points']):
+                return None
+
+            old_good = points[good].reshape(-1, 2)
+            new_good = new_points[good].reshape(-1, 2)
+
+            # Kutu medyan kayma ile taşınır, ölçek nokta çiftlerinin mesafe oranından
+            dx, dy = np.median(new_good - old_good, axis=0)
+            scale = 1.0
+            if len(old_good) >= 2:
+                old_dist = np.linalg.norm(old_good[1:] - old_good[:-1], axis=1)
+                new_dist = np.linalg.norm(new_good[1:] - new_good[:-1], axis=1)
+                valid = old_dist > 1e-3
+                if valid.any():
+                    scale = float(np.median(new_dist[valid] / old_dist[valid]))
+
+            x, y, w, h = track['face']['location']
+            cx, cy = x + w / 2 + dx, y + h / 2 + dy
+            w, h = w * scale, h * scale
+            nx, ny = int(round(cx - w / 2)), int(round(cy - h / 2))
+            nw, nh = int(round(w)), int(round(h))
+
+            # Kare dışına taşan iz kaybolmuş sayılır
+            if nx < 0 or ny < 0 or nx + nw > frame_w or ny + nh > frame_h or nw <= 0 or nh <= 0:
+                return None
+
+            face = dict(track['face'])
+            face['location'] = (nx, ny, nw, nh)
+            new_track = {'face': face, 'points': new_good.reshape(-1, 1, 2),
+                         'initial_points': track['initial_points']}
+            if 'emotion_state' in track:
+                new_track['emotion_state'] = track['emotion_state']
+            tracks.append(new_track)
+
+        return tracks
+
+    def get_stats(self):
+        return {
+            'frames': self.frame_count,
+            'detections': self.detection_count,
+            'tracked_frames': self.frame_count - self.detection_count,
+        }
+
+
+def crop_thumbnail(gray, location, size=16):
+    # Kırpıntı değişimini ölçmek için küçük gri kopya (float32) ya da None
+    x, y, w, h = location
+    crop = gray[y:y+h, x:x+w]
+    if crop.size == 0:
+        return None
+    return cv2.resize(crop, (size, size), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+def thumbnail_change(a, b):
+    # Ortalama mutlak piksel farkı (0-255); karşılaştırılamıyorsa inf
+    if a is None or b is None:
+        return np.inf
+    return float(np.mean(np.abs(a - b)))
+
+
+def box_iou(a, b):
+    ax, ay, aw, ah = a
+    bx, by, bw, bh = b
+    ix = max(0, min(ax + aw, bx + bw) - max(ax, bx))
+    iy = max(0, min(ay + ah, by + bh) - max(ay, by))
+    inter = ix * iy
+    union = aw * ah + bw * bh - inter
+    return inter / union if union > 0 else 0.0
+
+
+class EmotionSmoother:
+    # İz başına duygu durumu. Duygu modeli bir iz için yalnızca yüz kırpıntısı
+    # belirgin değiştiğinde (küçük gri kopyada ortalama mutlak fark
+    # max_crop_change'i aşınca) ya da son tahminden beri max_age kare geçtiğinde
+    # çalışır; aradaki karelerde son durum kullanılır. Olasılık vektörü üstel
+    # hareketli ortalama ile yumuşatılır (alpha: yeni tahminin ağırlığı) ve
+    # yüzün emotion/confidence alanları bu ortalamadan yazılır. db verilirse
+    # her yeni tahminden sonra yumuşatılmış sonuç kaydedilir.
+    def __init__(self, emotion_recognizer, alpha=0.4, max_crop_change=6.0, max_age=15, thumb_size=16, db=None):
+        self.emotion_recognizer = emotion_recognizer
+        self.alpha = alpha
+        self.max_crop_change = max_crop_change
+        self.max_age = max_age
+        self.thumb_size = thumb_size
+        self.db = db
+
+        self.inferences = 0
+        self.skipped = 0
+
+    def _needs_inference(self, state, thumb):
+        if state is None or state['age'] >= self.max_age:
+            return True
+        return thumbnail_change(thumb, state['thumb']) > self.max_crop_change
+
+    def update(self, frame, gray, tracks):
+        pending = []
+        for i, track in enumerate(tracks):
+            state = track.get('emotion_state')
+            thumb = crop_thumbnail(gray, track['face']['location'], self.thumb_size)
+            if self._needs_inference(state, thumb):
+                pending.append((i, thumb))
+            else:
+                state['age'] += 1
+                self.skipped += 1
+
+        if pending:
+            # Güncellenmesi gereken tüm yüzler tek batch
+            results = self.emotion_recognizer.predict_frame_emotions(
+                frame, [tracks[i]['face']['location'] for i, _ in pending])
+            self.inferences += len(pending)
+            for (i, thumb), (_, _, probabilities) in zip(pending, results):
+                track = tracks[i]
+                state = track.get('emotion_state')
+                if probabilities is None:
+                    if state is not None:
+                        state['age'] += 1
+                    continue
+                probabilities = np.asarray(probabilities, dtype=np.float32)
+                if state is not None:
+                    probabilities = self.alpha * probabilities + (1 - self.alpha) * state['probabilities']
+                track['emotion_state'] = {'probabilities': probabilities, 'thumb': thumb, 'age': 0}
+                self._apply(track)
+                if self.db is not None:
+                    face = track['face']
+                    self.db.add_emotion_record(face['emotion'], face['confidence'], face.get('name', 'Bilinmeyen'))
+
+        for track in tracks:
+            self._apply(track)
+
+    def _apply(self, track):
+        state = track.get('emotion_state')
+        face = track['face']
+        if state is None:
+            return
+        probabilities = state['probabilities']
+        emotion_index = int(np.argmax(probabilities))
+        face['emotion'] = self.emotion_recognizer.class_names[emotion_index]
+        face['confidence'] = float(probabilities[emotion_index])
+        face['probabilities'] = probabilities
+
+    def get_stats(self):
+        total = self.inferences + self.skipped
+        return {
+            'inferences': self.inferences,
+            'skipped': self.skipped,
+            'skip_rate': self.skipped / total if total else 0.0,
+        }
+
+
+class IdentityCache:
+    # Akış başına kimlik önbelleği. Yeni kutular son görülen kutulara IoU ile
+    # eşlenir; eşleşen yüz, encode edildiği andan beri TTL dolmadıysa, kutu
+    # çok uzaklaşmadıysa ve kırpıntı belirgin değişmediyse önbellekteki isim
+    # ve encoding ile kullanılır. Aksi halde yeniden encode edilir.
+    def __init__(self, ttl=2.0, min_iou=0.5, max_shift=0.25, max_crop_change=12.0, thumb_size=16):
+        self.ttl = ttl
+        self.min_iou = min_iou
+        self.max_shift = max_shift  # kutu boyuna oranla merkez kayması
+        self.max_crop_change = max_crop_change  # küçük gri kırpıntıda ortalama mutlak fark (0-255)
+        self.thumb_size = thumb_size
+        self.entries = []
+        self._frame = None
+        self._gray = None
+
+        self.hits = 0
+        self.misses = 0
+        self.encode_seconds = 0.0
+        self.encode_count = 0
+
+    def _thumbnail(self, gray, location):
+        return crop_thumbnail(gray, location, self.thumb_size)
+
+    def _is_valid(self, entry, location, thumb, now):
+        if now - entry['encoded_at'] > self.ttl:
+            return False
+        ax, ay, aw, ah = entry['anchor']
+        x, y, w, h = location
+        shift = np.hypot((x + w / 2) - (ax + aw / 2), (y + h / 2) - (ay + ah / 2))
+        if shift > self.max_shift * max(aw, ah):
+            return False
+        return thumbnail_change(thumb, entry['thumb']) <= self.max_crop_change
+
+    def lookup(self, frame, faces):
+        # Her kutu için geçerli önbellek kaydı ya da None
+        now = time.monotonic()
+        self.entries = [e for e in self.entries if now - e['encoded_at'] <= self.ttl]
+        results = [None] * len(faces)
+        if len(faces) == 0:
+            return results
+
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        # Aynı karedeki store() çağrıları gri görüntüyü tekrar hesaplamaz
+        self._frame, self._gray = frame, gray
+        used = set()
+        stale = set()
+        for i, location in enumerate(faces):
+            location = tuple(int(v) for v in location)
+            best, best_iou = None, self.min_iou
+            for j, entry in enumerate(self.entries):
+                if j in used:
+                    continue
+                iou = box_iou(entry['last_box'], location)
+                if iou >= best_iou:
+                    best, best_iou = j, iou
+
+            if best is not None:
+                entry = self.entries[best]
+                used.add(best)
+                if self._is_valid(entry, location, self._thumbnail(gray, location), now):
+                    entry['last_box'] = location
+                    results[i] = entry
+                    self.hits += 1
+                    continue
+                # Geçersiz kayıt atılır, yeniden encode sonrası store() ile yenilenir
+                stale.add(best)
+            self.misses += 1
+
+        if stale:
+            self.entries = [e for j, e in enumerate(self.entries) if j not in stale]
+        return results
+
+    def store(self, frame, location, name, face_distance, encoding):
+        location = tuple(int(v) for v in location)
+        if frame is self._frame:
+            gray = self._gray
+        else:
+            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        self.entries.append({
+            'name': name,
+            'face_distance': face_distance,
+            'encoding': encoding,
+            'anchor': location,
+            'last_box': location,
+            'thumb': self._thumbnail(gray, location),
+            'encoded_at': time.monotonic(),
+        })
+
+    def record_encoding(self, seconds, count):
+        self.encode_seconds += seconds
+        self.encode_count += count
+
+    def reset(self):
+        self.entries = []
+        self._frame = None
+        self._gray = None
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        avg_encode = self.encode_seconds / self.encode_count if self.encode_count else 0.0
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'avg_encode_ms': avg_encode * 1000,
+            'saved_encode_ms': self.hits * avg_encode * 1000,
+        }
@@ -0,0 +1,74 @@
+import multiprocessing
+import os
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from runtime_config import get_runtime_config, init_worker
+
+# 0 -> işlemci sayısı kadar işçi süreç
+ENROLLMENT_WORKERS = int(os.getenv("FACE_ENROLLMENT_WORKERS", "0"))
+
+# Bir dosyanın encode sonucu: encoding ya da hata mesajı (ikisi birden dolu olmaz)
+EnrollmentResult = namedtuple('EnrollmentResult', ['path', 'encoding', 'error'])
+# Görüntü sorunsuz okunup yüz bulunamadığında verilen hata; diğer hatalar geçicidir
+NO_FACE_ERROR = "Yüz tespit edilemedi"
+
+
+def encode_image(path, num_jitters=5):
+    # Süreç havuzunda çalışabilmesi için modül seviyesinde tanımlıdır
+    try:
+        import face_recognition
+        img = face_recognition.load_image_file(path)
+        enc = face_recognition.face_encodings(img, num_jitters=num_jitters)
+        if not enc:
+            return EnrollmentResult(path, None, NO_FACE_ERROR)
+        return EnrollmentResult(path, enc[0], None)
+    except Exception as e:
+        return EnrollmentResult(path, None, str(e))
+
+
+def encode_images(paths, num_jitters=5, workers=None, max_in_flight=None, progress=None):
+    # Görüntüleri sırayla EnrollmentResult olarak üretir. workers > 1 ise
+    # çözme ve encode işlemi süreç havuzuna dağıtılır; aynı anda en fazla
+    # max_in_flight görüntü işlenir, böylece bellek kullanımı sınırlı kalır.
+    # progress(tamamlanan, toplam, sonuç) her dosyadan sonra çağrılır.
+    paths = list(paths)
+    total = len(paths)
+    workers = workers if workers is not None else (ENROLLMENT_WORKERS or os.cpu_count() or 1)
+    workers = max(1, min(workers, total))
+
+    if workers == 1:
+        for done, path in enumerate(paths, 1):
+            result = encode_image(path, num_jitters)
+            if progress:
+                progress(done, total, result)
+            yield result
+        return
+
+    max_in_flight = max_in_flight or workers * 2
+    # İşçiler tek iş parçacıklı çalışır (ve istenirse ayrı çekirdeklere sabitlenir);
+    # aksi halde her süreç tüm çekirdekler kadar BLAS iş parçacığı açar
+    # fork yerine spawn: ModelLoader bu havuzu TensorFlow ve dlib iş parçacıkları
+    # çalışırken bir arka plan iş parçacığından açar; çatallanan süreç kilitlenebilir.
+    # Temiz süreçte init_worker'ın BLAS ayarı dlib yüklenmeden önce uygulanır.
+    context = multiprocessing.get_context('spawn')
+    counter = context.Value('i', 0)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=init_worker,
+                             initargs=(counter, get_runtime_config())) as pool:
+        pending = deque()
+        remaining = iter(paths)
+        for path in remaining:
+            pending.append(pool.submit(encode_image, path, num_jitters))
+            if len(pending) >= max_in_flight:
+                break
+
+        done = 0
+        while pending:
+            # Sonuçlar giriş sırasıyla döndürülür
+            result = pending.popleft().result()
+            next_path = next(remaining, None)
+            if next_path is not None:
+                pending.append(pool.submit(encode_image, next_path, num_jitters))
+            done += 1
+            if progress:
+                progress(done, total, result)
+            yield result
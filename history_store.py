@@ -0,0 +1,319 @@
+# Gün bölümlü, sütunlu duygu geçmişi deposu. Her gün ayrı bir klasördür
+# (data/history/2026-10-18/) ve her sütun ham ikili bir dosyadır:
+#   timestamp.i8  -> int64 mikrosaniye (yerel saat, datetime64[us])
+#   emotion.u1    -> uint8 duygu kodu (emotions.json sözlüğü)
+#   confidence.f4 -> float32 güven
+#   face.u4       -> uint32 kişi kodu (faces.json sözlüğü)
+# Kayıt eklemek sütun dosyalarının sonuna yazmaktır. Aralık sorguları yalnızca
+# pencereyle kesişen günleri açar; face_id/emotion filtreleri koda çevrilip
+# dosyalar okunurken uygulanır. Böylece son N gün sorgusunun maliyeti toplam
+# geçmişin uzunluğundan bağımsızdır.
+import csv
+import json
+import os
+import re
+import shutil
+import threading
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from emotion_aggregates import AggregateFile, aggregate_frame
+from emotion_columns import COLUMN_FILES, COLUMNS, EmotionColumns, from_epoch_us, to_epoch_us
+
+EMOTION_HISTORY_DIR = os.getenv("EMOTION_HISTORY_DIR", "data/history")
+
+_PARTITION_NAME = re.compile(r'^\d{4}-\d{2}-\d{2}$')
+
+
+class ValueDictionary:
+    # Metin değer <-> tam sayı kod eşlemesi; yalnızca sona eklenir
+    def __init__(self, path, max_codes):
+        self.path = path
+        self.max_codes = max_codes
+        self.values = []
+        self._dirty = False
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.values = json.load(f)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def get(self, value):
+        return self.codes.get(value)
+
+    def encode(self, value):
+        code = self.codes.get(value)
+        if code is None:
+            if len(self.values) >= self.max_codes:
+                raise ValueError(f"{os.path.basename(self.path)} sözlüğü dolu ({self.max_codes} değer)")
+            code = len(self.values)
+            self.values.append(value)
+            self.codes[value] = code
+            self._dirty = True
+        return code
+
+    def save(self):
+        # Sütunlar yeni kodlara başvurmadan önce sözlük diske yazılır
+        if not self._dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.values, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def decode(self, codes):
+        return np.asarray(self.values, dtype=object)[codes] if len(codes) else np.empty(0, dtype=object)
+
+
+class PartitionedEmotionStore:
+    def __init__(self, root=EMOTION_HISTORY_DIR, csv_path=None):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self.advanced_analysis_file = os.path.join(root, 'advanced_analysis.csv')
+        self._lock = threading.Lock()
+        self._dirty = set()
+        self.emotions = ValueDictionary(os.path.join(root, 'emotions.json'), np.iinfo(np.uint8).max + 1)
+        self.faces = ValueDictionary(os.path.join(root, 'faces.json'), np.iinfo(np.uint32).max + 1)
+        # Özetlerin karşılık geldiği veri boyutu toplam satır sayısıdır
+        self.aggregates = AggregateFile(os.path.join(root, 'aggregates.json'))
+        if not self.aggregates.is_current(self.row_count()):
+            self.rebuild_aggregates()
+        if csv_path:
+            self.import_csv_history(csv_path)
+
+    # --- Yazma ---
+
+    def add_emotion_records(self, rows):
+        # rows: (timestamp, emotion, confidence, face_id, additional_data); additional_data saklanmaz
+        by_day = {}
+        with self._lock:
+            for timestamp, emotion, confidence, face_id, _ in rows:
+                by_day.setdefault(timestamp[:10], []).append(
+                    (timestamp, self.emotions.encode(emotion), confidence, self.faces.encode(face_id or "")))
+            self.emotions.save()
+            self.faces.save()
+            for day, day_rows in by_day.items():
+                timestamps, emotions, confidences, faces = zip(*day_rows)
+                self._append(day, {
+                    'timestamp': to_epoch_us(timestamps),
+                    'emotion': np.asarray(emotions, dtype=COLUMNS['emotion']),
+                    'confidence': np.asarray(confidences, dtype=COLUMNS['confidence']),
+                    'face': np.asarray(faces, dtype=COLUMNS['face']),
+                })
+            self._rows += len(rows)
+            # Özetler sütunda saklanan float32 değerlerden hesaplanır (yeniden kurmayla aynı sonuç)
+            self.aggregates.update([(None, emotion, float(np.float32(confidence)), face_id or "")
+                                    for _, emotion, confidence, face_id, _ in rows], self._rows)
+
+    def _append(self, day, columns):
+        folder = os.path.join(self.root, day)
+        os.makedirs(folder, exist_ok=True)
+        for name, values in columns.items():
+            with open(os.path.join(folder, COLUMN_FILES[name]), 'ab') as f:
+                f.write(np.ascontiguousarray(values, dtype=COLUMNS[name]).tobytes())
+        self._dirty.add(day)
+
+    def sync(self):
+        with self._lock:
+            days, self._dirty = self._dirty, set()
+            for day in days:
+                for file in COLUMN_FILES.values():
+                    with open(os.path.join(self.root, day, file), 'ab') as f:
+                        os.fsync(f.fileno())
+            self.aggregates.save()
+
+    def row_count(self):
+        # Zaman damgası dosyalarının boyutundan; bölümler okunmaz
+        paths = [os.path.join(self.root, day, COLUMN_FILES['timestamp']) for day in self.partitions()]
+        self._rows = sum(os.path.getsize(path) // COLUMNS['timestamp'].itemsize for path in paths if os.path.exists(path))
+        return self._rows
+
+    def import_csv_history(self, csv_path):
+        # Eski CSV geçmişi boş bir depoya bir kez aktarılır; yarıda kalan aktarım
+        # geri alınır, böylece bir sonraki başlangıçta kayıtlar çoğalmaz
+        marker = os.path.join(self.root, '.imported')
+        if os.path.exists(marker) or not os.path.exists(csv_path) or self.partitions():
+            return 0
+        imported = skipped = 0
+        try:
+            for chunk in pd.read_csv(csv_path, chunksize=50000, dtype={'face_id': str}):
+                # Gün bölümü timestamp[:10]'dan seçildiğinden zaman damgaları add_emotion_record ile
+                # aynı isoformat() biçimine çevrilir; çözülemeyen satırlar atlanır
+                parsed = pd.to_datetime(chunk['timestamp'], format='ISO8601', errors='coerce')
+                skipped += int(parsed.isna().sum())
+                chunk, parsed = chunk[parsed.notna()], parsed[parsed.notna()]
+                face_ids = chunk['face_id'].fillna("").map(lambda f: str(f).strip().strip(','))
+                rows = list(zip([timestamp.isoformat() for timestamp in parsed], chunk['emotion'].astype(str),
+                                chunk['confidence'].fillna(0.0).astype(float), face_ids, [None] * len(chunk)))
+                self.add_emotion_records(rows)
+                imported += len(rows)
+        except Exception as e:
+            print(f"CSV geçmişi içe aktarılamadı: {e}")
+            self._discard_partitions()
+            return 0
+        with open(marker, 'w') as f:
+            f.write(csv_path)
+        if imported:
+            print(f"{imported} duygu kaydı {csv_path} dosyasından {self.root} klasörüne aktarıldı.")
+        if skipped:
+            print(f"Zaman damgası okunamayan {skipped} kayıt aktarılmadı.")
+        return imported
+
+    def _discard_partitions(self):
+        with self._lock:
+            for day in self.partitions():
+                shutil.rmtree(os.path.join(self.root, day))
+            for dictionary in (self.emotions, self.faces):
+                if os.path.exists(dictionary.path):
+                    os.remove(dictionary.path)
+                dictionary.values, dictionary.codes = [], {}
+            self._dirty = set()
+            self._rows = 0
+            self.aggregates.replace({}, 0)
+
+    def add_advanced_analysis(self, stress_level, productivity_score, sleep_quality, analysis_data):
+        with self._lock:
+            new_file = not os.path.exists(self.advanced_analysis_file)
+            with open(self.advanced_analysis_file, 'a', newline='', encoding='utf-8') as f:
+                writer = csv.writer(f)
+                if new_file:
+                    writer.writerow(['timestamp', 'stress_level', 'productivity_score', 'sleep_quality', 'analysis_data'])
+                writer.writerow([datetime.now().isoformat(), stress_level, productivity_score, sleep_quality,
+                                 json.dumps(analysis_data, ensure_ascii=False)])
+
+    # --- Okuma ---
+
+    def partitions(self, start=None, end=None):
+        # [start, end] aralığıyla kesişen gün klasörleri (tarih sırasıyla)
+        first = start.strftime('%Y-%m-%d') if start is not None else None
+        last = end.strftime('%Y-%m-%d') if end is not None else None
+        days = sorted(name for name in os.listdir(self.root) if _PARTITION_NAME.match(name))
+        return [day for day in days if (first is None or day >= first) and (last is None or day <= last)]
+
+    def _read_column(self, day, name):
+        path = os.path.join(self.root, day, COLUMN_FILES[name])
+        return np.fromfile(path, dtype=COLUMNS[name]) if os.path.exists(path) else np.empty(0, COLUMNS[name])
+
+    def _scan_partition(self, day, start_us, end_us, face_code, emotion_code, columns):
+        # Önce filtre sütunları okunur; hiçbir satır eşleşmezse diğer sütunlar hiç açılmaz
+        cache = {}
+
+        def column(name):
+            if name not in cache:
+                cache[name] = self._read_column(day, name)
+            return cache[name]
+
+        conditions = []
+        if face_code is not None:
+            conditions.append(lambda: column('face') == face_code)
+        if emotion_code is not None:
+            conditions.append(lambda: column('emotion') == emotion_code)
+        if start_us is not None or end_us is not None:
+            timestamps = column('timestamp')
+            # Pencerenin tamamen içindeki günlerde zaman maskesi atlanır
+            if len(timestamps) and ((start_us is not None and timestamps.min() < start_us) or
+                                    (end_us is not None and timestamps.max() > end_us)):
+                low = start_us if start_us is not None else np.iinfo(np.int64).min
+                high = end_us if end_us is not None else np.iinfo(np.int64).max
+                conditions.append(lambda: (column('timestamp') >= low) & (column('timestamp') <= high))
+
+        mask = None
+        for condition in conditions:
+            result = condition()
+            mask = result if mask is None else mask[:len(result)] & result[:len(mask)]
+            if not mask.any():
+                return {name: np.empty(0, COLUMNS[name]) for name in columns}
+
+        # Yarım kalmış bir yazımda sütun uzunlukları farklı olabilir; en kısa olana göre kırpılır
+        data = {name: column(name) for name in columns}
+        rows = min(len(values) for values in cache.values())
+        if mask is None:
+            return {name: values[:rows] for name, values in data.items()}
+        mask = mask[:rows]
+        return {name: values[:rows][mask] for name, values in data.items()}
+
+    def scan(self, start=None, end=None, face_id=None, emotion=None, columns=tuple(COLUMNS)):
+        # Filtrelenmiş sütun dizileri (kod olarak); bilinmeyen kişi/duygu için boş sonuç
+        face_code = self.faces.get(face_id) if face_id is not None else None
+        emotion_code = self.emotions.get(emotion) if emotion is not None else None
+        if (face_id is not None and face_code is None) or (emotion is not None and emotion_code is None):
+            return {name: np.empty(0, COLUMNS[name]) for name in columns}
+
+        start_us = int(to_epoch_us(start)) if start is not None else None
+        end_us = int(to_epoch_us(end)) if end is not None else None
+        parts = [self._scan_partition(day, start_us, end_us, face_code, emotion_code, columns)
+                 for day in self.partitions(start, end)]
+        return {name: (np.concatenate([part[name] for part in parts]) if parts else np.empty(0, COLUMNS[name]))
+                for name in columns}
+
+    def get_history_dataframe(self, start=None, end=None, face_id=None, emotion=None):
+        data = self.scan(start, end, face_id, emotion)
+        return pd.DataFrame({
+            'timestamp': from_epoch_us(data['timestamp']),
+            'emotion': pd.Categorical.from_codes(data['emotion'].astype(np.int16), self.emotions.values)
+            if self.emotions.values else pd.Categorical([]),
+            'confidence': data['confidence'],
+            'face_id': pd.Categorical.from_codes(data['face'].astype(np.int64), self.faces.values)
+            if self.faces.values else pd.Categorical([]),
+        })
+
+    def get_emotion_history(self, days=7, face_id=None, emotion=None):
+        try:
+            cutoff = datetime.now() - timedelta(days=days)
+            data = self.scan(cutoff, None, face_id, emotion)
+            timestamps = from_epoch_us(data['timestamp']).tolist()
+            emotions = self.emotions.decode(data['emotion']).tolist()
+            faces = self.faces.decode(data['face']).tolist()
+            return [[pd.Timestamp(timestamp), emotion, confidence, face]
+                    for timestamp, emotion, confidence, face in zip(timestamps, emotions, data['confidence'].tolist(), faces)]
+        except Exception as e:
+            print(f"Error reading emotion history: {e}")
+            return []
+
+    def get_history_columns(self, days=7, face_id=None):
+        # Gün bölümleri memmap olarak açılır; tek günlük pencerede hiçbir sütun kopyalanmaz
+        cutoff = datetime.now() - timedelta(days=days)
+        # Sözlükler, bölüm listesi ve sütun uzunlukları kilit altında birlikte alınır; sonraki
+        # eklemeler ve gün değişimi bu görünümü etkilemez (memmap açmak veriyi okumaz)
+        with self._lock:
+            emotion_names, face_names = list(self.emotions.values), list(self.faces.values)
+            parts = [EmotionColumns.open(os.path.join(self.root, day), emotion_names, face_names)
+                     for day in self.partitions(cutoff)]
+        columns = EmotionColumns.concat(parts, emotion_names, face_names).between(cutoff)
+        return columns.for_face(face_id) if face_id is not None else columns
+
+    def rebuild_aggregates(self):
+        # Kodlar üzerinde gruplanır, ardından adlara çevrilir
+        with self._lock:
+            data = self.scan(columns=('emotion', 'confidence', 'face'))
+            values = {}
+            if len(data['emotion']):
+                values = aggregate_frame(pd.DataFrame({
+                    'face_id': self.faces.decode(data['face']),
+                    'emotion': self.emotions.decode(data['emotion']),
+                    'confidence': data['confidence'].astype(np.float64),
+                }))
+            self.aggregates.replace(values, self.row_count())
+
+    def get_aggregates(self):
+        with self._lock:
+            return {key: list(entry) for key, entry in self.aggregates.values.items()}
+
+    def export_to_excel(self, output_file='emotion_analysis.xlsx'):
+        try:
+            df_emotion = self.get_history_dataframe()
+            df_emotion['timestamp'] = df_emotion['timestamp'].dt.strftime('%Y-%m-%dT%H:%M:%S.%f')
+            with pd.ExcelWriter(output_file) as writer:
+                df_emotion.to_excel(writer, sheet_name='Emotion History', index=False)
+                if os.path.exists(self.advanced_analysis_file):
+                    pd.read_csv(self.advanced_analysis_file).to_excel(writer, sheet_name='Advanced Analysis', index=False)
+            return True
+        except Exception as e:
+            print(f"Error exporting to Excel: {e}")
+            return False
+
+    def close(self):
+        with self._lock:
+            self.aggregates.save()
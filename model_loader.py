@@ -0,0 +1,85 @@
+import threading
+import time
+import numpy as np
+from emotion_model import EmotionRecognizer
+from face_detector import load_known_faces
+from face_gallery import FaceGallery, ANN_MIN_GALLERY_SIZE
+from emotion_server import EMOTION_SERVER, wait_for_server
+from runtime_config import apply_runtime_config
+
+
+class ModelLoader:
+    # Duygu modelini, dlib modellerini ve yüz galerisini arka planda yükler.
+    # Arayüz bu sırada çizilir; state "pending" -> "loading" -> "ready"/"error"
+    # olarak ilerler ve her aşamanın süresi timings içinde tutulur. Modeller
+    # bir sahte tahminle ısıtılır, böylece ilk gerçek analiz hazır modele düşer.
+    # EMOTION_SERVER ayarlıysa duygu modeli yerine model sunucusuna bağlanılır.
+    def __init__(self, known_faces_folder='known_faces'):
+        self.known_faces_folder = known_faces_folder
+        self.state = 'pending'
+        self.phase = None
+        self.timings = {}
+        self.total_time = None
+        self.error = None
+        self.recognizer = None
+        self.gallery = None
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='model-loader', daemon=True)
+            self._thread.start()
+        return self
+
+    def _phase(self, name, fn):
+        self.phase = name
+        start = time.perf_counter()
+        result = fn()
+        self.timings[name] = time.perf_counter() - start
+        return result
+
+    def _build_gallery(self, known_encodings, known_names):
+        gallery = FaceGallery(known_encodings, known_names)
+        if len(gallery) >= ANN_MIN_GALLERY_SIZE:
+            gallery.build_index()
+        return gallery
+
+    def _run(self):
+        self.state = 'loading'
+        start = time.perf_counter()
+        try:
+            # İş parçacığı ve CPU ayarları dlib ve TensorFlow yüklenmeden önce uygulanır
+            apply_runtime_config()
+            # face_recognition içe aktarılırken dlib tespit/landmark/encoding modellerini yükler
+            self._phase('face_recognition', lambda: __import__('face_recognition'))
+            if EMOTION_SERVER:
+                recognizer = self._phase('emotion_model', lambda: wait_for_server(EMOTION_SERVER))
+            else:
+                recognizer = self._phase('emotion_model', EmotionRecognizer)
+            h, w = recognizer.input_shape
+            self._phase('warmup', lambda: recognizer.predict_emotions([np.zeros((h, w, 3), dtype=np.uint8)]))
+            known_encodings, known_names = self._phase('known_faces', lambda: load_known_faces(self.known_faces_folder))
+            gallery = self._phase('gallery', lambda: self._build_gallery(known_encodings, known_names))
+            self.recognizer, self.gallery = recognizer, gallery
+            self.state = 'ready'
+        except Exception as e:
+            print(f"Modeller yüklenirken hata oluştu: {str(e)}")
+            self.error = e
+            self.state = 'error'
+        finally:
+            self.phase = None
+            self.total_time = time.perf_counter() - start
+            self._ready.set()
+
+    def is_ready(self):
+        return self.state == 'ready'
+
+    def wait(self, timeout=None):
+        # Yükleme bitene kadar bekler; (recognizer, gallery) döndürür
+        self.start()
+        if not self._ready.wait(timeout):
+            raise TimeoutError("Modeller henüz yüklenmedi")
+        if self.error is not None:
+            raise RuntimeError(f"Modeller yüklenemedi: {self.error}")
+        return self.recognizer, self.gallery
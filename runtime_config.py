@@ -0,0 +1,170 @@
+# Çıkarım ve yüz tanıma iş yükleri için CPU iş parçacığı ayarları.
+# TensorFlow'un intra/inter-op havuzları, dlib'in (BLAS/OpenMP) encode
+# işlemleri ve OpenCV'nin kendi havuzu varsayılan olarak aynı çekirdekleri
+# paylaşır ve yük altında aşırı abonelik oluşur. Ayarlar sırasıyla
+# varsayılanlar <- runtime_config.json (benchmarks/bench_threading_sweep.py
+# ile üretilir) <- ortam değişkenleri olarak okunur ve modeller yüklenmeden
+# önce bir kez uygulanır. None/0 değerleri kütüphane varsayılanını korur.
+import json
+import os
+import sys
+import threading
+
+import cv2
+
+RUNTIME_CONFIG_PATH = os.getenv("RUNTIME_CONFIG", "runtime_config.json")
+
+DEFAULT_CONFIG = {
+    'tf_intra_op_threads': 0,
+    'tf_inter_op_threads': 0,
+    'tflite_threads': 0,
+    'cv2_threads': None,
+    # dlib ve NumPy dışı yerel kütüphanelerin BLAS/OpenMP iş parçacığı sayısı
+    'blas_threads': 0,
+    # Ana süreç için çekirdek listesi, örneğin "0-3" (None -> kısıtlama yok)
+    'cpu_affinity': None,
+    # Kayıt işçi süreçlerinin her biri ayrı bir çekirdeğe sabitlenir
+    'pin_workers': False,
+}
+
+ENV_OVERRIDES = {
+    'tf_intra_op_threads': "TF_INTRA_OP_THREADS",
+    'tf_inter_op_threads': "TF_INTER_OP_THREADS",
+    'tflite_threads': "EMOTION_TFLITE_THREADS",
+    'cv2_threads': "CV2_NUM_THREADS",
+    'blas_threads': "BLAS_NUM_THREADS",
+    'cpu_affinity': "CPU_AFFINITY",
+    'pin_workers': "PIN_ENROLLMENT_WORKERS",
+}
+
+BLAS_ENV_VARS = ['OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS']
+
+_config = None
+_applied = False
+_tensorflow_configured = False
+_lock = threading.Lock()
+
+
+def parse_cpu_list(value):
+    # "0-3,6" -> [0, 1, 2, 3, 6]; liste olarak da verilebilir
+    if value is None or value == '':
+        return None
+    if isinstance(value, (list, tuple)):
+        return sorted({int(cpu) for cpu in value})
+    cpus = set()
+    for part in str(value).split(','):
+        if '-' in part:
+            first, last = part.split('-')
+            cpus.update(range(int(first), int(last) + 1))
+        elif part.strip():
+            cpus.add(int(part))
+    return sorted(cpus)
+
+
+def _parse(key, value):
+    if key == 'cpu_affinity':
+        return parse_cpu_list(value)
+    if key == 'pin_workers':
+        return str(value).lower() in ('1', 'true', 'yes')
+    return int(value)
+
+
+def load_runtime_config(path=None):
+    config = dict(DEFAULT_CONFIG)
+    path = path or RUNTIME_CONFIG_PATH
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                stored = json.load(f)
+            config.update({key: value for key, value in stored.items() if key in DEFAULT_CONFIG})
+        except (OSError, ValueError) as e:
+            print(f"Uyarı: {path} okunamadı, varsayılan iş parçacığı ayarları kullanılıyor: {str(e)}")
+    for key, env in ENV_OVERRIDES.items():
+        if os.getenv(env):
+            config[key] = os.getenv(env)
+    return {key: (_parse(key, value) if value is not None else None) for key, value in config.items()}
+
+
+def save_runtime_config(config, path=None):
+    path = path or RUNTIME_CONFIG_PATH
+    with open(path, 'w') as f:
+        json.dump({key: config.get(key, DEFAULT_CONFIG[key]) for key in DEFAULT_CONFIG}, f, indent=2)
+    return path
+
+
+def get_runtime_config():
+    global _config
+    with _lock:
+        if _config is None:
+            _config = load_runtime_config()
+        return _config
+
+
+def _set_blas_threads(count):
+    # Yalnızca henüz yüklenmemiş kütüphaneleri (dlib) etkiler
+    for name in BLAS_ENV_VARS:
+        os.environ[name] = str(count)
+
+
+def apply_runtime_config():
+    # Süreç başına bir kez: BLAS ortamı, OpenCV havuzu ve CPU sabitleme
+    global _applied
+    config = get_runtime_config()
+    with _lock:
+        if _applied:
+            return config
+        _applied = True
+    if config['blas_threads']:
+        _set_blas_threads(config['blas_threads'])
+    if config['cv2_threads'] is not None:
+        cv2.setNumThreads(config['cv2_threads'])
+    if config['cpu_affinity'] and hasattr(os, 'sched_setaffinity'):
+        try:
+            os.sched_setaffinity(0, config['cpu_affinity'])
+        except OSError as e:
+            print(f"Uyarı: CPU sabitleme uygulanamadı: {str(e)}")
+    return config
+
+
+def configure_tensorflow(tf):
+    # TensorFlow çalışma zamanı ilk işlemden önce yapılandırılmalıdır
+    global _tensorflow_configured
+    config = apply_runtime_config()
+    with _lock:
+        if _tensorflow_configured:
+            return
+        _tensorflow_configured = True
+    try:
+        if config['tf_intra_op_threads']:
+            tf.config.threading.set_intra_op_parallelism_threads(config['tf_intra_op_threads'])
+        if config['tf_inter_op_threads']:
+            tf.config.threading.set_inter_op_parallelism_threads(config['tf_inter_op_threads'])
+    except RuntimeError as e:
+        print(f"Uyarı: TensorFlow iş parçacığı ayarları uygulanamadı: {str(e)}")
+
+
+def available_cpus():
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def init_worker(counter, config):
+    # Süreç havuzu başlatıcısı: her işçi tek iş parçacıklı çalışır ve
+    # pin_workers açıksa sıradaki çekirdeğe sabitlenir. BLAS ortam değişkenleri
+    # yalnızca kütüphane yüklenmeden önce etkilidir; bu yüzden havuz spawn ile
+    # açılır (çatallanan işçi ana sürecin başlatılmış BLAS'ını devralırdı) ve
+    # dlib encode_image içinde, bu başlatıcıdan sonra içe aktarılır.
+    if 'dlib' in sys.modules:
+        print("Uyarı: dlib işçi süreçte zaten yüklü, BLAS iş parçacığı sayısı uygulanamadı")
+    _set_blas_threads(config['blas_threads'] or 1)
+    cv2.setNumThreads(1)
+    if config['pin_workers'] and hasattr(os, 'sched_setaffinity'):
+        cpus = config['cpu_affinity'] or available_cpus()
+        with counter.get_lock():
+            index = counter.value
+            counter.value += 1
+        try:
+            os.sched_setaffinity(0, {cpus[index % len(cpus)]})
+        except OSError as e:
+            print(f"Uyarı: İşçi süreç sabitlenemedi: {str(e)}")
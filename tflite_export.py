@@ -0,0 +1,103 @@
+# Duygu modelini TFLite biçimine dönüştürür: float16 ağırlıklı ve int8
+# nicemlenmiş iki değişken üretir. int8 dönüşümü için nicemleme aralıkları,
+# yerel görüntülerden çıkarılan yüz kırpıntılarıyla (temsili veri kümesi)
+# kalibre edilir. Üretilen dosyalar EMOTION_BACKEND=tflite ile kullanılır.
+#
+# Kullanım:
+#   python tflite_export.py [--model model/emotion_model.h5] [--calibration known_faces] [--samples 200] [--out-dir model]
+import argparse
+import os
+
+import cv2
+import numpy as np
+import tensorflow as tf
+
+from emotion_model import EmotionRecognizer
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.bmp')
+
+
+def load_face_crops(folder, limit=None):
+    # Klasördeki (alt klasörler dahil) görüntülerden uygulamanın kullandığı
+    # tespit ile yüz kırpıntıları çıkarır; yüz bulunamazsa görüntünün tamamı
+    # kullanılır (hazır kırpılmış yüz veri kümeleri için)
+    from face_detector import detect_face
+
+    crops = []
+    for root, _, files in sorted(os.walk(folder)):
+        for file in sorted(files):
+            if not file.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            img = cv2.imread(os.path.join(root, file))
+            if img is None:
+                continue
+            faces = detect_face(img)
+            if len(faces) == 0:
+                crops.append(img)
+            else:
+                crops.extend(img[y:y+h, x:x+w] for (x, y, w, h) in faces)
+            if limit and len(crops) >= limit:
+                return crops[:limit]
+    return crops
+
+
+def _converter(model, sample_shape):
+    # Keras sürümünden bağımsız olması için model, batch boyutu serbest bir
+    # tf.function üzerinden dönüştürülür (yorumlayıcı batch'i sonradan ayarlar)
+    function = tf.function(lambda x: model(x, training=False),
+                           input_signature=[tf.TensorSpec((None,) + sample_shape, tf.float32)])
+    return tf.lite.TFLiteConverter.from_concrete_functions([function.get_concrete_function()], model)
+
+
+def convert_float16(model, sample_shape):
+    converter = _converter(model, sample_shape)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.target_spec.supported_types = [tf.float16]
+    return converter.convert()
+
+
+def convert_int8(model, sample_shape, calibration_batch):
+    # Ağırlıklar ve aktivasyonlar int8; giriş/çıkış float32 kalır, böylece
+    # ön işleme ve sonuç yorumlama iki arka uçta da aynıdır
+    def representative_dataset():
+        for sample in calibration_batch:
+            yield [sample[np.newaxis].astype(np.float32)]
+
+    converter = _converter(model, sample_shape)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    return converter.convert()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--model', default='model/emotion_model.h5')
+    parser.add_argument('--calibration', default='known_faces')
+    parser.add_argument('--samples', type=int, default=200)
+    parser.add_argument('--out-dir', default='model')
+    args = parser.parse_args()
+
+    recognizer = EmotionRecognizer(args.model, use_engine=False, backend='keras')
+    base = os.path.splitext(os.path.basename(args.model))[0]
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    outputs = [('float16', lambda: convert_float16(recognizer.model, recognizer.sample_shape))]
+
+    crops = load_face_crops(args.calibration, args.samples) if os.path.isdir(args.calibration) else []
+    calibration_batch, _ = recognizer.preprocess(crops)
+    if calibration_batch is None:
+        print(f"Uyarı: {args.calibration} klasöründe kalibrasyon görüntüsü bulunamadı, int8 modeli atlandı.")
+    else:
+        print(f"int8 kalibrasyonu için {len(calibration_batch)} yüz kırpıntısı kullanılıyor.")
+        outputs.append(('int8', lambda: convert_int8(recognizer.model, recognizer.sample_shape, calibration_batch)))
+
+    for kind, convert in outputs:
+        path = os.path.join(args.out_dir, f"{base}_{kind}.tflite")
+        with open(path, 'wb') as f:
+            f.write(convert())
+        print(f"{kind}: {path} ({os.path.getsize(path) / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()